@@ -0,0 +1,43 @@
+"""Tiny timing helpers shared by the benchmark scripts.
+
+Run any script from the repo root, e.g. ``python benchmarks/bench_dispatch.py``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import pathlib
+import sys
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "src"))
+
+
+def measure(fn: Callable[[], Any], number: int, repeat: int = 5) -> float:
+    """Return the best per-call time in seconds over ``repeat`` runs."""
+
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def measure_async(fn: Callable[[], Awaitable[Any]], number: int, repeat: int = 5) -> float:
+    """Async variant of :func:`measure`; each run happens in one event loop."""
+
+    async def _run() -> float:
+        start = time.perf_counter()
+        for _ in range(number):
+            await fn()
+        return (time.perf_counter() - start) / number
+
+    return min(asyncio.run(_run()) for _ in range(repeat))
+
+
+def report(label: str, seconds: float) -> None:
+    print(f"{label:<48} {seconds * 1e9:>12,.0f} ns/op")
@@ -0,0 +1,68 @@
+"""Stored size and encode/decode cost of payload codecs on representative payloads.
+
+``stored`` is what the SDK persists for the value: the JSON text for plain
+payloads, the ``{"__python_agents_codec__", "data"}`` envelope's JSON for encoded ones.
+"""
+
+from __future__ import annotations
+
+import json
+
+import _harness
+
+from python_agents.codec import (
+    CompressedCodec,
+    JsonCodec,
+    MsgpackCodec,
+    decode_envelope,
+    encode_envelope,
+)
+
+PAYLOADS = {
+    "chat history (200 messages)": [
+        {
+            "id": f"msg-{n}",
+            "role": "user" if n % 2 else "assistant",
+            "content": f"Message number {n} about the quarterly report and next steps.",
+            "createdAt": 1_700_000_000 + n,
+            "tokens": 40 + n % 17,
+        }
+        for n in range(200)
+    ],
+    "document (nested, 50 sections)": {
+        "title": "Design doc",
+        "sections": [
+            {"heading": f"Section {n}", "paragraphs": ["lorem ipsum dolor sit amet " * 8] * 3}
+            for n in range(50)
+        ],
+        "meta": {"authors": ["a", "b"], "version": 7, "draft": False},
+    },
+    "metrics (1k floats)": {"series": [n * 0.731 for n in range(1000)]},
+    "queue job (small)": {"job": "send_email", "to": "user@example.com", "template": "welcome"},
+}
+
+CODECS = {
+    "json+zlib": CompressedCodec(JsonCodec()),
+    "msgpack (raw)": MsgpackCodec(),  # not selectable by name; shown for comparison
+    "msgpack+zlib": CompressedCodec(MsgpackCodec()),
+}
+
+
+def main() -> None:
+    for label, payload in PAYLOADS.items():
+        plain = json.dumps(payload, separators=(",", ":"))
+        print(f"\n{label}: plain JSON {len(plain):,} bytes")
+        number = 200 if len(plain) < 10_000 else 20
+        _harness.report("  plain json.dumps", _harness.measure(lambda: json.dumps(payload), number))
+        for name, codec in CODECS.items():
+            envelope = encode_envelope(codec, payload)
+            stored = len(json.dumps(envelope, separators=(",", ":")))
+            print(f"  {name:<14} stored {stored:>8,} bytes ({stored / len(plain):.0%} of JSON)")
+            encode = _harness.measure(lambda: encode_envelope(codec, payload), number)
+            decode = _harness.measure(lambda: decode_envelope(codec, envelope), number)
+            _harness.report(f"    {name} encode", encode)
+            _harness.report(f"    {name} decode", decode)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Per-dispatch cost of ``call_callable`` / ``call_tool`` on a wide class."""
+
+from __future__ import annotations
+
+import builtins
+
+from _harness import measure, measure_async, report
+
+from python_agents import call_callable, call_tool, callable, get_callable_methods, instrumentation, tool
+
+
+def _make_agent_class(width: int) -> type:
+    namespace = {}
+    for index in range(width):
+        def _method(self, value, _index=index):
+            return value + _index
+
+        _method.__name__ = f"method_{index}"
+        namespace[f"method_{index}"] = callable(_method)
+        namespace[f"tool_{index}"] = tool(_method, name=f"tool_{index}")
+        namespace[f"plain_{index}"] = lambda self: None
+    return type("WideAgent", (), namespace)
+
+
+def _legacy_scan(obj):
+    # The pre-registry implementation: dir() + getattr() on every call.
+    methods = {}
+    for attr_name in dir(obj):
+        candidate = getattr(obj, attr_name, None)
+        if builtins.callable(candidate) and getattr(candidate, "__python_agents_callable__", False):
+            methods[getattr(candidate, "__python_agents_callable_name__", attr_name)] = candidate
+    return methods
+
+
+def main() -> None:
+    for width in (10, 50, 200):
+        agent = _make_agent_class(width)()
+        target = f"method_{width - 1}"
+        print(f"-- {width} callables, {width} tools, {width} plain methods")
+        report("legacy dir() scan + call", measure(lambda: _legacy_scan(agent)[target](1), 2_000))
+        report("get_callable_methods (all bound)", measure(lambda: get_callable_methods(agent), 2_000))
+        report("call_callable", measure_async(lambda: call_callable(agent, target, 1), 20_000))
+        report("call_tool", measure_async(lambda: call_tool(agent, f"tool_{width - 1}", {"value": 1}), 20_000))
+        instrumentation.add_hook(instrumentation.InMemoryAggregator())
+        try:
+            report(
+                "call_callable (instrumented)",
+                measure_async(lambda: call_callable(agent, target, 1), 20_000),
+            )
+        finally:
+            instrumentation.clear_hooks()
+
+
+if __name__ == "__main__":
+    main()
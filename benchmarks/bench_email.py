@@ -0,0 +1,74 @@
+"""Resolve inbound addresses against 10k rules: linear scan vs ``EmailRouter``.
+
+The scan stands in for a hand-written resolver callback that walks a rule
+list with ``fnmatch`` on every message; ``EmailRouter`` compiles the same
+rules into dict indexes once.
+"""
+
+from __future__ import annotations
+
+import fnmatch
+import random
+import time
+
+import _harness
+
+from python_agents import EmailRouter
+
+RULES = 10_000
+MESSAGES = 2_000
+
+
+def _rules():
+    rules = {f"user{n}@tenant{n % 100}.example.com": f"Agent{n % 50}" for n in range(RULES - 200)}
+    rules.update({f"queue{n}+*@example.com": "TicketAgent" for n in range(100)})
+    rules.update({f"*@team{n}.example.org": "TeamAgent" for n in range(90)})
+    rules.update({f"*@*.region{n}.example.net": "RegionAgent" for n in range(10)})
+    return rules
+
+
+def _addresses():
+    rng = random.Random(0)
+    pool = [
+        *(f"user{n}@tenant{n % 100}.example.com" for n in range(0, RULES - 200, 7)),
+        *(f"queue{n}+{n * 31}@example.com" for n in range(100)),
+        *(f"someone@team{n}.example.org" for n in range(90)),
+        *(f"ops@eu.region{n}.example.net" for n in range(10)),
+        "nobody@unknown.example",
+    ]
+    return [rng.choice(pool) for _ in range(MESSAGES)]
+
+
+def _scan_resolver(rules):
+    compiled = list(rules.items())
+
+    def _resolve(address):
+        address = address.lower()
+        for pattern, target in compiled:
+            if fnmatch.fnmatchcase(address, pattern):
+                return target
+        return None
+
+    return _resolve
+
+
+def main() -> None:
+    rules = _rules()
+    addresses = _addresses()
+
+    start = time.perf_counter()
+    router = EmailRouter(rules)
+    print(f"{'EmailRouter compile (10k rules)':<48} {(time.perf_counter() - start) * 1e3:>9.2f} ms")
+
+    scan = _scan_resolver(rules)
+    sample = addresses[:50]
+    scan_seconds = _harness.measure(lambda: [scan(a) for a in sample], 1, repeat=3) / len(sample)
+    _harness.report("linear fnmatch scan, per message", scan_seconds)
+
+    index_seconds = _harness.measure(lambda: [router.resolve(a) for a in addresses], 5) / len(addresses)
+    _harness.report("EmailRouter.resolve, per message", index_seconds)
+    print(f"{'EmailRouter throughput':<48} {1 / index_seconds:>12,.0f} msg/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Import-time and cold-start benchmark for ``python_agents``.
+
+Every sample runs in a fresh interpreter. The child pre-imports ``asyncio`` and
+``typing`` (the Workers Python runtime has them loaded before user code runs),
+then times the scenario and counts the modules it added. Cold-start scenarios
+install a minimal fake bridge as the ``js`` module so they run under CPython.
+
+    python benchmarks/bench_import.py            # table
+    python benchmarks/bench_import.py --json     # machine-readable, for tracking
+"""
+
+from __future__ import annotations
+
+import json
+import pathlib
+import statistics
+import subprocess
+import sys
+
+SRC = pathlib.Path(__file__).resolve().parents[1] / "src"
+SAMPLES = 15
+
+_CHILD = """
+import asyncio, json, sys, time, types, typing
+sys.path.insert(0, {src!r})
+
+class _SDK:
+    def routeAgentRequest(self, request, env, options=None):
+        return None
+
+    def getAgentByName(self, namespace, name):
+        return types.SimpleNamespace(state={{}})
+
+sys.modules["js"] = types.SimpleNamespace(__PYTHON_AGENTS_SDK=_SDK())
+before = set(sys.modules)
+start = time.perf_counter()
+{body}
+elapsed = time.perf_counter() - start
+added = sorted(set(sys.modules) - before)
+print(json.dumps({{"seconds": elapsed, "modules": len(added), "package_modules": [m for m in added if m.startswith("python_agents")]}}))
+"""
+
+SCENARIOS = {
+    "import python_agents": "import python_agents",
+    "route_agent_request (cold)": (
+        "import python_agents\n"
+        "asyncio.run(python_agents.route_agent_request('REQ', None))"
+    ),
+    "get_agent_by_name (cold)": (
+        "from python_agents import get_agent_by_name\n"
+        "asyncio.run(get_agent_by_name('ns', 'demo'))"
+    ),
+    "from python_agents import *": "from python_agents import *",
+}
+
+
+def _sample(body: str) -> dict:
+    code = _CHILD.format(src=str(SRC), body=body)
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    if output.returncode:
+        raise RuntimeError(output.stderr)
+    return json.loads(output.stdout)
+
+
+def main() -> None:
+    results = {}
+    for label, body in SCENARIOS.items():
+        samples = [_sample(body) for _ in range(SAMPLES)]
+        results[label] = {
+            "median_ms": statistics.median(s["seconds"] for s in samples) * 1e3,
+            "modules": samples[-1]["modules"],
+            "package_modules": samples[-1]["package_modules"],
+        }
+
+    if "--json" in sys.argv:
+        print(json.dumps(results, indent=2))
+        return
+    for label, result in results.items():
+        print(
+            f"{label:<40} {result['median_ms']:>8.2f} ms   modules={result['modules']:<3} "
+            f"({', '.join(result['package_modules'])})"
+        )
+
+
+if __name__ == "__main__":
+    main()
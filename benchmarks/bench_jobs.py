@@ -0,0 +1,77 @@
+"""Drain 500 I/O-bound jobs by hand, one at a time, vs with ``QueueWorker``.
+
+Runs on the local runtime; each handler awaits a 2 ms sleep to stand in for a
+subrequest. ``crossings`` counts bridge calls made to read and ack the queue.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+import _harness  # noqa: F401  (puts src/ on sys.path)
+
+from python_agents import Agent, QueueWorker
+from python_agents.local import install_local_sdk, uninstall_local_sdk
+
+JOBS = 500
+IO_SECONDS = 0.002
+
+
+async def _index(payload):
+    await asyncio.sleep(IO_SECONDS)
+
+
+class _Counting:
+    def __init__(self, agent):
+        self.crossings = 0
+        for name in ("get_queue", "dequeue", "dequeue_many"):
+            setattr(self, name, self._count(getattr(agent, name)))
+
+    def _count(self, method):
+        async def _call(*args, **kwargs):
+            self.crossings += 1
+            return await method(*args, **kwargs)
+
+        return _call
+
+
+async def _manual(agent):
+    counted = _Counting(agent)
+    while rows := await counted.get_queue():
+        await _index(rows[0]["payload"])
+        await counted.dequeue(rows[0]["id"])
+    return counted.crossings
+
+
+def _pooled(concurrency):
+    async def _drain(agent):
+        counted = _Counting(agent)
+        worker = QueueWorker(counted, {"index": _index}, concurrency=concurrency)
+        await worker.drain()
+        return counted.crossings
+
+    return _drain
+
+
+async def _scenario(label, body):
+    install_local_sdk()
+    try:
+        agent = Agent.create()
+        await agent.queue_many([{"job": "index", "doc": n} for n in range(JOBS)])
+        start = time.perf_counter()
+        crossings = await body(agent)
+        elapsed = time.perf_counter() - start
+    finally:
+        uninstall_local_sdk()
+    print(f"{label:<40} {elapsed * 1e3:>9.2f} ms   {JOBS / elapsed:>8.0f} jobs/s   crossings={crossings}")
+
+
+async def main() -> None:
+    await _scenario("get_queue + dequeue loop", _manual)
+    for concurrency in (1, 8, 32):
+        await _scenario(f"QueueWorker(concurrency={concurrency})", _pooled(concurrency))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,64 @@
+"""Append to a growing chat history: whole-state ``set_state`` vs ``agent.kv``.
+
+``written`` totals the JSON size of what each approach sends across the bridge
+and persists. A ``set_state`` append rewrites (and broadcasts) the whole
+history. A ``kv.set`` append writes only the new message. Runs against the
+local emulator, so timings cover the Python side plus emulated storage.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+
+import _harness  # noqa: F401  (puts src/ on sys.path)
+
+from python_agents import Agent
+from python_agents.local import install_local_sdk, uninstall_local_sdk
+
+MESSAGES = 1_000
+
+
+def _message(n):
+    return {"role": "user" if n % 2 else "assistant", "content": f"Message {n} " * 8, "n": n}
+
+
+async def _state_appends():
+    agent = Agent.create(state={"history": []})
+    written = 0
+    for n in range(MESSAGES):
+        history = [*agent.state["history"], _message(n)]
+        written += len(json.dumps({"history": history}))
+        await agent.set_state({"history": history})
+    return written
+
+
+async def _kv_appends():
+    agent = Agent.create()
+    written = 0
+    for n in range(MESSAGES):
+        message = _message(n)
+        written += len(json.dumps(message))
+        await agent.kv.set(f"history:{n:08}", message)
+    return written
+
+
+def main() -> None:
+    scenarios = (("set_state (whole history)", _state_appends), ("agent.kv.set", _kv_appends))
+    for label, scenario in scenarios:
+        install_local_sdk("memory")
+        try:
+            start = time.perf_counter()
+            written = asyncio.run(scenario())
+            elapsed = time.perf_counter() - start
+        finally:
+            uninstall_local_sdk()
+        print(
+            f"{label:<28} {MESSAGES:,} appends  {elapsed * 1e3:>9,.1f} ms  "
+            f"written={written / 1e6:>8,.2f} MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
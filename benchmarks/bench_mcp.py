@@ -0,0 +1,94 @@
+"""MCP requests per second: JS ``McpServer`` path vs ``McpRequestHandler``.
+
+The JS path is modelled by a server that, like the SDK's, answers
+``tools/list`` itself and runs batch entries one after another, calling the
+handlers installed by ``register_mcp_tools`` (one bridge crossing per tool
+call). Each tool awaits a 1 ms sleep to stand in for a subrequest. Runs
+under plain CPython, so the real crossing cost is not included; ``crossings``
+is the number to carry over.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+
+import _harness  # noqa: F401  (puts src/ on sys.path)
+
+from python_agents import McpRequestHandler, register_mcp_tools, tool
+
+BATCHES = 50
+BATCH_SIZE = 10
+IO_SECONDS = 0.001
+
+
+class Tools:
+    @tool(input_schema={"order_id": "string"})
+    async def lookup(self, order_id):
+        await asyncio.sleep(IO_SECONDS)
+        return {"content": [{"type": "text", "text": f"order:{order_id}"}]}
+
+
+class _SequentialServer:
+    """Stand-in for the JS ``McpServer`` + ``createMcpHandler`` path."""
+
+    def __init__(self):
+        self.handlers = {}
+        self.crossings = 0
+
+    def tool(self, name, schema, handler):
+        self.handlers[name] = (schema, handler)
+
+    async def handle(self, body):
+        responses = []
+        for request in json.loads(body):
+            if request["method"] == "tools/list":
+                result = {"tools": [{"name": name} for name in self.handlers]}
+            else:
+                self.crossings += 1
+                params = request["params"]
+                result = await self.handlers[params["name"]][1](params["arguments"], None)
+            responses.append({"jsonrpc": "2.0", "id": request["id"], "result": result})
+        return json.dumps(responses)
+
+
+def _batch():
+    calls = [
+        {
+            "jsonrpc": "2.0",
+            "id": n,
+            "method": "tools/call",
+            "params": {"name": "lookup", "arguments": {"order_id": str(n)}},
+        }
+        for n in range(BATCH_SIZE - 1)
+    ]
+    return json.dumps([{"jsonrpc": "2.0", "id": "list", "method": "tools/list"}, *calls])
+
+
+async def _scenario(label, handle, crossings):
+    body = _batch()
+    start = time.perf_counter()
+    for _ in range(BATCHES):
+        await handle(body)
+    elapsed = time.perf_counter() - start
+    requests = BATCHES * BATCH_SIZE
+    print(f"{label:<40} {requests / elapsed:>10,.0f} req/s   crossings={crossings()}")
+
+
+async def main() -> None:
+    server = _SequentialServer()
+    register_mcp_tools(server, Tools())
+    await _scenario("JS path (sequential batch)", server.handle, lambda: server.crossings)
+
+    for concurrency in (1, 8):
+        handler = McpRequestHandler(Tools(), concurrency=concurrency)
+
+        async def _handle(body, _handler=handler):
+            return json.dumps(await _handler.handle(json.loads(body)))
+
+        await _scenario(f"McpRequestHandler(concurrency={concurrency})", _handle, lambda: 0)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
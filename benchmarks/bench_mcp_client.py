@@ -0,0 +1,80 @@
+"""Agent wakes that list an external MCP server's tools and call one tool.
+
+"reconnect per wake" models the ``add_mcp_server`` pattern: every wake opens
+a new session and fetches the catalog again. "shared McpClientPool" keeps one
+session and a cached catalog across wakes. Each HTTP round trip to the
+emulated server sleeps 2 ms to stand in for network latency, so ``requests``
+is the number that carries over.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+import _harness  # noqa: F401  (puts src/ on sys.path)
+
+from python_agents import McpClientPool, McpRequestHandler, tool
+from python_agents.local import install_local_sdk, uninstall_local_sdk
+
+WAKES = 100
+LATENCY = 0.002
+URL = "https://tools.example/mcp"
+
+
+class Tools:
+    @tool(input_schema={"query": "string"})
+    async def search(self, query):
+        return f"results for {query}"
+
+
+class _SlowServer:
+    def __init__(self, handler):
+        self.handler = handler
+
+    async def handle(self, message):
+        await asyncio.sleep(LATENCY)
+        return await self.handler.handle(message)
+
+
+async def _wake(pool, n):
+    tools = await pool.list_tools("tools")
+    await pool.call_tool("tools", tools[0]["name"], {"query": str(n)})
+
+
+async def _reconnecting():
+    requests = 0
+    for n in range(WAKES):
+        pool = McpClientPool()
+        pool.add("tools", URL)
+        await _wake(pool, n)
+        requests += pool.stats()["requests"]
+    return requests
+
+
+async def _shared():
+    pool = McpClientPool()
+    pool.add("tools", URL)
+    for n in range(WAKES):
+        await _wake(pool, n)
+    return pool.stats()["requests"]
+
+
+def main() -> None:
+    for label, scenario in (("reconnect per wake", _reconnecting), ("shared McpClientPool", _shared)):
+        sdk = install_local_sdk("memory")
+        sdk.on_mcp(URL, _SlowServer(McpRequestHandler(Tools())))
+        try:
+            start = time.perf_counter()
+            requests = asyncio.run(scenario())
+            elapsed = time.perf_counter() - start
+        finally:
+            uninstall_local_sdk()
+        print(
+            f"{label:<24} {WAKES} wakes  {elapsed * 1e3 / WAKES:>7.2f} ms/wake  "
+            f"requests={requests}"
+        )
+
+
+if __name__ == "__main__":
+    main()
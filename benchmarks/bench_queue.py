@@ -0,0 +1,110 @@
+"""Queue 10k jobs with ``queue`` in a loop vs one ``queue_many`` call.
+
+The JS side is an in-memory stand-in, so the timings cover the Python wrapper
+cost; ``crossings`` counts how many times Python called into the bridge, which
+is what dominates in a real Worker. JS -> Python conversion of returned lists
+is modelled as a JSON round trip.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+
+import _harness  # noqa: F401  (puts src/ on sys.path)
+
+from python_agents import agent as agent_module
+from python_agents._ffi import to_py
+from python_agents.agent import Agent
+
+ITEMS = 10_000
+
+
+class _JSValue:
+    def __init__(self, value):
+        self.value = value
+
+    def to_py(self):
+        return json.loads(json.dumps(self.value))
+
+
+class _Bridge:
+    def __init__(self):
+        self.crossings = 0
+        self.items = {}
+
+    def _queue(self, payload):
+        queue_id = len(self.items)
+        self.items[queue_id] = {"id": queue_id, "payload": payload}
+        return queue_id
+
+
+class _JSAgent:
+    def __init__(self, bridge):
+        self.bridge = bridge
+
+    def queue(self, payload):
+        self.bridge.crossings += 1
+        return self.bridge._queue(payload)
+
+    def getQueue(self):
+        self.bridge.crossings += 1
+        return _JSValue(list(self.bridge.items.values()))
+
+
+class _SDK:
+    def __init__(self, bridge):
+        self.bridge = bridge
+
+    def queueMany(self, agent, payloads, callback=None):
+        self.bridge.crossings += 1
+        return _JSValue([self.bridge._queue(payload) for payload in payloads])
+
+    def filterQueue(self, agent, where, limit=None):
+        self.bridge.crossings += 1
+        ((key, value),) = where.items()
+        matches = [item for item in self.bridge.items.values() if item["payload"][key] == value]
+        return _JSValue(matches[:limit] if limit is not None else matches)
+
+
+async def _scenario(label, body):
+    bridge = _Bridge()
+    agent_module.get_agents_sdk = lambda: _SDK(bridge)
+    agent = Agent(_JSAgent(bridge))
+    jobs = [{"job": "index-document", "doc_id": f"doc_{i}", "shard": i % 100} for i in range(ITEMS)]
+    start = time.perf_counter()
+    await body(agent, jobs)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<40} {elapsed * 1e3:>9.2f} ms   crossings={bridge.crossings}")
+
+
+async def _loop(agent, jobs):
+    for job in jobs:
+        await agent.queue(job)
+
+
+async def _bulk(agent, jobs):
+    await agent.queue_many(jobs)
+
+
+async def _scan_all(agent, jobs):
+    await agent.queue_many(jobs)
+    return [item for item in to_py(await agent.get_queue()) if item["payload"]["shard"] == 7]
+
+
+async def _filtered(agent, jobs):
+    await agent.queue_many(jobs)
+    return await agent.get_queue(where={"shard": 7})
+
+
+def main() -> None:
+    agent_module.to_js = lambda value: value
+    asyncio.run(_scenario(f"queue() x {ITEMS}", _loop))
+    asyncio.run(_scenario(f"queue_many({ITEMS})", _bulk))
+    asyncio.run(_scenario("queue_many + get_queue() + Python filter", _scan_all))
+    asyncio.run(_scenario("queue_many + get_queue(where=...)", _filtered))
+
+
+if __name__ == "__main__":
+    main()
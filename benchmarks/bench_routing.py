@@ -0,0 +1,92 @@
+"""Requests per second for a typical Worker fetch: SDK-first vs ``RequestRouter``.
+
+"SDK first" calls ``route_agent_request`` for every request and falls through
+to a hand-written dispatch when it returns ``None``; ``RequestRouter`` matches
+everything in Python and only crosses into the SDK for agent routes. Runs on
+the local runtime, so a crossing here is much cheaper than a real Pyodide
+one; ``crossings`` is the number to carry over.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+
+import _harness  # noqa: F401  (puts src/ on sys.path)
+
+from python_agents import RequestRouter, route_agent_request
+from python_agents.local import install_local_sdk, uninstall_local_sdk
+
+REQUESTS = 20_000
+ROUTES = {"/health": "ok", "/robots.txt": "User-agent: *", "/": "index"}
+
+
+class _Request:
+    __slots__ = ("url", "method")
+
+    def __init__(self, url):
+        self.url = url
+        self.method = "GET"
+
+
+def _traffic():
+    rng = random.Random(0)
+    pool = [
+        *(f"https://app.example.com{path}" for path in ROUTES),
+        *(f"https://app.example.com/static/chunk-{n}.js" for n in range(20)),
+        *(f"https://app.example.com/agents/chat-agent/user-{n}" for n in range(20)),
+        "https://app.example.com/unknown",
+    ]
+    return [_Request(rng.choice(pool)) for _ in range(REQUESTS)]
+
+
+async def _sdk_first(request):
+    response = await route_agent_request(request, None)
+    if response is not None:
+        return response
+    path = request.url.split("app.example.com", 1)[1]
+    if path in ROUTES:
+        return ROUTES[path]
+    if path.startswith("/static/"):
+        return "asset"
+    return None
+
+
+def _router():
+    router = RequestRouter()
+    for path, body in ROUTES.items():
+        router.add(path, lambda request, env, _body=body: _body)
+    router.add("/static", lambda request, env: "asset", prefix=True)
+    return router.handle
+
+
+async def _scenario(label, handle, bridge_method):
+    sdk = install_local_sdk()
+    crossings = 0
+    original = getattr(sdk, bridge_method)
+
+    def _counted(*args):
+        nonlocal crossings
+        crossings += 1
+        return original(*args)
+
+    setattr(sdk, bridge_method, _counted)
+    requests = _traffic()
+    try:
+        start = time.perf_counter()
+        for request in requests:
+            await handle(request)
+        elapsed = time.perf_counter() - start
+    finally:
+        uninstall_local_sdk()
+    print(f"{label:<40} {REQUESTS / elapsed:>10,.0f} req/s   crossings={crossings}")
+
+
+async def main() -> None:
+    await _scenario("route_agent_request, then dispatch", _sdk_first, "routeAgentRequest")
+    await _scenario("RequestRouter.handle", _router(), "routeAgentRequest")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
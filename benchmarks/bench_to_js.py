@@ -0,0 +1,58 @@
+"""``_ffi.to_js`` across payload shapes and sizes.
+
+This one needs a Pyodide runtime (``js`` / ``pyodide.ffi``), e.g. inside a
+``pyodide venv`` or ``pywrangler dev``; under plain CPython it exits early.
+``baseline`` is the previous implementation: a blanket ``pyodide.ffi.to_js``
+with ``Object.fromEntries``.
+"""
+
+from __future__ import annotations
+
+import sys
+
+from _harness import measure, report
+
+from python_agents._ffi import BufferView, JsonPayload, to_js
+
+
+def _payloads() -> dict[str, object]:
+    flat = lambda n: {f"key_{i}": i for i in range(n)}  # noqa: E731
+    nested = lambda n: {"items": [{"id": i, "tags": ["a", "b"], "meta": flat(5)} for i in range(n)]}  # noqa: E731
+    return {
+        "flat dict x10": flat(10),
+        "flat dict x1000": flat(1000),
+        "nested dict x10": nested(10),
+        "nested dict x1000": nested(1000),
+        "bytes 1 KiB": b"x" * 1024,
+        "bytes 1 MiB": b"x" * (1 << 20),
+    }
+
+
+def main() -> None:
+    try:
+        import js  # noqa: F401
+        from pyodide.ffi import to_js as pyodide_to_js
+    except ImportError:
+        print("bench_to_js.py needs a Pyodide runtime; skipping under", sys.implementation.name)
+        return
+
+    import js
+
+    for label, payload in _payloads().items():
+        number = 20 if "1 MiB" in label or "x1000" in label else 2_000
+        print(f"-- {label}")
+        report("baseline", measure(lambda: pyodide_to_js(payload, dict_converter=js.Object.fromEntries), number))
+        report("to_js", measure(lambda: to_js(payload), number))
+        if isinstance(payload, bytes):
+            report("to_js(BufferView)", measure(lambda: to_js(BufferView(payload)), number))
+        else:
+            report("to_js(JsonPayload)", measure(lambda: to_js(JsonPayload(payload)), number))
+
+    proxy = to_js(_payloads()["nested dict x10"])
+    print("-- existing JsProxy")
+    report("baseline", measure(lambda: pyodide_to_js(proxy), 20_000))
+    report("to_js", measure(lambda: to_js(proxy), 20_000))
+
+
+if __name__ == "__main__":
+    main()
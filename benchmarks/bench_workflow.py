@@ -0,0 +1,69 @@
+"""Wall time of an 8-source pipeline: sequential steps vs ``WorkflowSteps``.
+
+Each fetch step awaits a 20 ms sleep to stand in for an upstream call. The
+"retry" rows rerun the pipeline after the last source failed once; ``calls``
+counts upstream calls across both attempts.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+import _harness  # noqa: F401  (puts src/ on sys.path)
+
+from python_agents import WorkflowSteps
+from python_agents.workflows import MemoryCheckpoints
+
+SOURCES = 8
+IO_SECONDS = 0.02
+
+
+class _Upstream:
+    def __init__(self, fail_once=False):
+        self.calls = 0
+        self.fail_once = fail_once
+
+    async def fetch(self, source):
+        self.calls += 1
+        await asyncio.sleep(IO_SECONDS)
+        if self.fail_once and source == SOURCES - 1:
+            self.fail_once = False
+            raise RuntimeError("upstream timeout")
+        return source
+
+
+async def _sequential(upstream):
+    return sum([await upstream.fetch(source) for source in range(SOURCES)])
+
+
+def _stepped(concurrency, storage):
+    async def _pipeline(upstream):
+        steps = WorkflowSteps(storage, concurrency=concurrency)
+        return sum(await steps.parallel([("fetch", upstream.fetch, n) for n in range(SOURCES)]))
+
+    return _pipeline
+
+
+async def _scenario(label, pipeline, fail_once=False):
+    upstream = _Upstream(fail_once)
+    start = time.perf_counter()
+    try:
+        await pipeline(upstream)
+    except RuntimeError:
+        await pipeline(upstream)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<44} {elapsed * 1e3:>8.1f} ms   calls={upstream.calls}")
+
+
+async def main() -> None:
+    await _scenario("sequential", _sequential)
+    for concurrency in (1, 4, 8):
+        label = f"WorkflowSteps(concurrency={concurrency})"
+        await _scenario(label, _stepped(concurrency, MemoryCheckpoints()))
+    await _scenario("sequential, retry after failure", _sequential, fail_once=True)
+    await _scenario("WorkflowSteps(8), retry after failure", _stepped(8, MemoryCheckpoints()), fail_once=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,30 @@
+"""Per-call overhead of the ``Agent`` / ``_JSProxy`` Python wrappers."""
+
+from __future__ import annotations
+
+from _harness import measure_async, report
+
+from python_agents import Agent, AgentWorkflow
+
+
+class _JSObject:
+    def setState(self, patch):
+        return None
+
+    def getSchedules(self):
+        return None
+
+    def run(self, payload):
+        return None
+
+
+def main() -> None:
+    agent = Agent(_JSObject())
+    workflow = AgentWorkflow(_JSObject())
+    report("agent.set_state(...)", measure_async(lambda: agent.set_state({}), 50_000))
+    report("agent.call('get_schedules')", measure_async(lambda: agent.call("get_schedules"), 50_000))
+    report("workflow.run(...)", measure_async(lambda: workflow.run(1), 50_000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Benchmark-suite support.
+
+The scenarios in ``test_*.py`` use the pytest-benchmark ``benchmark`` fixture
+(``pip install -e .[bench]``). Without the plugin a minimal stand-in with the
+same call shape times each scenario and prints a summary table.
+
+    python -m pytest benchmarks
+"""
+
+from __future__ import annotations
+
+import time
+
+import pytest
+
+try:
+    import pytest_benchmark  # noqa: F401
+except ImportError:
+    _RESULTS: list[tuple[str, int, float, float]] = []
+
+    class _Benchmark:
+        def __init__(self, name: str, min_time: float = 0.2, max_rounds: int = 1_000):
+            self.name = name
+            self.min_time = min_time
+            self.max_rounds = max_rounds
+
+        def __call__(self, fn, *args, **kwargs):
+            timings = []
+            deadline = time.perf_counter() + self.min_time
+            while len(timings) < self.max_rounds and (len(timings) < 3 or time.perf_counter() < deadline):
+                start = time.perf_counter()
+                result = fn(*args, **kwargs)
+                timings.append(time.perf_counter() - start)
+            timings.sort()
+            _RESULTS.append((self.name, len(timings), timings[0], timings[len(timings) // 2]))
+            return result
+
+    @pytest.fixture
+    def benchmark(request):
+        return _Benchmark(request.node.name)
+
+    def pytest_terminal_summary(terminalreporter):
+        if not _RESULTS:
+            return
+        terminalreporter.write_sep("-", "benchmark (fallback timer)")
+        terminalreporter.write_line(f"{'name':<48} {'rounds':>7} {'min':>12} {'median':>12}")
+        for name, rounds, best, median in _RESULTS:
+            terminalreporter.write_line(
+                f"{name:<48} {rounds:>7} {best * 1e6:>10.1f}us {median * 1e6:>10.1f}us"
+            )
@@ -0,0 +1,126 @@
+"""Wrapper overhead, dispatch, state churn and queue throughput on the local runtime.
+
+Each scenario performs ``OPS`` operations per round inside one event loop, so
+per-operation cost is the reported time divided by ``OPS``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from python_agents import Agent, call_callable, call_tool, callable, tool
+from python_agents.local import install_local_sdk, uninstall_local_sdk
+
+OPS = 1_000
+
+
+@pytest.fixture
+def sdk():
+    installed = install_local_sdk("memory")
+    yield installed
+    uninstall_local_sdk()
+
+
+@pytest.fixture
+def agent(sdk):
+    return Agent.create(state={"count": 0, "history": list(range(100))})
+
+
+@pytest.fixture
+def run():
+    loop = asyncio.new_event_loop()
+    yield loop.run_until_complete
+    loop.close()
+
+
+def _wide_class(width: int = 50) -> type:
+    namespace = {}
+    for index in range(width):
+        def _method(self, value, _index=index):
+            return value + _index
+
+        _method.__name__ = f"method_{index}"
+        namespace[_method.__name__] = callable(_method)
+        namespace[f"tool_{index}"] = tool(_method, name=f"tool_{index}")
+    return type("WideAgent", (), namespace)
+
+
+def test_wrapper_call_overhead(benchmark, run, agent):
+    async def _calls():
+        for _ in range(OPS):
+            await agent.call("get_schedules")
+
+    benchmark(lambda: run(_calls()))
+
+
+def test_generated_method_overhead(benchmark, run, agent):
+    async def _calls():
+        for _ in range(OPS):
+            await agent.get_schedules()
+
+    benchmark(lambda: run(_calls()))
+
+
+def test_call_callable_dispatch(benchmark, run):
+    obj = _wide_class()()
+
+    async def _calls():
+        for _ in range(OPS):
+            await call_callable(obj, "method_49", 1)
+
+    benchmark(lambda: run(_calls()))
+
+
+def test_call_tool_dispatch(benchmark, run):
+    obj = _wide_class()()
+
+    async def _calls():
+        for _ in range(OPS):
+            await call_tool(obj, "tool_49", {"value": 1})
+
+    benchmark(lambda: run(_calls()))
+
+
+def test_state_churn_set_state(benchmark, run, agent):
+    async def _writes():
+        for count in range(OPS):
+            await agent.set_state({"count": count})
+
+    benchmark(lambda: run(_writes()))
+
+
+def test_state_churn_batched(benchmark, run, agent):
+    async def _writes():
+        async with agent.batch_state():
+            for count in range(OPS):
+                await agent.set_state({"count": count})
+
+    benchmark(lambda: run(_writes()))
+
+
+def test_state_reads(benchmark, agent):
+    def _reads():
+        for _ in range(OPS):
+            agent.state["count"]
+
+    benchmark(_reads)
+
+
+def test_queue_throughput_loop(benchmark, run, agent):
+    async def _queue():
+        for index in range(OPS):
+            await agent.queue({"job": "index", "doc": index})
+        await agent.dequeue_all()
+
+    benchmark(lambda: run(_queue()))
+
+
+def test_queue_throughput_bulk(benchmark, run, agent):
+    async def _queue():
+        ids = await agent.queue_many({"job": "index", "doc": index} for index in range(OPS))
+        await agent.dequeue_many(ids)
+
+    benchmark(lambda: run(_queue()))
+
@@ -1,9 +1,9 @@
-import { useAgent } from "agents/react";
+import { useSyncedAgent } from "./stateSync";
 
 type State = { count: number };
 
 export function App() {
-  const counter = useAgent<any, State>({
+  const { agent: counter, state } = useSyncedAgent<State>({
     agent: "counter-agent",
     name: "demo-user",
   });
@@ -11,10 +11,10 @@ export function App() {
   return (
     <main>
       <h1>Counter</h1>
-      <p>{counter.state?.count ?? 0}</p>
+      <p>{state?.count ?? 0}</p>
       <button
         onClick={() =>
-          counter.setState({ count: (counter.state?.count ?? 0) + 1 })
+          counter.setState({ count: (state?.count ?? 0) + 1 })
         }
       >
         Increment
@@ -0,0 +1,124 @@
+import { useRef, useState } from "react";
+import { useAgent } from "agents/react";
+
+/**
+ * Client side of the Python bridge's coalesced broadcasts and state-diff sync.
+ *
+ * - `cf_agent_batch` frames (from `agent.broadcast(..., coalesce=...)`) are
+ *   unpacked and each message is passed to `onMessage`.
+ * - With `await agent.set_state_sync("diff")` the server sends
+ *   `cf_agent_state_snapshot` (full state) and `cf_agent_state_patch`
+ *   (JSON-Patch against a version this client acknowledged) frames. They are
+ *   applied here and acknowledged with `cf_agent_state_ack`.
+ */
+
+export type PatchOp =
+  | { op: "add" | "replace"; path: string; value: unknown }
+  | { op: "remove"; path: string };
+
+// How many applied versions are kept as patch bases; matches the bridge.
+const STATE_SNAPSHOTS = 16;
+
+const unescapePointer = (token: string) => token.replaceAll("~1", "/").replaceAll("~0", "~");
+
+export function applyStatePatch<T>(document: T, patch: PatchOp[]): T {
+  let root: any = structuredClone(document);
+  for (const op of patch) {
+    const value = "value" in op ? structuredClone(op.value) : undefined;
+    if (op.path === "") {
+      root = value;
+      continue;
+    }
+    const tokens = op.path.split("/").slice(1).map(unescapePointer);
+    const last = tokens.pop()!;
+    let target = root;
+    for (const token of tokens) target = target[Array.isArray(target) ? Number(token) : token];
+    if (Array.isArray(target)) {
+      const index = Number(last);
+      if (op.op === "remove") target.splice(index, 1);
+      else if (op.op === "add") target.splice(index, 0, value);
+      else target[index] = value;
+    } else if (op.op === "remove") {
+      delete target[last];
+    } else {
+      target[last] = value;
+    }
+  }
+  return root as T;
+}
+
+type SyncOptions<State> = {
+  send(data: string): void;
+  onState(state: State): void;
+  onMessage?(message: unknown): void;
+};
+
+export function createStateSync<State>({ send, onState, onMessage }: SyncOptions<State>) {
+  const versions = new Map<number, State>();
+
+  function accept(state: State, version: number) {
+    versions.set(version, state);
+    if (versions.size > STATE_SNAPSHOTS) versions.delete(versions.keys().next().value!);
+    onState(state);
+    send(JSON.stringify({ type: "cf_agent_state_ack", version }));
+  }
+
+  function receive(message: any) {
+    switch (message?.type) {
+      case "cf_agent_batch":
+        message.messages.forEach(receive);
+        return;
+      case "cf_agent_state_snapshot":
+        accept(message.state, message.version);
+        return;
+      case "cf_agent_state_patch": {
+        const base = versions.get(message.base);
+        if (base === undefined) send(JSON.stringify({ type: "cf_agent_state_resync" }));
+        else accept(applyStatePatch(base, message.patch), message.version);
+        return;
+      }
+      default:
+        onMessage?.(message);
+    }
+  }
+
+  return {
+    /** Feed a websocket `MessageEvent` (e.g. from `useAgent`'s `onMessage`). */
+    handleMessage(event: MessageEvent) {
+      let message: unknown = event.data;
+      if (typeof message === "string") {
+        try {
+          message = JSON.parse(message);
+        } catch {
+          // Not JSON: hand the raw text to onMessage.
+        }
+      }
+      receive(message);
+    },
+  };
+}
+
+/**
+ * `useAgent` plus the sync protocol above. Returns the agent connection and
+ * the synced state; other messages (including unpacked batches) go to
+ * `onMessage` already parsed.
+ */
+export function useSyncedAgent<State>(
+  options: Omit<Parameters<typeof useAgent>[0], "onMessage" | "onStateUpdate"> & {
+    onMessage?(message: unknown): void;
+  },
+) {
+  const [state, setState] = useState<State | undefined>(undefined);
+  const sync = useRef<ReturnType<typeof createStateSync<State>>>();
+  const agent = useAgent<any, State>({
+    ...options,
+    onStateUpdate: (next: State) => setState(next),
+    onMessage: (event: MessageEvent) => sync.current?.handleMessage(event),
+  });
+  sync.current ??= createStateSync<State>({
+    send: (data) => agent.send(data),
+    onState: setState,
+    onMessage: options.onMessage,
+  });
+  return { agent, state };
+}
@@ -1,28 +1,7 @@
-import {
-  Agent,
-  AgentWorkflow,
-  McpAgent,
-  createAddressBasedEmailResolver,
-  createMcpHandler,
-  routeAgentEmail,
-  routeAgentRequest,
-} from "agents";
-
-globalThis.__PYTHON_AGENTS_SDK = {
-  Agent,
-  AgentWorkflow,
-  McpAgent,
-  createAddressBasedEmailResolver,
-  createMcpHandler,
-  routeAgentEmail,
-  routeAgentRequest,
-  createAgent(init = {}) {
-    return new Agent(init);
-  },
-  createMcpAgent(init = {}) {
-    return new McpAgent(init);
-  },
-  createAgentWorkflow(init = {}) {
-    return new AgentWorkflow(init);
-  },
-};
+/**
+ * Re-exports the package's bridge so this example never drifts from it.
+ *
+ * Importing it installs `globalThis.__PYTHON_AGENTS_SDK`; import this module
+ * in your Worker bundle before Python code executes.
+ */
+import "../../../src/python_agents/worker/agents_bridge.mjs";
@@ -6,5 +6,8 @@ from python_agents import Agent
 class Default(WorkerEntrypoint):
     async def fetch(self, request):
         agent = Agent.create(state={"count": 0}, env=self.env, ctx=self.ctx)
+        # Clients using src/stateSync.ts receive JSON-Patches instead of the full state.
+        await agent.set_state_sync("diff")
         await agent.set_state({"count": 1})
+        await agent.broadcast({"type": "log", "text": "initialized"}, coalesce=True)
         return Response("Python Agent initialized")
@@ -1,35 +1,140 @@
-from .agent import Agent, call_callable, callable, get_callable_methods
-from .apis import (
-    AgentWorkflow,
-    McpAgent,
-    create_address_based_email_resolver,
-    create_mcp_handler,
-    route_agent_email,
-)
-from .routing import (
-    get_agent_by_id,
-    get_agent_by_name,
-    route_agent_request,
-    route_agent_requests,
-)
-from .tools import call_tool, get_tool_methods, register_mcp_tools, tool
+"""Python-first wrapper for the Cloudflare Agents SDK.
+
+Submodules are imported lazily on first attribute access so Workers that only
+need, say, ``route_agent_request`` do not pay for loading everything else.
+"""
+
+from __future__ import annotations
+
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from ._cache import ResultCache, clear_result_cache
+    from ._ffi import BufferView, JsonPayload
+    from .agent import Agent, call_callable, callable, get_callable_methods
+    from .apis import (
+        AgentWorkflow,
+        McpAgent,
+        create_address_based_email_resolver,
+        create_mcp_handler,
+        route_agent_email,
+    )
+    from .email_routing import EmailRouter, EmailTarget
+    from .jobs import QueueWorker
+    from .kv import KeyedState, KeyedView
+    from .mcp import McpRequestHandler
+    from .mcp_client import McpClientPool, get_mcp_client_pool
+    from .routing import (
+        AgentRoute,
+        AgentStubCache,
+        FanOutResult,
+        RequestRouter,
+        fan_out,
+        get_agent_by_id,
+        get_agent_by_name,
+        route_agent_request,
+        route_agent_requests,
+    )
+    from .tools import (
+        ToolInputError,
+        call_tool,
+        get_tool_methods,
+        register_mcp_tools,
+        stream_tool,
+        tool,
+    )
+    from .workflows import WorkflowSteps
+
+_EXPORTS = {
+    "ResultCache": "._cache",
+    "clear_result_cache": "._cache",
+    "BufferView": "._ffi",
+    "JsonPayload": "._ffi",
+    "Agent": ".agent",
+    "call_callable": ".agent",
+    "callable": ".agent",
+    "get_callable_methods": ".agent",
+    "EmailRouter": ".email_routing",
+    "EmailTarget": ".email_routing",
+    "QueueWorker": ".jobs",
+    "KeyedState": ".kv",
+    "KeyedView": ".kv",
+    "McpRequestHandler": ".mcp",
+    "McpClientPool": ".mcp_client",
+    "get_mcp_client_pool": ".mcp_client",
+    "AgentWorkflow": ".apis",
+    "McpAgent": ".apis",
+    "create_address_based_email_resolver": ".apis",
+    "create_mcp_handler": ".apis",
+    "route_agent_email": ".apis",
+    "AgentRoute": ".routing",
+    "AgentStubCache": ".routing",
+    "RequestRouter": ".routing",
+    "FanOutResult": ".routing",
+    "fan_out": ".routing",
+    "get_agent_by_id": ".routing",
+    "get_agent_by_name": ".routing",
+    "route_agent_request": ".routing",
+    "route_agent_requests": ".routing",
+    "ToolInputError": ".tools",
+    "call_tool": ".tools",
+    "get_tool_methods": ".tools",
+    "register_mcp_tools": ".tools",
+    "stream_tool": ".tools",
+    "tool": ".tools",
+    "WorkflowSteps": ".workflows",
+}
 
 __all__ = [
     "Agent",
+    "AgentRoute",
+    "AgentStubCache",
     "AgentWorkflow",
+    "BufferView",
+    "EmailRouter",
+    "EmailTarget",
+    "FanOutResult",
+    "JsonPayload",
+    "KeyedState",
+    "KeyedView",
     "McpAgent",
+    "McpClientPool",
+    "McpRequestHandler",
+    "QueueWorker",
+    "RequestRouter",
+    "ResultCache",
+    "ToolInputError",
+    "WorkflowSteps",
     "call_callable",
     "callable",
+    "clear_result_cache",
     "create_address_based_email_resolver",
     "create_mcp_handler",
+    "fan_out",
     "get_agent_by_id",
     "get_agent_by_name",
     "get_callable_methods",
+    "get_mcp_client_pool",
     "route_agent_email",
     "route_agent_request",
     "route_agent_requests",
     "call_tool",
     "get_tool_methods",
     "register_mcp_tools",
+    "stream_tool",
     "tool",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *__all__})
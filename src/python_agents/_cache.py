@@ -0,0 +1,397 @@
+"""Caching primitives shared by the public helpers."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import time
+import weakref
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable, Iterator
+from typing import Any
+
+from ._ffi import maybe_await, to_js, to_py
+from ._registry import method_registry
+
+MISSING: Any = object()
+
+
+class TTLCache:
+    """Bounded LRU mapping whose entries optionally expire after ``ttl`` seconds."""
+
+    __slots__ = ("_clock", "_data", "evictions", "expirations", "hits", "maxsize", "misses", "ttl")
+
+    def __init__(
+        self,
+        maxsize: int = 128,
+        ttl: float | None = None,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data: OrderedDict[Hashable, tuple[float | None, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __iter__(self) -> Iterator[Hashable]:
+        # Over a snapshot, so entries can be popped while iterating.
+        return iter(list(self._data))
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, MISSING, count=False) is not MISSING
+
+    def get(self, key: Hashable, default: Any = None, *, count: bool = True) -> Any:
+        entry = self._data.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at is None or expires_at > self._clock():
+                self._data.move_to_end(key)
+                if count:
+                    self.hits += 1
+                return value
+            del self._data[key]
+            self.expirations += 1
+        if count:
+            self.misses += 1
+        return default
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = MISSING) -> None:
+        ttl = self.ttl if ttl is MISSING else ttl
+        expires_at = None if ttl is None else self._clock() + ttl
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def keys(self) -> list[Hashable]:
+        return list(self._data)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "size": len(self._data),
+        }
+
+
+class _Flight:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Future):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Share one in-flight awaitable between concurrent calls with the same key.
+
+    Every caller sees the shared result or exception. A caller that is
+    cancelled only stops waiting; the shared work is cancelled once the last
+    waiter has gone.
+    """
+
+    __slots__ = ("_flights", "coalesced", "started")
+
+    def __init__(self):
+        self._flights: dict[Hashable, _Flight] = {}
+        self.started = 0
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+    async def run(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(factory()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _task: self._forget(key, flight))
+            self.started += 1
+        else:
+            self.coalesced += 1
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.task.done():
+                self._forget(key, flight)
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def _forget(self, key: Hashable, flight: _Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    def stats(self) -> dict[str, int]:
+        return {"started": self.started, "coalesced": self.coalesced, "in_flight": len(self._flights)}
+
+
+_SCALARS = (type(None), bool, int, float, str, bytes)
+
+
+def _freeze(value: Any) -> Hashable:
+    kind = type(value)
+    if kind in _SCALARS:
+        return (kind.__name__, value)
+    if kind is list or kind is tuple:
+        return (kind.__name__, tuple(_freeze(item) for item in value))
+    if kind is dict:
+        items = ((_freeze(key), _freeze(item)) for key, item in value.items())
+        # Sorted by repr: stable across runs and fine with mixed key types.
+        return ("dict", tuple(sorted(items, key=lambda pair: repr(pair[0]))))
+    if kind is set or kind is frozenset:
+        return (kind.__name__, tuple(sorted((_freeze(item) for item in value), key=repr)))
+    if kind.__hash__ is not object.__hash__ and kind.__repr__ is not object.__repr__:
+        # Value-like objects (enums, frozen dataclasses, ...).
+        return (f"{kind.__module__}.{kind.__qualname__}", value)
+    raise TypeError(f"Cannot build a cache key from {kind.__name__} arguments")
+
+
+def argument_key(args: tuple[Any, ...], kwargs: dict[str, Any]) -> Hashable:
+    """Hashable, type-preserving key for a call's arguments.
+
+    ``{1: "x"}`` and ``{"1": "x"}``, or ``(1,)`` and ``[1]``, get different
+    keys. Raises ``TypeError`` for arguments that have no value identity
+    (plain objects compare by address); callers then skip caching.
+    """
+
+    return (_freeze(args), _freeze(kwargs))
+
+
+def key_digest(key: Hashable) -> str:
+    """Stable short string for an :func:`argument_key`, for use in storage keys."""
+
+    return hashlib.blake2b(repr(key).encode(), digest_size=16).hexdigest()
+
+
+async def delete_prefix(storage: Any, prefix: str) -> int:
+    """Delete every ``storage`` key starting with ``prefix``; returns how many."""
+
+    keys = list(to_py(await maybe_await(storage.list(to_js({"prefix": prefix})))) or ())
+    # Durable Object storage deletes at most 128 keys per call.
+    for start in range(0, len(keys), 128):
+        await maybe_await(storage.delete(to_js(keys[start : start + 128])))
+    return len(keys)
+
+
+class ResultCache:
+    """Memoize a ``@callable`` / ``@tool`` method's results per instance.
+
+    Entries are keyed by the method's exposed name and its arguments, or by
+    ``key(*args, **kwargs)`` when given. With ``storage="memory"`` results live
+    in an isolate-local LRU of ``maxsize`` entries per instance, held weakly
+    (instances must be weak-referenceable). With
+    ``storage="durable"`` that LRU is backed by the agent's Durable Object
+    storage (``ctx.storage`` of the instance or of its ``agent`` attribute), so
+    results survive hibernation; pass a callable ``instance -> storage`` to use
+    another key-value store with the same ``get``/``put``/``delete``/``list``
+    API. Durable values must be JSON-like.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 128,
+        ttl: float | None = None,
+        *,
+        key: Callable[..., Hashable] | None = None,
+        storage: str | Callable[[Any], Any] = "memory",
+        prefix: str = "python_agents:cache:",
+    ):
+        if storage not in ("memory", "durable") and not callable(storage):
+            raise ValueError("storage must be 'memory', 'durable' or a callable")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.key = key
+        self.storage = storage
+        self.prefix = prefix
+        self._local: weakref.WeakKeyDictionary[Any, TTLCache] = weakref.WeakKeyDictionary()
+        self.hits = 0
+        self.durable_hits = 0
+        self.misses = 0
+        self.bypassed = 0
+
+    def _entries(self, owner: Any) -> TTLCache:
+        try:
+            entries = self._local.get(owner)
+        except TypeError:
+            # An id()-keyed fallback would leak, and serve a dead instance's
+            # results to a new object that reuses its id.
+            raise TypeError(
+                f"cache= needs weak-referenceable instances; {type(owner).__name__} "
+                "defines __slots__ without '__weakref__'"
+            ) from None
+        if entries is None:
+            entries = self._local[owner] = TTLCache(self.maxsize, self.ttl)
+        return entries
+
+    def _durable(self, owner: Any) -> Any:
+        if self.storage == "memory":
+            return None
+        if self.storage != "durable":
+            return self.storage(owner)
+        ctx = getattr(owner, "ctx", None) or getattr(getattr(owner, "agent", None), "ctx", None)
+        storage = getattr(ctx, "storage", None)
+        if storage is None:
+            raise TypeError(
+                f"{type(owner).__name__} has no ctx.storage (or agent.ctx.storage) for a durable cache"
+            )
+        return storage
+
+    def _make_key(self, args: tuple[Any, ...], kwargs: dict[str, Any]) -> tuple[Hashable, str]:
+        """Return the in-memory key and its storage form."""
+
+        if self.key is not None:
+            key = self.key(*args, **kwargs)
+            return key, str(key)
+        key = argument_key(args, kwargs)
+        return key, key_digest(key)
+
+    async def call(
+        self,
+        owner: Any,
+        name: str,
+        func: Callable[..., Any],
+        args: tuple[Any, ...] = (),
+        kwargs: dict[str, Any] | None = None,
+    ) -> Any:
+        """Return the cached result of ``func(*args, **kwargs)`` or compute and store it."""
+
+        kwargs = kwargs or {}
+        try:
+            key, stored_as = self._make_key(args, kwargs)
+        except TypeError:
+            # Arguments without a value identity: not cacheable, just call.
+            self.bypassed += 1
+            return await maybe_await(func(*args, **kwargs))
+        entry_key = (name, key)
+        entries = self._entries(owner)
+        value = entries.get(entry_key, MISSING, count=False)
+        if value is not MISSING:
+            self.hits += 1
+            return value
+
+        durable = self._durable(owner)
+        storage_key = f"{self.prefix}{name}:{stored_as}"
+        if durable is not None:
+            stored = to_py(await maybe_await(durable.get(storage_key)))
+            if stored is not None and (stored["expires"] is None or stored["expires"] > time.time()):
+                self.durable_hits += 1
+                entries.set(entry_key, stored["value"])
+                return stored["value"]
+
+        self.misses += 1
+        value = await maybe_await(func(*args, **kwargs))
+        entries.set(entry_key, value)
+        if durable is not None:
+            expires = None if self.ttl is None else time.time() + self.ttl
+            await maybe_await(durable.put(storage_key, to_js({"value": value, "expires": expires})))
+        return value
+
+    async def invalidate(self, owner: Any, name: str | None = None) -> None:
+        """Drop ``owner``'s cached results, for one exposed method name or all of them."""
+
+        entries = self._entries(owner)
+        if name is None:
+            entries.clear()
+        else:
+            for entry_key in entries:
+                if entry_key[0] == name:
+                    entries.pop(entry_key)
+
+        durable = self._durable(owner)
+        if durable is None:
+            return
+        await delete_prefix(durable, self.prefix if name is None else f"{self.prefix}{name}:")
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.durable_hits + self.misses
+        return {
+            "hits": self.hits,
+            "durable_hits": self.durable_hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "hit_rate": (self.hits + self.durable_hits) / lookups if lookups else 0.0,
+            "size": sum(len(entries) for entries in self._local.values()),
+        }
+
+
+def result_cache(cache: ResultCache | bool | None) -> ResultCache | None:
+    """Normalize a decorator's ``cache=`` option."""
+
+    if cache is None or cache is False:
+        return None
+    if cache is True:
+        return ResultCache()
+    if isinstance(cache, ResultCache):
+        return cache
+    raise TypeError("cache must be True, False, None or a ResultCache")
+
+
+def flight_group(enabled: bool) -> SingleFlight | None:
+    """Normalize a decorator's ``single_flight=`` option."""
+
+    return SingleFlight() if enabled else None
+
+
+def dispatcher(owner: Any, name: str, method: Callable[..., Any]) -> Callable[..., Any]:
+    """Return ``method`` wrapped in its ``cache=`` / ``single_flight=`` behaviour, if any."""
+
+    results = getattr(method, "__python_agents_cache__", None)
+    flights = getattr(method, "__python_agents_single_flight__", None)
+    if flights is None:
+        if results is None:
+            return method
+        return lambda *args, **kwargs: results.call(owner, name, method, args, kwargs)
+
+    def _call(*args: Any, **kwargs: Any) -> Awaitable[Any]:
+        def _factory() -> Awaitable[Any]:
+            if results is not None:
+                return results.call(owner, name, method, args, kwargs)
+            return maybe_await(method(*args, **kwargs))
+
+        try:
+            key = argument_key(args, kwargs)
+        except TypeError:
+            return _factory()
+        # The owner is kept alive by the waiting callers, so ``id`` is unique
+        # for as long as the flight exists.
+        return flights.run((id(owner), name, key), _factory)
+
+    return _call
+
+
+async def clear_result_cache(obj: Any, name: str | None = None) -> None:
+    """Invalidate ``obj``'s cached ``@callable`` / ``@tool`` results.
+
+    With ``name`` only that exposed method is cleared; otherwise every cached
+    method of ``obj``.
+    """
+
+    registry = method_registry(type(obj), "__python_agents_cache__", "__python_agents_cache_name__")
+    if name is not None:
+        registry = {name: registry[name]} if name in registry else {}
+    for exposed_name, attr_name in registry.items():
+        cache = getattr(obj, attr_name).__python_agents_cache__
+        await cache.invalidate(obj, exposed_name)
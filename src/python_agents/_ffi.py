@@ -6,31 +6,182 @@ maintainable and close to the JavaScript Agents SDK.
 
 from __future__ import annotations
 
-import re
-from collections.abc import Awaitable
+from collections.abc import Awaitable, Callable
+from functools import cache
 from typing import Any
 
 
-_SNAKE_CASE_RE = re.compile(r"_([a-z])")
+@cache
+def snake_to_camel(value: str) -> str:
+    """Convert a snake_case name to camelCase.
 
+    Only an underscore followed by ``a``-``z`` is folded; other underscores are
+    kept. Implemented without ``re`` to keep import time down.
+    """
 
-def snake_to_camel(value: str) -> str:
-    """Convert a snake_case name to camelCase."""
+    head, *parts = value.split("_")
+    pieces = [head]
+    for part in parts:
+        if part and "a" <= part[0] <= "z":
+            pieces.append(part[0].upper() + part[1:])
+        else:
+            pieces.append("_" + part)
+    return "".join(pieces)
 
-    return _SNAKE_CASE_RE.sub(lambda m: m.group(1).upper(), value)
 
+@cache
+def js_method_name(method: str) -> str:
+    """Map a Python method name to its JS name; raw JS names pass through."""
 
-def to_js(value: Any) -> Any:
-    """Convert a Python object to a JavaScript object when running in Workers."""
+    return snake_to_camel(method) if "_" in method else method
 
-    import js  # type: ignore
-    from pyodide.ffi import to_js as pyodide_to_js  # type: ignore
 
+class JsonPayload:
+    """Mark a payload to cross into JS as one JSON string.
+
+    For large, deeply nested payloads ``JSON.parse`` on a single string is
+    usually cheaper than converting every nested dict/list through the FFI.
+    Only JSON-serializable values are supported.
+    """
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any):
+        self.value = value
+
+
+class BufferView:
+    """Mark a bytes-like object to cross into JS as a zero-copy ``Uint8Array``.
+
+    The view aliases Python memory. It is only valid while the Python object is
+    alive and unmodified, and until WebAssembly memory grows, so the JS callee
+    must consume or copy it synchronously. Plain bytes-like values are copied
+    into a fresh ``Uint8Array`` with a single memcpy instead.
+    """
+
+    __slots__ = ("data",)
+
+    def __init__(self, data: bytes | bytearray | memoryview):
+        self.data = data
+
+
+# Argument types that wrappers convert with ``to_js`` (see :func:`convert_args`);
+# anything else (JS proxies, primitives, callables) is handed to the JS call as-is.
+JS_CONVERTIBLE = (dict, list, tuple, bytes, bytearray, memoryview, JsonPayload, BufferView)
+
+_PASSTHROUGH = (str, int, float, bool, type(None))
+
+
+@cache
+def _pyodide() -> tuple[Any, Any, Any] | None:
+    try:
+        import js  # type: ignore
+        from pyodide.ffi import JsProxy, to_js as pyodide_to_js  # type: ignore
+    except ImportError:
+        return None
+    return js, JsProxy, pyodide_to_js
+
+
+def to_js(value: Any) -> Any:
+    """Convert a Python object to a JavaScript object when running in Workers.
+
+    Fast paths: primitives and existing JS proxies are returned unchanged,
+    bytes-like values become typed arrays, flat dicts of primitives skip the
+    recursive conversion machinery, and :class:`JsonPayload` / :class:`BufferView`
+    select JSON-string and zero-copy transfer respectively.
+
+    Outside Pyodide (for example with :mod:`python_agents.local`) there is no
+    JS side: values pass through and the transfer markers are unwrapped.
+    """
+
+    if isinstance(value, _PASSTHROUGH):
+        return value
+
+    runtime = _pyodide()
+    if runtime is None:
+        return _to_local(value)
+    js, JsProxy, pyodide_to_js = runtime
+    if isinstance(value, JsProxy):
+        return value
     if isinstance(value, dict):
+        if all(isinstance(item, _PASSTHROUGH) for item in value.values()):
+            return pyodide_to_js(
+                value,
+                depth=1,
+                create_pyproxies=False,
+                dict_converter=js.Object.fromEntries,
+            )
+        return pyodide_to_js(value, dict_converter=js.Object.fromEntries)
+    if isinstance(value, bytes | bytearray | memoryview):
+        return pyodide_to_js(value)
+    if isinstance(value, JsonPayload):
+        import json
+
+        return js.JSON.parse(json.dumps(value.value, separators=(",", ":")))
+    if isinstance(value, BufferView):
+        return _buffer_view(value.data)
+    if isinstance(value, list | tuple):
         return pyodide_to_js(value, dict_converter=js.Object.fromEntries)
     return pyodide_to_js(value)
 
 
+def convert_arg(value: Any, convert: Callable[[Any], Any] = to_js) -> Any:
+    """Convert one argument for a JS call; non-:data:`JS_CONVERTIBLE` values pass as-is."""
+
+    return convert(value) if isinstance(value, JS_CONVERTIBLE) else value
+
+
+def convert_args(args: tuple[Any, ...], convert: Callable[[Any], Any] = to_js) -> tuple[Any, ...]:
+    """Convert the arguments of a JS call; see :func:`convert_arg`."""
+
+    return tuple(convert(arg) if isinstance(arg, JS_CONVERTIBLE) else arg for arg in args)
+
+
+def _to_local(value: Any) -> Any:
+    if isinstance(value, JsonPayload):
+        import json
+
+        return json.loads(json.dumps(value.value))
+    if isinstance(value, BufferView):
+        return value.data
+    return value
+
+
+def _buffer_view(data: bytes | bytearray | memoryview) -> Any:
+    from pyodide.ffi import create_proxy  # type: ignore
+
+    proxy = create_proxy(data)
+    try:
+        buffer = proxy.getBuffer("u8")
+    finally:
+        proxy.destroy()
+    # The bridge releases the PyBuffer once the view is garbage collected.
+    return get_agents_sdk().adoptBuffer(buffer)
+
+
+def persistent_proxy(func: Callable[..., Any]) -> Any:
+    """Wrap ``func`` so JS can keep calling it after the current call returns.
+
+    The JS side must call ``destroy()`` on it when done. Outside Pyodide the
+    function itself is returned.
+    """
+
+    if _pyodide() is None:
+        return func
+    from pyodide.ffi import create_proxy  # type: ignore
+
+    return create_proxy(func)
+
+
+def to_py(value: Any) -> Any:
+    """Convert a JS proxy to native Python data; Python values pass through."""
+
+    converter = getattr(value, "to_py", None)
+    if converter is None:
+        return value
+    return converter()
+
+
 async def maybe_await(value: Any) -> Any:
     """Await JS promises and Python awaitables, return plain values unchanged."""
 
@@ -39,9 +190,22 @@ async def maybe_await(value: Any) -> Any:
     return value
 
 
+_sdk_override: Any = None
+
+
+def set_agents_sdk(sdk: Any) -> None:
+    """Use ``sdk`` instead of ``globalThis.__PYTHON_AGENTS_SDK``; ``None`` restores it."""
+
+    global _sdk_override
+    _sdk_override = sdk
+
+
 def get_agents_sdk() -> Any:
     """Return the JS bridge object exposed by agents_bridge.mjs."""
 
+    if _sdk_override is not None:
+        return _sdk_override
+
     import js  # type: ignore
 
     sdk = getattr(js, "__PYTHON_AGENTS_SDK", None)
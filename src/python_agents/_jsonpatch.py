@@ -0,0 +1,68 @@
+"""Minimal JSON-Patch (RFC 6902) diff/apply used for state-diff sync.
+
+Mirrors ``diffState`` / ``applyStatePatch`` in ``worker/agents_bridge.mjs``
+and the frontend helper: objects are diffed key by key, any other change
+(including arrays) replaces the value. Only ``add``, ``remove`` and
+``replace`` operations are produced or understood.
+"""
+
+from __future__ import annotations
+
+import copy
+from typing import Any
+
+
+def _escape(key: str) -> str:
+    return key.replace("~", "~0").replace("/", "~1")
+
+
+def _unescape(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def diff(old: Any, new: Any, path: str = "") -> list[dict[str, Any]]:
+    """Return the operations that turn ``old`` into ``new``."""
+
+    if old == new:
+        return []
+    if not isinstance(old, dict) or not isinstance(new, dict):
+        return [{"op": "replace", "path": path, "value": new}]
+    ops: list[dict[str, Any]] = []
+    for key in old:
+        if key not in new:
+            ops.append({"op": "remove", "path": f"{path}/{_escape(key)}"})
+    for key, value in new.items():
+        child = f"{path}/{_escape(key)}"
+        if key not in old:
+            ops.append({"op": "add", "path": child, "value": value})
+        else:
+            ops.extend(diff(old[key], value, child))
+    return ops
+
+
+def apply(document: Any, ops: list[dict[str, Any]]) -> Any:
+    """Return a copy of ``document`` with ``ops`` applied."""
+
+    document = copy.deepcopy(document)
+    for op in ops:
+        value = copy.deepcopy(op.get("value"))
+        if op["path"] == "":
+            document = value
+            continue
+        *parents, last = (_unescape(token) for token in op["path"].split("/")[1:])
+        target = document
+        for token in parents:
+            target = target[int(token) if isinstance(target, list) else token]
+        if isinstance(target, list):
+            index = int(last)
+            if op["op"] == "remove":
+                del target[index]
+            elif op["op"] == "add":
+                target.insert(index, value)
+            else:
+                target[index] = value
+        elif op["op"] == "remove":
+            del target[last]
+        else:
+            target[last] = value
+    return document
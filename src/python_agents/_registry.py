@@ -0,0 +1,49 @@
+"""Per-class method registries for decorator-marked methods.
+
+``@callable`` and ``@tool`` only tag functions with metadata. The first time a
+class is dispatched against, its MRO is scanned once and the exposed names are
+recorded on the class itself, so later lookups are a dict hit plus a bind.
+"""
+
+from __future__ import annotations
+
+import builtins
+from typing import Any
+
+
+def method_registry(cls: type, marker: str, name_attr: str) -> dict[str, str]:
+    """Return exposed name -> attribute name for ``marker``-tagged methods of ``cls``.
+
+    The registry is cached in ``cls.__dict__`` (never inherited), so subclasses
+    build their own and overrides are resolved the same way ``getattr`` would.
+    """
+
+    cache_attr = f"{marker}registry__"
+    registry = cls.__dict__.get(cache_attr)
+    if registry is not None:
+        return registry
+
+    # Walk the MRO base-first so subclass definitions win, mirroring attribute
+    # lookup. An undecorated override hides the decorated base method.
+    resolved: dict[str, Any] = {}
+    for klass in reversed(cls.__mro__):
+        resolved.update(klass.__dict__)
+
+    registry = {}
+    for attr_name, candidate in resolved.items():
+        func = getattr(candidate, "__func__", candidate)
+        if builtins.callable(func) and getattr(func, marker, False):
+            registry[getattr(func, name_attr, attr_name)] = attr_name
+
+    try:
+        setattr(cls, cache_attr, registry)
+    except (AttributeError, TypeError):
+        # Builtin/extension types cannot carry the cache; rebuild per call.
+        pass
+    return registry
+
+
+def bind_methods(obj: Any, registry: dict[str, str]) -> dict[str, Any]:
+    """Bind every registry entry to ``obj``."""
+
+    return {exposed: getattr(obj, attr_name) for exposed, attr_name in registry.items()}
@@ -1,11 +1,20 @@
 from __future__ import annotations
 
-from collections.abc import Callable
-import builtins
+import asyncio
+from collections.abc import AsyncIterator, Callable, Iterable
+from contextlib import asynccontextmanager
 from functools import wraps
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
-from ._ffi import get_agents_sdk, maybe_await, snake_to_camel, to_js
+from . import instrumentation
+from ._cache import ResultCache, dispatcher, flight_group, result_cache
+from ._ffi import convert_args, get_agents_sdk, js_method_name, maybe_await, to_js, to_py
+from ._registry import bind_methods, method_registry
+
+if TYPE_CHECKING:
+    from .codec import Codec
+    from .kv import KeyedState
+    from .mcp_client import McpClientPool
 
 
 class Agent:
@@ -19,6 +28,7 @@ class Agent:
         "set_state",
         "schedule",
         "schedule_every",
+        "get_schedule",
         "get_schedules",
         "cancel_schedule",
         "queue",
@@ -34,29 +44,257 @@ class Agent:
         "reply_to_email",
     }
 
+    __slots__ = (
+        # Keeps wrappers weak-referenceable (ResultCache keys on instances).
+        "__weakref__",
+        "_batch_depth",
+        "_broadcast_task",
+        "_broadcast_timer",
+        "_broadcasts",
+        "_codec",
+        "_codec_fields",
+        "_js_agent",
+        "_js_methods",
+        "_kv",
+        "_pending_state",
+        "_schedule_index",
+        "_state_cache",
+        "_state_conversions",
+        "_state_hits",
+        "_state_version",
+    )
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        # Subclasses may extend ``_KNOWN_METHODS``; give the new names stubs too.
+        for name in sorted(cls._KNOWN_METHODS):
+            if not hasattr(cls, name):
+                setattr(cls, name, _known_method(name, cls.__name__))
+
     def __init__(self, js_agent: Any):
         self._js_agent = js_agent
+        self._js_methods: dict[str, Any] = {}
+        self._pending_state: dict[str, Any] | None = None
+        self._batch_depth = 0
+        self._state_cache: Any = None
+        self._state_version: Any = None
+        self._state_conversions = 0
+        self._state_hits = 0
+        self._schedule_index: _ScheduleIndex | None = None
+        self._broadcasts: list[tuple[tuple[Any, ...], list[Any]]] = []
+        self._broadcast_timer: asyncio.Handle | None = None
+        self._broadcast_task: asyncio.Future | None = None
+        self._codec: Codec | None = None
+        self._codec_fields: tuple[str, ...] = ()
+        self._kv: KeyedState | None = None
 
     @classmethod
-    def create(cls, state: dict[str, Any] | None = None, env: Any = None, ctx: Any = None) -> "Agent":
+    def create(
+        cls,
+        state: dict[str, Any] | None = None,
+        env: Any = None,
+        ctx: Any = None,
+        *,
+        codec: Codec | str | None = None,
+    ) -> Agent:
         """Create a wrapped JS ``Agent`` instance.
 
         In Workers, call this in your Python code after loading the JS bridge.
+        ``codec`` is passed to :meth:`use_codec` (the initial state is encoded
+        with it too).
         """
 
+        state = state or {}
+        if codec is not None:
+            # Encode with a plain base wrapper so subclasses are still built
+            # with ``cls(js_agent)``, as without a codec.
+            encoder = Agent(None)
+            encoder.use_codec(codec)
+            codec = encoder._codec
+            state = encoder._encode_state(state)
         sdk = get_agents_sdk()
-        init = {"state": state or {}}
+        init = {"state": state}
         if env is not None:
             init["env"] = env
         if ctx is not None:
             init["ctx"] = ctx
 
         js_agent = sdk.createAgent(to_js(init))
-        return cls(js_agent)
+        agent = cls(js_agent)
+        if codec is not None:
+            agent.use_codec(codec)
+        return agent
+
+    def use_codec(
+        self,
+        codec: Codec | str | None,
+        *,
+        plain_fields: Iterable[str] = ("type", "job", "_schedule_key"),
+    ) -> None:
+        """Store state values and queue/schedule payloads in a compact encoding.
+
+        ``codec`` is ``"msgpack+zlib"``, ``"json+zlib"``, any object with
+        ``name`` / ``encode`` / ``decode`` (see :mod:`python_agents.codec`), or
+        ``None`` to write plain values again. Encoded values are written as
+        ``{"__python_agents_codec__": name, "data": base64}`` envelopes, one
+        string per value across the bridge. :attr:`state`, :meth:`get_queue`
+        and the schedule methods decode envelopes of a built-in codec (or the
+        one set here) even when no codec is set any more.
+
+        Only dict, list and bytes state values are encoded, per top-level key,
+        so ``setState`` patches still merge; scalars stay readable by clients.
+        ``plain_fields`` of dict payloads are copied into the envelope as-is so
+        ``get_queue(where=...)``, job types and schedule keys keep working.
+        """
+
+        if codec is not None:
+            from .codec import get_codec
+
+            codec = get_codec(codec)
+        self._codec = codec
+        self._codec_fields = tuple(plain_fields)
+        self._state_cache = None
+
+    def decode(self, value: Any) -> Any:
+        """Decode an envelope written by this agent's codec (other values pass through).
+
+        Use it in schedule or queue callbacks invoked by the JS SDK, which
+        receive payloads as stored.
+        """
+
+        from .codec import decode_envelope, is_envelope
+
+        value = to_py(value)
+        return decode_envelope(self._codec, value) if is_envelope(value, self._codec) else value
+
+    # The codec module is imported only once a codec is set or a dict value is
+    # read, keeping it out of import time.
+
+    def _encode(self, value: Any) -> Any:
+        if self._codec is None or not isinstance(value, _ENCODED_TYPES):
+            return value
+        from .codec import encode_envelope
+
+        return encode_envelope(self._codec, value, self._codec_fields)
+
+    def _encode_state(self, patch: Any) -> Any:
+        if self._codec is None:
+            return patch
+        from .codec import encode_envelope
+
+        patch = to_py(patch)
+        if not isinstance(patch, dict):
+            return patch
+        return {
+            key: encode_envelope(self._codec, value) if isinstance(value, _ENCODED_TYPES) else value
+            for key, value in patch.items()
+        }
+
+    def _decode_values(self, values: dict[str, Any]) -> None:
+        from .codec import decode_envelope, is_envelope
+
+        for key, value in values.items():
+            if is_envelope(value, self._codec):
+                values[key] = decode_envelope(self._codec, value)
+
+    def _decode_rows(self, rows: Any) -> Any:
+        rows = to_py(rows)
+        if not isinstance(rows, list):
+            return rows
+        return [self._decode_row(row) for row in rows]
+
+    def _decode_row(self, row: Any) -> Any:
+        row = to_py(row)
+        if isinstance(row, dict) and isinstance(row.get("payload"), dict):
+            decoded = {"payload": row["payload"]}
+            self._decode_values(decoded)
+            row = {**row, **decoded}
+        return row
 
     @property
     def state(self) -> Any:
-        return self._js_agent.state
+        """Python mirror of the agent state.
+
+        The JS state is converted once and then kept in sync by ``set_state``;
+        it is re-converted only after :meth:`invalidate_state` or when the
+        bridge reports a state update made elsewhere (e.g. by a client). JS
+        agents without the bridge's ``pythonStateVersion`` are re-converted on
+        every read. Treat the returned dict as read-only.
+        """
+
+        version = getattr(self._js_agent, "pythonStateVersion", None)
+        # Without a bridge version (JS agents not made by ``createAgent``)
+        # there is no way to tell whether the state changed: stay live.
+        if self._state_cache is None or version is None or version != self._state_version:
+            self._load_state(self._js_agent.state, version)
+        else:
+            self._state_hits += 1
+        return self._state_cache
+
+    def _load_state(self, raw: Any, version: Any) -> None:
+        converted = to_py(raw)
+        if converted is raw and isinstance(raw, dict):
+            converted = dict(raw)
+        if converted is None:
+            converted = {}
+        if isinstance(converted, dict):
+            self._decode_values(converted)
+        if self._pending_state and isinstance(converted, dict):
+            # Inside ``batch_state()`` reads see the merged, unflushed view.
+            converted.update(self._pending_state)
+        self._state_cache = converted
+        self._state_version = version
+        self._state_conversions += 1
+
+    def invalidate_state(self) -> None:
+        """Drop the state mirror so the next read re-converts the JS state."""
+
+        self._state_cache = None
+
+    def on_state_update(self, state: Any, source: Any = None) -> None:
+        """Refresh the state mirror from a JS ``onStateUpdate(state, source)`` hook."""
+
+        self._load_state(state, getattr(self._js_agent, "pythonStateVersion", None))
+
+    def state_cache_stats(self) -> dict[str, int]:
+        """Return how often the state mirror was (re)built vs served from cache."""
+
+        return {
+            "conversions": self._state_conversions,
+            "conversions_avoided": self._state_hits,
+        }
+
+    def _apply_to_state_cache(self, patch: dict[str, Any]) -> None:
+        if isinstance(self._state_cache, dict):
+            self._state_cache.update(patch)
+
+    @property
+    def kv(self) -> KeyedState:
+        """Keyed state stored one storage entry per key; see :class:`~python_agents.kv.KeyedState`.
+
+        Use it for large or fast-growing data (conversation history, per-user
+        maps) where :meth:`set_state` would rewrite and broadcast the whole
+        object on every change.
+        """
+
+        if self._kv is None:
+            from .kv import KeyedState
+
+            self._kv = KeyedState(self)
+        return self._kv
+
+    @property
+    def mcp_clients(self) -> McpClientPool:
+        """The isolate-wide MCP client pool (:func:`~python_agents.get_mcp_client_pool`).
+
+        Unlike :meth:`add_mcp_server`, which has the JS SDK connect for this
+        agent, servers added here keep their session and cached catalogs for
+        every agent woken in the same isolate.
+        """
+
+        from .mcp_client import get_mcp_client_pool
+
+        return get_mcp_client_pool()
 
     @property
     def env(self) -> Any:
@@ -69,33 +307,520 @@ class Agent:
     async def call(self, method: str, *args: Any) -> Any:
         """Call a JS agent method by snake_case name or raw JS name."""
 
-        js_method_name = snake_to_camel(method) if "_" in method else method
-        target = getattr(self._js_agent, js_method_name)
-        result = target(*args)
+        target = self._js_methods.get(method)
+        if target is None:
+            target = getattr(self._js_agent, js_method_name(method))
+            self._js_methods[method] = target
+        if instrumentation.hooks:
+            return await instrumentation.observe_js_call("agent", method, target, args, to_js)
+        js_args = convert_args(args, to_js)
+        result = target(*js_args)
         return await maybe_await(result)
 
-    def __getattr__(self, name: str):
-        if name not in self._KNOWN_METHODS:
-            raise AttributeError(name)
+    async def set_state(self, patch: Any) -> Any:
+        """Call the JS agent's ``setState`` method.
+
+        Inside :meth:`batch_state` the patch is merged into a Python-side buffer
+        instead and ``None`` is returned; the merged patch is written by a single
+        ``setState`` call when the batch ends or :meth:`flush_state` is awaited.
+        """
+
+        if self._pending_state is None:
+            return await self._write_state(patch)
+        patch = to_py(patch)
+        self._pending_state.update(patch)
+        self._apply_to_state_cache(patch)
+        return None
+
+    async def flush_state(self) -> Any:
+        """Write any buffered ``set_state`` patches with one ``setState`` call."""
+
+        pending = self._pending_state
+        if not pending:
+            return None
+        self._pending_state = {}
+        return await self._write_state(pending)
+
+    async def _write_state(self, patch: Any) -> Any:
+        version = getattr(self._js_agent, "pythonStateVersion", None)
+        in_sync = version is not None and version == self._state_version
+        result = await self.call("set_state", self._encode_state(patch))
+        if self._state_cache is None:
+            return result
+        if in_sync:
+            # Our own write bumps the bridge's state version; fold the patch
+            # into the mirror instead of re-converting the whole state.
+            self._apply_to_state_cache(to_py(patch))
+            self._state_version = getattr(self._js_agent, "pythonStateVersion", None)
+        else:
+            self.invalidate_state()
+        return result
+
+    @asynccontextmanager
+    async def batch_state(self) -> AsyncIterator[Agent]:
+        """Coalesce ``set_state`` calls made inside the block into one write.
+
+        Successive patches are shallow-merged in Python. Batches nest; the
+        outermost block flushes on exit, including when the block raises, so
+        writes made before an error are kept just as they would be unbatched.
+        """
+
+        if self._batch_depth == 0:
+            self._pending_state = {}
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                try:
+                    await self.flush_state()
+                finally:
+                    self._pending_state = None
+
+    async def broadcast(self, message: Any, *args: Any, coalesce: bool | float = False) -> Any:
+        """Call the JS agent's ``broadcast`` method, optionally coalesced.
+
+        With ``coalesce=True`` messages broadcast in the same event-loop tick
+        are sent together; a number coalesces everything broadcast within that
+        many seconds. Several coalesced messages go out as one
+        ``{"type": "cf_agent_batch", "messages": [...]}`` frame (unpacked by the
+        frontend helper in ``examples/agents-frontend``), a single one as-is.
+        Coalesced calls return ``None``; :meth:`flush_broadcasts` sends early.
+        """
+
+        if coalesce is False:
+            return await self.call("broadcast", message, *args)
+        if self._broadcasts and self._broadcasts[-1][0] == args:
+            self._broadcasts[-1][1].append(message)
+        else:
+            # Only messages with the same exclusions share a frame; groups
+            # keep their order.
+            self._broadcasts.append((args, [message]))
+        if self._broadcast_timer is None:
+            loop = asyncio.get_running_loop()
+            if coalesce is True:
+                self._broadcast_timer = loop.call_soon(self._start_broadcast_flush)
+            else:
+                self._broadcast_timer = loop.call_later(coalesce, self._start_broadcast_flush)
+        return None
+
+    def _start_broadcast_flush(self) -> None:
+        self._broadcast_timer = None
+        self._broadcast_task = asyncio.ensure_future(self.flush_broadcasts())
+
+    async def flush_broadcasts(self) -> None:
+        """Send coalesced broadcasts now, one frame per group of messages."""
+
+        if self._broadcast_timer is not None:
+            self._broadcast_timer.cancel()
+            self._broadcast_timer = None
+        pending, self._broadcasts = self._broadcasts, []
+        for args, messages in pending:
+            if len(messages) == 1:
+                await self.call("broadcast", messages[0], *args)
+            else:
+                await self.call("broadcast", {"type": "cf_agent_batch", "messages": messages}, *args)
+
+    async def set_state_sync(self, mode: str) -> None:
+        """Choose how state updates reach connected clients: ``"full"`` or ``"diff"``.
+
+        In ``"diff"`` mode the bridge sends each client a JSON-Patch against
+        the last state version that client acknowledged (full state when there
+        is none). Clients need the frontend helper in ``examples/agents-frontend``
+        to apply patches and send acks.
+        """
+
+        if mode not in ("full", "diff"):
+            raise ValueError("state sync mode must be 'full' or 'diff'")
+        sdk = get_agents_sdk()
+        await maybe_await(sdk.setStateSync(self._js_agent, mode))
+
+    async def queue(self, *args: Any) -> Any:
+        """Call the JS agent's ``queue`` method: ``queue(payload)`` or ``queue(callback, payload)``.
+
+        With a codec set (:meth:`use_codec`) the payload (last argument) is encoded.
+        """
+
+        if self._codec is not None and args:
+            args = (*args[:-1], self._encode(to_py(args[-1])))
+        return await self.call("queue", *args)
+
+    async def queue_many(self, payloads: Iterable[Any], callback: str | None = None) -> list[Any]:
+        """Queue many payloads with one bridge call; returns the new queue ids.
+
+        With ``callback`` each payload is queued as ``queue(callback, payload)``,
+        otherwise as ``queue(payload)``.
+        """
+
+        sdk = get_agents_sdk()
+        if self._codec is not None:
+            payloads = [self._encode(payload) for payload in payloads]
+        result = sdk.queueMany(self._js_agent, to_js(list(payloads)), callback)
+        return to_py(await maybe_await(result))
+
+    async def dequeue_many(self, ids: Iterable[Any]) -> Any:
+        """Remove many queue items by id with one bridge call."""
 
-        async def _method(*args: Any):
-            return await self.call(name, *args)
+        sdk = get_agents_sdk()
+        result = sdk.dequeueMany(self._js_agent, to_js(list(ids)))
+        return to_py(await maybe_await(result))
+
+    async def queue_depth(self) -> int:
+        """Return the number of pending queue items, counted in JS with one bridge call."""
 
-        return _method
+        sdk = get_agents_sdk()
+        return int(await maybe_await(sdk.queueDepth(self._js_agent)))
+
+    async def get_queue(
+        self,
+        *args: Any,
+        where: dict[str, Any] | None = None,
+        limit: int | None = None,
+    ) -> Any:
+        """Call the JS agent's ``getQueue`` method, optionally filtered in JS.
+
+        With ``where`` (payload field -> value equality) and/or ``limit`` the
+        queue is filtered on the JS side, so only matching items are converted
+        and returned to Python. Encoded payloads are decoded, and ``where`` can
+        only match the codec's plain fields.
+        """
+
+        if where is None and limit is None:
+            result = await self.call("get_queue", *args)
+            return self._decode_rows(result)
+        sdk = get_agents_sdk()
+        result = sdk.filterQueue(self._js_agent, to_js(where or {}), limit)
+        return self._decode_rows(await maybe_await(result))
+
+    async def schedule(
+        self, payload: Any, when: Any, *args: Any, key: str | None = None, dedupe: bool = False
+    ) -> Any:
+        """Call the JS agent's ``schedule`` method, optionally idempotently.
+
+        With ``key`` (or ``dedupe=True``, which derives the key from a hash of
+        the payload and ``when``) an existing schedule with the same key is
+        returned instead of creating a duplicate. Keyed payloads must be dicts;
+        the key is stored in them under ``"_schedule_key"``.
+        """
+
+        return await self._create_schedule("schedule", payload, when, args, key, dedupe)
+
+    async def schedule_every(
+        self, payload: Any, interval: Any, *args: Any, key: str | None = None, dedupe: bool = False
+    ) -> Any:
+        """Call the JS agent's ``scheduleEvery`` method; see :meth:`schedule` for ``key``."""
+
+        return await self._create_schedule("schedule_every", payload, interval, args, key, dedupe)
+
+    async def schedule_many(self, specs: Iterable[dict[str, Any]]) -> list[Any]:
+        """Create many schedules with one bridge call; returns them in order.
+
+        Each spec is ``{"payload": ..., "when": ...}`` for a one-shot schedule or
+        ``{"payload": ..., "every": ...}`` for an interval, with optional
+        ``"key"`` / ``"dedupe"``. Keyed specs that already exist (or repeat
+        within the batch) are not created again.
+        """
+
+        prepared: list[tuple[dict[str, Any], Any, str | None]] = []
+        for spec in specs:
+            every = spec.get("every")
+            if every is not None:
+                method, when, job = "schedule_every", every, {"every": every}
+            else:
+                method, when, job = "schedule", spec["when"], {"when": spec["when"]}
+            payload, key = _keyed_payload(
+                method, spec["payload"], when, spec.get("key"), spec.get("dedupe", False)
+            )
+            prepared.append((job, payload, key))
+
+        results: list[Any] = [None] * len(prepared)
+        jobs: list[dict[str, Any]] = []
+        job_positions: list[int] = []
+        aliases: list[tuple[int, int]] = []
+        batch_keys: dict[str, int] = {}
+        async with self._schedule_keys(key for _, _, key in prepared if key is not None):
+            for position, (job, payload, key) in enumerate(prepared):
+                if key is not None:
+                    if key in batch_keys:
+                        aliases.append((position, batch_keys[key]))
+                        continue
+                    existing = await self._live_schedule(key)
+                    if existing is not None:
+                        results[position] = existing
+                        continue
+                    batch_keys[key] = position
+                job["payload"] = self._encode(payload)
+                jobs.append(job)
+                job_positions.append(position)
+
+            if jobs:
+                sdk = get_agents_sdk()
+                created = await maybe_await(sdk.scheduleMany(self._js_agent, to_js(jobs)))
+                created = self._decode_rows(created)
+                for position, row in zip(job_positions, created):
+                    results[position] = row
+                    if self._schedule_index is not None:
+                        self._schedule_index.add(row)
+        for position, source in aliases:
+            results[position] = results[source]
+        return results
+
+    async def get_schedules(self, *args: Any) -> Any:
+        """Call the JS agent's ``getSchedules`` method.
+
+        An unfiltered listing also rebuilds the Python schedule index used by
+        keyed scheduling, :meth:`find_schedules` and :meth:`cancel_schedules`.
+        """
+
+        result = self._decode_rows(await self.call("get_schedules", *args))
+        if not args:
+            self._schedule_index = _ScheduleIndex(to_py(result))
+        return result
+
+    async def cancel_schedule(self, schedule_id: Any, *args: Any) -> Any:
+        """Call the JS agent's ``cancelSchedule`` method."""
+
+        result = await self.call("cancel_schedule", schedule_id, *args)
+        if self._schedule_index is not None:
+            self._schedule_index.remove(schedule_id)
+        return result
+
+    async def find_schedules(self, *, key: str | None = None, type: Any = None) -> list[Any]:
+        """Return indexed schedules by key and/or payload ``type`` without a full listing.
+
+        The index is built by the first call that needs it (one
+        ``getSchedules``) and then kept up to date by this wrapper's schedule
+        methods. Call :meth:`invalidate_schedules` after schedules are changed
+        elsewhere, for example by JS code or another wrapper.
+        """
+
+        index = await self._schedules()
+        return index.find(key, type)
+
+    async def cancel_schedules(self, *, key: str | None = None, type: Any = None) -> list[Any]:
+        """Cancel indexed schedules matching ``key`` and/or ``type`` with one bridge call.
+
+        Returns the ids that were actually cancelled.
+        """
+
+        index = await self._schedules()
+        ids = [row["id"] for row in index.find(key, type)]
+        if not ids:
+            return []
+        sdk = get_agents_sdk()
+        cancelled = to_py(await maybe_await(sdk.cancelSchedules(self._js_agent, to_js(ids))))
+        for schedule_id in ids:
+            index.remove(schedule_id)
+        # Entries whose one-shot schedule already fired report ``False``.
+        return [schedule_id for schedule_id, ok in zip(ids, cancelled) if ok]
+
+    def invalidate_schedules(self) -> None:
+        """Drop the schedule index so the next keyed lookup re-lists schedules."""
+
+        self._schedule_index = None
+
+    async def _schedules(self) -> _ScheduleIndex:
+        if self._schedule_index is None:
+            await self.get_schedules()
+        return self._schedule_index
+
+    @asynccontextmanager
+    async def _schedule_keys(self, keys: Iterable[str]) -> AsyncIterator[None]:
+        # Holds this agent's lock for each schedule key, so concurrent keyed
+        # calls check and create one at a time. Sorted, so batches cannot deadlock.
+        held: list[tuple[tuple[int, str], list[Any]]] = []
+        try:
+            for key in sorted(set(keys)):
+                name = (id(self._js_agent), key)
+                slot = _schedule_locks.setdefault(name, [asyncio.Lock(), 0])
+                slot[1] += 1
+                try:
+                    await slot[0].acquire()
+                except BaseException:
+                    _drop_schedule_lock(name, slot)
+                    raise
+                held.append((name, slot))
+            yield
+        finally:
+            for name, slot in reversed(held):
+                slot[0].release()
+                _drop_schedule_lock(name, slot)
+
+    async def _live_schedule(self, key: str) -> Any:
+        index = await self._schedules()
+        row = index.by_key.get(key)
+        if row is None or row.get("type") in _RECURRING_SCHEDULES:
+            return row
+        # One-shot schedules disappear once they fire; confirm this one is
+        # still pending with a point lookup rather than a full listing.
+        current = self._decode_row(await self.call("get_schedule", row["id"]))
+        if current is None:
+            index.remove(row["id"])
+        return current
+
+    async def _create_schedule(
+        self,
+        method: str,
+        payload: Any,
+        when: Any,
+        args: tuple[Any, ...],
+        key: str | None,
+        dedupe: bool,
+    ) -> Any:
+        payload, key = _keyed_payload(method, payload, when, key, dedupe)
+        if self._codec is not None:
+            payload = self._encode(to_py(payload))
+        if key is None:
+            result = self._decode_row(await self.call(method, payload, when, *args))
+            if self._schedule_index is not None:
+                self._schedule_index.add(to_py(result))
+            return result
+        async with self._schedule_keys((key,)):
+            existing = await self._live_schedule(key)
+            if existing is not None:
+                return existing
+            row = self._decode_row(await self.call(method, payload, when, *args))
+            self._schedule_index.add(row)
+            return row
+
+
+SCHEDULE_KEY_FIELD = "_schedule_key"
+
+# Values a codec encodes; scalars are left readable.
+_ENCODED_TYPES = (dict, list, tuple, bytes, bytearray, memoryview)
+
+_RECURRING_SCHEDULES = frozenset({"interval", "cron"})
+
+# (id of the JS agent, schedule key) -> [lock, holders and waiters].
+_schedule_locks: dict[tuple[int, str], list[Any]] = {}
+
+
+def _drop_schedule_lock(name: tuple[int, str], slot: list[Any]) -> None:
+    slot[1] -= 1
+    if not slot[1] and _schedule_locks.get(name) is slot:
+        del _schedule_locks[name]
+
+
+def _keyed_payload(
+    method: str, payload: Any, when: Any, key: str | None, dedupe: bool
+) -> tuple[Any, str | None]:
+    if key is None and not dedupe:
+        return payload, None
+    payload = to_py(payload)
+    if not isinstance(payload, dict):
+        raise TypeError("Keyed schedules need a dict payload")
+    payload = {name: value for name, value in payload.items() if name != SCHEDULE_KEY_FIELD}
+    if key is None:
+        import hashlib
+        import json
+
+        encoded = json.dumps(
+            [method, payload, when], sort_keys=True, separators=(",", ":"), default=str
+        )
+        key = "sha:" + hashlib.blake2b(encoded.encode(), digest_size=12).hexdigest()
+    payload[SCHEDULE_KEY_FIELD] = key
+    return payload, key
+
+
+class _ScheduleIndex:
+    """Schedules by id, by ``_schedule_key`` and by payload ``type``."""
+
+    __slots__ = ("by_key", "by_type", "rows")
+
+    def __init__(self, rows: Any = None):
+        self.rows: dict[Any, dict[str, Any]] = {}
+        self.by_key: dict[str, dict[str, Any]] = {}
+        self.by_type: dict[Any, dict[Any, None]] = {}
+        for row in rows or ():
+            self.add(row)
+
+    def add(self, row: Any) -> None:
+        if not isinstance(row, dict) or row.get("id") is None:
+            return
+        self.remove(row["id"])
+        self.rows[row["id"]] = row
+        payload = row.get("payload")
+        if not isinstance(payload, dict):
+            return
+        key = payload.get(SCHEDULE_KEY_FIELD)
+        if key is not None:
+            self.by_key[key] = row
+        kind = payload.get("type")
+        if kind is not None:
+            self.by_type.setdefault(kind, {})[row["id"]] = None
+
+    def remove(self, schedule_id: Any) -> None:
+        row = self.rows.pop(schedule_id, None)
+        if row is None:
+            return
+        payload = row.get("payload")
+        if not isinstance(payload, dict):
+            return
+        key = payload.get(SCHEDULE_KEY_FIELD)
+        if key is not None and self.by_key.get(key) is row:
+            del self.by_key[key]
+        ids = self.by_type.get(payload.get("type"))
+        if ids is not None:
+            ids.pop(schedule_id, None)
+            if not ids:
+                del self.by_type[payload.get("type")]
+
+    def find(self, key: str | None = None, kind: Any = None) -> list[dict[str, Any]]:
+        if key is not None:
+            row = self.by_key.get(key)
+            rows = [] if row is None else [row]
+        elif kind is not None:
+            return [self.rows[schedule_id] for schedule_id in self.by_type.get(kind, ())]
+        else:
+            return list(self.rows.values())
+        if kind is not None:
+            rows = [row for row in rows if row["payload"].get("type") == kind]
+        return rows
+
+
+def _known_method(name: str, owner: str = "Agent") -> Callable[..., Any]:
+    async def _method(self: Agent, *args: Any) -> Any:
+        return await self.call(name, *args)
+
+    _method.__name__ = name
+    _method.__qualname__ = f"{owner}.{name}"
+    _method.__doc__ = f"Call the JS agent's ``{js_method_name(name)}`` method."
+    return _method
+
+
+# Generate the known passthrough methods once as real class attributes so hot
+# loops skip ``__getattr__`` and per-call closure allocation. Methods defined
+# explicitly on ``Agent`` take precedence; subclasses get theirs in
+# ``Agent.__init_subclass__``.
+for _name in sorted(Agent._KNOWN_METHODS):
+    if _name not in Agent.__dict__:
+        setattr(Agent, _name, _known_method(_name))
+del _name
 
 
 def callable(
     func: Callable[..., Any] | None = None,
     *,
     name: str | None = None,
+    cache: ResultCache | bool | None = None,
+    single_flight: bool = False,
 ) -> Callable[..., Any]:
     """Mark an instance method as remotely callable by name.
 
     This decorator is intentionally lightweight and framework-agnostic: it stores
     metadata on the wrapped function so routing/dispatch layers can discover
     methods and expose them as callable Agent endpoints.
+
+    ``cache=True`` (or a :class:`ResultCache`) memoizes results per instance
+    for :func:`call_callable`; use it only for pure methods. With
+    ``single_flight=True`` concurrent calls on one instance with equal
+    arguments share a single execution and its result or exception.
     """
 
+    results = result_cache(cache)
+    flights = flight_group(single_flight)
+
     def _decorate(inner: Callable[..., Any]) -> Callable[..., Any]:
         exposed_name = name or inner.__name__
 
@@ -103,8 +828,13 @@ def callable(
         def _wrapped(*args: Any, **kwargs: Any):
             return inner(*args, **kwargs)
 
-        setattr(_wrapped, "__python_agents_callable__", True)
-        setattr(_wrapped, "__python_agents_callable_name__", exposed_name)
+        _wrapped.__python_agents_callable__ = True
+        _wrapped.__python_agents_callable_name__ = exposed_name
+        if results is not None:
+            _wrapped.__python_agents_cache__ = results
+            _wrapped.__python_agents_cache_name__ = exposed_name
+        if flights is not None:
+            _wrapped.__python_agents_single_flight__ = flights
         return _wrapped
 
     if func is None:
@@ -112,23 +842,29 @@ def callable(
     return _decorate(func)
 
 
+def _callable_registry(obj: Any) -> dict[str, str]:
+    return method_registry(
+        type(obj), "__python_agents_callable__", "__python_agents_callable_name__"
+    )
+
+
 def get_callable_methods(obj: Any) -> dict[str, Callable[..., Any]]:
     """Return callable-method name -> bound method for an object instance."""
 
-    methods: dict[str, Callable[..., Any]] = {}
-    for attr_name in dir(obj):
-        candidate = getattr(obj, attr_name, None)
-        if builtins.callable(candidate) and getattr(candidate, "__python_agents_callable__", False):
-            name = getattr(candidate, "__python_agents_callable_name__", attr_name)
-            methods[name] = candidate
-    return methods
+    return bind_methods(obj, _callable_registry(obj))
 
 
 async def call_callable(obj: Any, name: str, *args: Any, **kwargs: Any) -> Any:
     """Invoke a ``@callable`` method by exposed name."""
 
-    methods = get_callable_methods(obj)
-    if name not in methods:
+    attr_name = _callable_registry(obj).get(name)
+    if attr_name is None:
         raise KeyError(f"No callable method named '{name}'")
-    result = methods[name](*args, **kwargs)
+    method = dispatcher(obj, name, getattr(obj, attr_name))
+    if instrumentation.hooks:
+        return await instrumentation.observe(
+            "callable", name, (args, kwargs), lambda: method(*args, **kwargs)
+        )
+    result = method(*args, **kwargs)
     return await maybe_await(result)
+
@@ -1,15 +1,23 @@
 from __future__ import annotations
 
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
-from ._ffi import get_agents_sdk, maybe_await, snake_to_camel, to_js
+from . import instrumentation
+from ._ffi import convert_args, get_agents_sdk, js_method_name, maybe_await, to_js
+
+if TYPE_CHECKING:
+    from .workflows import WorkflowSteps
 
 
 class _JSProxy:
     """Snake-case adapter for JavaScript SDK objects."""
 
+    __slots__ = ("_js_methods", "_js_object", "_py_methods")
+
     def __init__(self, js_object: Any):
         self._js_object = js_object
+        self._js_methods: dict[str, Any] = {}
+        self._py_methods: dict[str, Any] = {}
 
     @property
     def state(self) -> Any:
@@ -24,9 +32,15 @@ class _JSProxy:
         return getattr(self._js_object, "ctx", None)
 
     async def call(self, method: str, *args: Any) -> Any:
-        js_method_name = snake_to_camel(method) if "_" in method else method
-        target = getattr(self._js_object, js_method_name)
-        js_args = tuple(to_js(arg) if isinstance(arg, dict | list | tuple) else arg for arg in args)
+        target = self._js_methods.get(method)
+        if target is None:
+            target = getattr(self._js_object, js_method_name(method))
+            self._js_methods[method] = target
+        if instrumentation.hooks:
+            return await instrumentation.observe_js_call(
+                "proxy", f"{type(self).__name__}.{method}", target, args, to_js
+            )
+        js_args = convert_args(args, to_js)
         result = target(*js_args)
         return await maybe_await(result)
 
@@ -34,17 +48,23 @@ class _JSProxy:
         if name.startswith("_"):
             raise AttributeError(name)
 
-        async def _method(*args: Any):
-            return await self.call(name, *args)
+        method = self._py_methods.get(name)
+        if method is None:
+
+            async def method(*args: Any):
+                return await self.call(name, *args)
 
-        return _method
+            self._py_methods[name] = method
+        return method
 
 
 class McpAgent(_JSProxy):
     """Pythonic wrapper around Cloudflare's JavaScript `McpAgent`."""
 
+    __slots__ = ()
+
     @classmethod
-    def create(cls, state: dict[str, Any] | None = None, env: Any = None, ctx: Any = None) -> "McpAgent":
+    def create(cls, state: dict[str, Any] | None = None, env: Any = None, ctx: Any = None) -> McpAgent:
         sdk = get_agents_sdk()
         init = {"state": state or {}}
         if env is not None:
@@ -59,18 +79,44 @@ class McpAgent(_JSProxy):
 class AgentWorkflow(_JSProxy):
     """Pythonic wrapper around Cloudflare's JavaScript `AgentWorkflow`."""
 
+    __slots__ = ()
+
     @classmethod
-    def create(cls, init: dict[str, Any] | None = None) -> "AgentWorkflow":
+    def create(cls, init: dict[str, Any] | None = None) -> AgentWorkflow:
         sdk = get_agents_sdk()
         js_workflow = sdk.createAgentWorkflow(to_js(init or {}))
         return cls(js_workflow)
 
+    def steps(
+        self, storage: Any = None, *, instance_id: str | None = None, concurrency: int = 4
+    ) -> WorkflowSteps:
+        """Return a :class:`~python_agents.workflows.WorkflowSteps` for this run.
+
+        Checkpoints go to ``storage`` (for example the owning agent's
+        ``ctx.storage``), else this workflow's ``ctx.storage`` when it has one,
+        else isolate memory shared by every run of the same workflow instance
+        (``instance_id``, or the JS workflow's ``instanceId``). Isolate memory
+        does not survive a restart; without storage or an instance id this
+        raises ``ValueError``.
+        """
+
+        from .workflows import WorkflowSteps, isolate_checkpoints
+
+        if storage is None:
+            storage = getattr(self.ctx, "storage", None)
+        if storage is None:
+            instance_id = instance_id or getattr(self._js_object, "instanceId", None)
+            if instance_id is None:
+                raise ValueError("pass storage= or instance_id= to checkpoint workflow steps")
+            storage = isolate_checkpoints(str(instance_id))
+        return WorkflowSteps(storage, concurrency=concurrency)
+
 
 def create_mcp_handler(*args: Any) -> Any:
     """Pythonic equivalent of JavaScript `createMcpHandler`."""
 
     sdk = get_agents_sdk()
-    js_args = tuple(to_js(arg) if isinstance(arg, dict | list | tuple) else arg for arg in args)
+    js_args = convert_args(args, to_js)
     return sdk.createMcpHandler(*js_args)
 
 
@@ -78,7 +124,7 @@ async def route_agent_email(*args: Any) -> Any:
     """Pythonic equivalent of JavaScript `routeAgentEmail`."""
 
     sdk = get_agents_sdk()
-    js_args = tuple(to_js(arg) if isinstance(arg, dict | list | tuple) else arg for arg in args)
+    js_args = convert_args(args, to_js)
     return await maybe_await(sdk.routeAgentEmail(*js_args))
 
 
@@ -86,5 +132,5 @@ def create_address_based_email_resolver(*args: Any) -> Any:
     """Pythonic equivalent of JavaScript `createAddressBasedEmailResolver`."""
 
     sdk = get_agents_sdk()
-    js_args = tuple(to_js(arg) if isinstance(arg, dict | list | tuple) else arg for arg in args)
+    js_args = convert_args(args, to_js)
     return sdk.createAddressBasedEmailResolver(*js_args)
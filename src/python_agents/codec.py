@@ -0,0 +1,323 @@
+"""Compact payload codecs for agent state, queue and schedule payloads.
+
+A codec turns a JSON-like value into bytes and back. :class:`Agent
+<python_agents.Agent>` stores encoded values as an envelope
+``{"__python_agents_codec__": <name>, "data": <base64>}`` so they survive
+the SDK's JSON persistence, and decodes envelopes transparently when reading,
+whether or not a codec is currently set.
+
+Built in: :class:`JsonCodec`, :class:`MsgpackCodec` (a pure-Python
+MessagePack implementation; no native dependency is available in Workers) and
+:class:`CompressedCodec`, which zlib-compresses another codec's output above a
+size threshold. Only the compressed variants (``"json+zlib"``,
+``"msgpack+zlib"``) can be selected by name: after base64, an uncompressed
+encoding is larger than the plain JSON it replaces.
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+import struct
+import zlib
+from typing import Any, Protocol
+
+# Namespaced so application data with a "_codec" key is never taken for an envelope.
+ENVELOPE_FIELD = "__python_agents_codec__"
+
+
+class Codec(Protocol):
+    name: str
+
+    def encode(self, value: Any) -> bytes: ...
+
+    def decode(self, data: bytes) -> Any: ...
+
+
+# -- MessagePack ---------------------------------------------------------
+
+_pack_double = struct.Struct(">Bd").pack
+
+
+def _pack(value: Any, out: bytearray) -> None:
+    if value is None:
+        out.append(0xC0)
+    elif value is True:
+        out.append(0xC3)
+    elif value is False:
+        out.append(0xC2)
+    elif isinstance(value, int):
+        if 0 <= value < 0x80:
+            out.append(value)
+        elif -0x20 <= value < 0:
+            out.append(value & 0xFF)
+        elif value >= 0:
+            if value <= 0xFF:
+                out += struct.pack(">BB", 0xCC, value)
+            elif value <= 0xFFFF:
+                out += struct.pack(">BH", 0xCD, value)
+            elif value <= 0xFFFFFFFF:
+                out += struct.pack(">BI", 0xCE, value)
+            elif value <= 0xFFFFFFFFFFFFFFFF:
+                out += struct.pack(">BQ", 0xCF, value)
+            else:
+                raise OverflowError("int too large for MessagePack")
+        elif value >= -0x80:
+            out += struct.pack(">Bb", 0xD0, value)
+        elif value >= -0x8000:
+            out += struct.pack(">Bh", 0xD1, value)
+        elif value >= -0x80000000:
+            out += struct.pack(">Bi", 0xD2, value)
+        elif value >= -0x8000000000000000:
+            out += struct.pack(">Bq", 0xD3, value)
+        else:
+            raise OverflowError("int too large for MessagePack")
+    elif isinstance(value, float):
+        out += _pack_double(0xCB, value)
+    elif isinstance(value, str):
+        data = value.encode()
+        size = len(data)
+        if size < 0x20:
+            out.append(0xA0 | size)
+        elif size <= 0xFF:
+            out += struct.pack(">BB", 0xD9, size)
+        elif size <= 0xFFFF:
+            out += struct.pack(">BH", 0xDA, size)
+        else:
+            out += struct.pack(">BI", 0xDB, size)
+        out += data
+    elif isinstance(value, dict):
+        size = len(value)
+        if size < 0x10:
+            out.append(0x80 | size)
+        elif size <= 0xFFFF:
+            out += struct.pack(">BH", 0xDE, size)
+        else:
+            out += struct.pack(">BI", 0xDF, size)
+        for key, item in value.items():
+            _pack(key, out)
+            _pack(item, out)
+    elif isinstance(value, list | tuple):
+        size = len(value)
+        if size < 0x10:
+            out.append(0x90 | size)
+        elif size <= 0xFFFF:
+            out += struct.pack(">BH", 0xDC, size)
+        else:
+            out += struct.pack(">BI", 0xDD, size)
+        for item in value:
+            _pack(item, out)
+    elif isinstance(value, bytes | bytearray | memoryview):
+        data = bytes(value)
+        size = len(data)
+        if size <= 0xFF:
+            out += struct.pack(">BB", 0xC4, size)
+        elif size <= 0xFFFF:
+            out += struct.pack(">BH", 0xC5, size)
+        else:
+            out += struct.pack(">BI", 0xC6, size)
+        out += data
+    else:
+        raise TypeError(f"Cannot MessagePack-encode {type(value).__name__}")
+
+
+def packb(value: Any) -> bytes:
+    """Encode ``value`` as MessagePack (tuples become arrays)."""
+
+    out = bytearray()
+    _pack(value, out)
+    return bytes(out)
+
+
+# Fixed-width types: tag -> (struct format, size).
+_FIXED = {
+    0xCA: (struct.Struct(">f"), 4),
+    0xCB: (struct.Struct(">d"), 8),
+    0xCC: (struct.Struct(">B"), 1),
+    0xCD: (struct.Struct(">H"), 2),
+    0xCE: (struct.Struct(">I"), 4),
+    0xCF: (struct.Struct(">Q"), 8),
+    0xD0: (struct.Struct(">b"), 1),
+    0xD1: (struct.Struct(">h"), 2),
+    0xD2: (struct.Struct(">i"), 4),
+    0xD3: (struct.Struct(">q"), 8),
+}
+# Length-prefixed types: tag -> (kind, length format, length size).
+_SIZED = {
+    0xD9: ("str", ">B", 1),
+    0xDA: ("str", ">H", 2),
+    0xDB: ("str", ">I", 4),
+    0xC4: ("bin", ">B", 1),
+    0xC5: ("bin", ">H", 2),
+    0xC6: ("bin", ">I", 4),
+    0xDC: ("array", ">H", 2),
+    0xDD: ("array", ">I", 4),
+    0xDE: ("map", ">H", 2),
+    0xDF: ("map", ">I", 4),
+}
+
+
+def _unpack(data: bytes, pos: int) -> tuple[Any, int]:
+    tag = data[pos]
+    pos += 1
+    if tag < 0x80:
+        return tag, pos
+    if tag >= 0xE0:
+        return tag - 0x100, pos
+    if 0xA0 <= tag <= 0xBF:
+        end = pos + (tag & 0x1F)
+        return data[pos:end].decode(), end
+    if 0x90 <= tag <= 0x9F:
+        kind, size = "array", tag & 0x0F
+    elif 0x80 <= tag <= 0x8F:
+        kind, size = "map", tag & 0x0F
+    elif tag == 0xC0:
+        return None, pos
+    elif tag == 0xC2:
+        return False, pos
+    elif tag == 0xC3:
+        return True, pos
+    elif tag in _FIXED:
+        fmt, width = _FIXED[tag]
+        return fmt.unpack_from(data, pos)[0], pos + width
+    elif tag in _SIZED:
+        kind, length_format, width = _SIZED[tag]
+        (size,) = struct.unpack_from(length_format, data, pos)
+        pos += width
+    else:
+        raise ValueError(f"Unsupported MessagePack type 0x{tag:02x}")
+
+    if kind == "str":
+        return data[pos : pos + size].decode(), pos + size
+    if kind == "bin":
+        return data[pos : pos + size], pos + size
+    if kind == "array":
+        items = []
+        for _ in range(size):
+            item, pos = _unpack(data, pos)
+            items.append(item)
+        return items, pos
+    mapping = {}
+    for _ in range(size):
+        key, pos = _unpack(data, pos)
+        mapping[key], pos = _unpack(data, pos)
+    return mapping, pos
+
+
+def unpackb(data: bytes | bytearray | memoryview) -> Any:
+    """Decode one MessagePack value."""
+
+    data = bytes(data)
+    value, end = _unpack(data, 0)
+    if end != len(data):
+        raise ValueError("Extra data after MessagePack value")
+    return value
+
+
+# -- codecs --------------------------------------------------------------
+
+
+class JsonCodec:
+    """Compact JSON (UTF-8) codec."""
+
+    name = "json"
+
+    def encode(self, value: Any) -> bytes:
+        return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode()
+
+    def decode(self, data: bytes) -> Any:
+        return json.loads(bytes(data))
+
+
+class MsgpackCodec:
+    """Pure-Python MessagePack codec (see :func:`packb` / :func:`unpackb`)."""
+
+    name = "msgpack"
+
+    def encode(self, value: Any) -> bytes:
+        return packb(value)
+
+    def decode(self, data: bytes) -> Any:
+        return unpackb(data)
+
+
+class CompressedCodec:
+    """Wrap ``inner`` and zlib-compress encodings of at least ``threshold`` bytes."""
+
+    def __init__(self, inner: Codec, threshold: int = 512, level: int = 6):
+        self.inner = inner
+        self.threshold = threshold
+        self.level = level
+        self.name = f"{inner.name}+zlib"
+
+    def encode(self, value: Any) -> bytes:
+        data = self.inner.encode(value)
+        if len(data) < self.threshold:
+            return b"\x00" + data
+        return b"\x01" + zlib.compress(data, self.level)
+
+    def decode(self, data: bytes) -> Any:
+        data = bytes(data)
+        body = data[1:]
+        return self.inner.decode(zlib.decompress(body) if data[:1] == b"\x01" else body)
+
+
+_BUILTIN = {
+    "json+zlib": lambda: CompressedCodec(JsonCodec()),
+    "msgpack+zlib": lambda: CompressedCodec(MsgpackCodec()),
+}
+# Envelopes written by a plain codec object passed directly stay readable.
+_READABLE = {**_BUILTIN, "json": JsonCodec, "msgpack": MsgpackCodec}
+
+
+def get_codec(codec: Codec | str) -> Codec:
+    """Return ``codec`` itself, or the built-in codec with that name."""
+
+    if not isinstance(codec, str):
+        return codec
+    factory = _BUILTIN.get(codec)
+    if factory is None:
+        hint = f"; use {codec + '+zlib'!r}" if codec in _READABLE else ""
+        raise ValueError(f"Unknown codec {codec!r}; expected one of {sorted(_BUILTIN)}{hint}")
+    return factory()
+
+
+# -- envelopes -----------------------------------------------------------
+
+
+def encode_envelope(codec: Codec, value: Any, plain_fields: tuple[str, ...] = ()) -> dict[str, Any]:
+    """Encode ``value`` into an envelope dict.
+
+    For dict values, ``plain_fields`` are also copied into the envelope
+    unencoded so JS-side filters (and schedule/queue indexes) can still see them.
+    """
+
+    envelope = {ENVELOPE_FIELD: codec.name, "data": base64.b64encode(codec.encode(value)).decode()}
+    if plain_fields and isinstance(value, dict):
+        for field in plain_fields:
+            if field in value:
+                envelope[field] = value[field]
+    return envelope
+
+
+def is_envelope(value: Any, codec: Codec | None = None) -> bool:
+    """Return whether ``value`` is an envelope that ``codec`` or a built-in codec can decode."""
+
+    if not isinstance(value, dict) or "data" not in value:
+        return False
+    name = value.get(ENVELOPE_FIELD)
+    if not isinstance(name, str):
+        return False
+    return name in _READABLE or (codec is not None and codec.name == name)
+
+
+def decode_envelope(codec: Codec | None, envelope: dict[str, Any]) -> Any:
+    """Decode an envelope with ``codec`` or, if its name differs, the built-in codec."""
+
+    name = envelope[ENVELOPE_FIELD]
+    if codec is None or codec.name != name:
+        factory = _READABLE.get(name)
+        if factory is None:
+            raise ValueError(f"Unknown codec {name!r} in envelope")
+        codec = factory()
+    return codec.decode(base64.b64decode(envelope["data"]))
@@ -0,0 +1,172 @@
+"""Python-side inbound email routing with a precompiled address index."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping
+from typing import Any, NamedTuple
+
+from ._ffi import convert_arg, get_agents_sdk, maybe_await
+
+
+class EmailTarget(NamedTuple):
+    """The agent an inbound message is delivered to."""
+
+    agent_name: str
+    agent_id: str
+
+
+class _Rule(NamedTuple):
+    agent_name: str | None
+    agent_id: str | None
+    # "local" / "sub": take the agent name from that part of the address,
+    # looked up in ``agents`` when given.
+    agent_from: str | None = None
+    agents: Mapping[str, str] | None = None
+
+
+_AGENT_FROM = ("local", "sub")
+
+
+def _parse_rule(target: Any) -> _Rule:
+    if isinstance(target, str):
+        return _Rule(target, None)
+    if isinstance(target, Mapping):
+        agent_from = target.get("agent_from")
+        if agent_from is None:
+            return _Rule(target["agent"], target.get("id"))
+        if agent_from not in _AGENT_FROM:
+            raise ValueError(f"agent_from must be one of {_AGENT_FROM}, not {agent_from!r}")
+        agents = target.get("agents")
+        if agents is not None:
+            agents = {name.lower(): agent for name, agent in agents.items()}
+        return _Rule(None, target.get("id"), agent_from, agents)
+    agent_name, agent_id = target
+    return _Rule(agent_name, agent_id)
+
+
+def _target(rule: _Rule, base: str, sub: str | None) -> EmailTarget | None:
+    if rule.agent_from is None:
+        return EmailTarget(rule.agent_name, rule.agent_id or (base if sub is None else sub))
+    if rule.agent_from == "local":
+        name, agent_id = base, sub
+    else:
+        name, agent_id = sub, base
+    if name is not None and rule.agents is not None:
+        name = rule.agents.get(name)
+    if not name:
+        return None
+    return EmailTarget(name, rule.agent_id or agent_id or base)
+
+
+def _normalize(address: str) -> str:
+    address = address.strip()
+    if address.endswith(">") and "<" in address:
+        # "Display Name <user@example.com>"
+        address = address[address.rindex("<") + 1 : -1]
+    return address.lower()
+
+
+class EmailRouter:
+    """Resolve inbound addresses to agents with dictionary lookups.
+
+    Rules map an address pattern to an agent name, an ``(agent name, id)``
+    pair, ``{"agent": ..., "id": ...}`` or ``{"agent_from": ...}``:
+
+    - ``"support@example.com"``: that exact address.
+    - ``"tickets+*@example.com"``: any plus-address of ``tickets``; ``*`` marks
+      that the sub-address (``tickets+1234@``) should become the agent id.
+      ``"tickets@example.com"`` rules also accept plus-addresses.
+    - ``"*@example.com"``: any address at that domain.
+    - ``"*@*.example.com"``: any address at a subdomain of ``example.com``.
+
+    Resolution tries, in order: the exact address, the address without its
+    sub-address, the domain, then each parent domain (longest first), then
+    ``default``. Every step is a dict lookup, so cost does not depend on the
+    number of rules. Unless a rule fixes the id, the agent id is the
+    sub-address when present and the local part otherwise. Patterns and
+    addresses are compared case-insensitively.
+
+    ``{"agent_from": "local"}`` takes the agent name from the local part and
+    the id from the sub-address, like the SDK's address-based resolver
+    (``chat+room7@`` is agent ``chat``, id ``room7``); ``{"agent_from": "sub"}``
+    takes the name from the sub-address and the id from the local part.
+    Derived names are lowercase; ``"agents": {"chat": "ChatAgent"}`` maps them
+    to agent names, and a name missing from ``agents`` (or a missing
+    sub-address) does not match, so ``default`` applies.
+    """
+
+    def __init__(
+        self,
+        rules: Mapping[str, Any] | Iterable[tuple[str, Any]] = (),
+        *,
+        default: Any = None,
+        separator: str = "+",
+    ):
+        self.separator = separator
+        self.default = None if default is None else _parse_rule(default)
+        self._addresses: dict[str, _Rule] = {}
+        self._domains: dict[str, _Rule] = {}
+        self._subdomains: dict[str, _Rule] = {}
+        items = rules.items() if isinstance(rules, Mapping) else rules
+        for pattern, target in items:
+            self.add(pattern, target)
+
+    def __len__(self) -> int:
+        return len(self._addresses) + len(self._domains) + len(self._subdomains)
+
+    def add(self, pattern: str, target: Any) -> None:
+        """Add or replace the rule for ``pattern``."""
+
+        rule = _parse_rule(target)
+        local, at, domain = _normalize(pattern).rpartition("@")
+        if not at or not domain:
+            raise ValueError(f"Invalid email rule pattern: {pattern!r}")
+        if local == "*":
+            if domain.startswith("*."):
+                self._subdomains[domain[2:]] = rule
+            else:
+                self._domains[domain] = rule
+            return
+        wildcard_sub = self.separator + "*"
+        local = local.removesuffix(wildcard_sub)
+        self._addresses[f"{local}@{domain}"] = rule
+
+    def resolve(self, address: str) -> EmailTarget | None:
+        """Return the target for ``address`` or ``None`` when no rule matches."""
+
+        address = _normalize(address)
+        local, _, domain = address.rpartition("@")
+        base, separator, sub = local.partition(self.separator)
+
+        rule = self._addresses.get(address)
+        if rule is None and separator:
+            rule = self._addresses.get(f"{base}@{domain}")
+        if rule is None:
+            rule = self._domains.get(domain)
+        if rule is None:
+            parent = domain
+            while rule is None and "." in parent:
+                parent = parent.partition(".")[2]
+                rule = self._subdomains.get(parent)
+        sub_address = sub if separator else None
+        target = None if rule is None else _target(rule, base, sub_address)
+        if target is None and self.default is not None and rule is not self.default:
+            target = _target(self.default, base, sub_address)
+        return target
+
+    async def route(self, message: Any, env: Any = None) -> Any:
+        """Resolve ``message.to`` in Python and deliver it through the SDK.
+
+        Only the resolved agent name and id cross into JS (the bridge's
+        ``routeResolvedEmail``). Returns ``None`` without calling the SDK when
+        no rule matches.
+        """
+
+        address = message.get("to") if isinstance(message, dict) else message.to
+        target = self.resolve(address)
+        if target is None:
+            return None
+        sdk = get_agents_sdk()
+        js_message = convert_arg(message)
+        result = sdk.routeResolvedEmail(js_message, env, target.agent_name, target.agent_id)
+        return await maybe_await(result)
@@ -0,0 +1,264 @@
+"""Instrumentation hooks around every Python <-> JS bridge crossing and dispatch.
+
+Instrumented entry points: ``Agent.call`` (kind ``"agent"``), ``_JSProxy.call``
+(``"proxy"``), SDK routing calls (``"sdk"``), ``call_callable``
+(``"callable"``), ``call_tool`` (``"tool"``) and handlers registered by
+``register_mcp_tools`` (``"mcp_tool"``). Each finished call produces one
+:class:`CallRecord` that is passed to every installed hook::
+
+    from python_agents import instrumentation
+
+    stats = instrumentation.InMemoryAggregator()
+    instrumentation.add_hook(stats)
+    ...
+    print(stats.dump())
+
+With no hooks installed the instrumented paths cost one tuple truth test.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from bisect import bisect_left
+from collections.abc import Callable
+from typing import Any, NamedTuple
+
+from ._ffi import JsonPayload, convert_args, maybe_await
+
+logger = logging.getLogger(__name__)
+
+
+class CallRecord(NamedTuple):
+    """One finished, instrumented call."""
+
+    kind: str
+    name: str
+    start_ns: int
+    duration: float
+    conversion: float
+    payload_bytes: int
+    error: BaseException | None
+
+
+Hook = Callable[[CallRecord], Any]
+
+# Checked on every instrumented call; keep it a tuple so the disabled check is
+# a single truth test.
+hooks: tuple[Hook, ...] = ()
+
+
+def add_hook(hook: Hook) -> Hook:
+    """Install ``hook``; it is called with a :class:`CallRecord` after each call."""
+
+    global hooks
+    hooks = (*hooks, hook)
+    return hook
+
+
+def remove_hook(hook: Hook) -> None:
+    global hooks
+    hooks = tuple(installed for installed in hooks if installed is not hook)
+
+
+def clear_hooks() -> None:
+    global hooks
+    hooks = ()
+
+
+def approx_size(value: Any, _depth: int = 0) -> int:
+    """Cheap estimate of a payload's serialized size in bytes."""
+
+    if value is None or isinstance(value, bool):
+        return 4
+    if isinstance(value, int | float):
+        return 8
+    if isinstance(value, str):
+        return len(value) + 2
+    if isinstance(value, bytes | bytearray | memoryview):
+        return len(value)
+    if _depth >= 8:
+        return 0
+    if isinstance(value, dict):
+        return 2 + sum(
+            approx_size(key, _depth + 1) + approx_size(item, _depth + 1) + 2
+            for key, item in value.items()
+        )
+    if isinstance(value, list | tuple | set):
+        return 2 + sum(approx_size(item, _depth + 1) + 1 for item in value)
+    if isinstance(value, JsonPayload):
+        return approx_size(value.value, _depth + 1)
+    return 0
+
+
+def _emit(record: CallRecord) -> None:
+    for hook in hooks:
+        try:
+            hook(record)
+        except Exception:
+            # Telemetry must never break the call it observes.
+            logger.exception("Instrumentation hook %r failed", hook)
+
+
+async def observe_js_call(
+    kind: str,
+    name: str,
+    target: Callable[..., Any],
+    args: tuple[Any, ...],
+    convert: Callable[[Any], Any],
+) -> Any:
+    """Convert ``args``, call the JS ``target`` and record timings."""
+
+    start_ns = time.time_ns()
+    started = time.perf_counter()
+    error: BaseException | None = None
+    conversion = 0.0
+    try:
+        js_args = convert_args(args, convert)
+        conversion = time.perf_counter() - started
+        return await maybe_await(target(*js_args))
+    except BaseException as raised:
+        error = raised
+        raise
+    finally:
+        _emit(
+            CallRecord(
+                kind,
+                name,
+                start_ns,
+                time.perf_counter() - started,
+                conversion,
+                approx_size(args),
+                error,
+            )
+        )
+
+
+async def observe(kind: str, name: str, payload: Any, call: Callable[[], Any]) -> Any:
+    """Run a Python-side dispatch ``call()`` and record its timing."""
+
+    start_ns = time.time_ns()
+    started = time.perf_counter()
+    error: BaseException | None = None
+    try:
+        return await maybe_await(call())
+    except BaseException as raised:
+        error = raised
+        raise
+    finally:
+        _emit(
+            CallRecord(kind, name, start_ns, time.perf_counter() - started, 0.0, approx_size(payload), error)
+        )
+
+
+# Histogram bucket upper bounds in seconds (10us .. 10s, roughly 1-2-5 steps).
+BUCKETS = tuple(
+    base * scale for scale in (1e-5, 1e-4, 1e-3, 1e-2, 1e-1, 1.0) for base in (1, 2, 5)
+) + (10.0,)
+
+
+class _Stats:
+    __slots__ = ("buckets", "conversion", "count", "errors", "max", "payload_bytes", "total")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.conversion = 0.0
+        self.payload_bytes = 0
+        self.max = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)
+
+    def quantile(self, q: float) -> float:
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.buckets):
+            seen += bucket_count
+            if seen >= rank and bucket_count:
+                return BUCKETS[index] if index < len(BUCKETS) else self.max
+        return 0.0
+
+
+class InMemoryAggregator:
+    """Hook that aggregates counts, latency histograms, conversion time and sizes."""
+
+    def __init__(self):
+        self._stats: dict[tuple[str, str], _Stats] = {}
+
+    def __call__(self, record: CallRecord) -> None:
+        stats = self._stats.get((record.kind, record.name))
+        if stats is None:
+            stats = self._stats[(record.kind, record.name)] = _Stats()
+        stats.count += 1
+        stats.errors += record.error is not None
+        stats.total += record.duration
+        stats.conversion += record.conversion
+        stats.payload_bytes += record.payload_bytes
+        stats.max = max(stats.max, record.duration)
+        stats.buckets[bisect_left(BUCKETS, record.duration)] += 1
+
+    def reset(self) -> None:
+        self._stats.clear()
+
+    def summary(self) -> dict[str, dict[str, Any]]:
+        """Return ``"kind:name" ->`` counters; quantiles are bucket upper bounds."""
+
+        return {
+            f"{kind}:{name}": {
+                "count": stats.count,
+                "errors": stats.errors,
+                "total_seconds": stats.total,
+                "mean_seconds": stats.total / stats.count,
+                "p50_seconds": stats.quantile(0.5),
+                "p99_seconds": stats.quantile(0.99),
+                "max_seconds": stats.max,
+                "conversion_seconds": stats.conversion,
+                "payload_bytes": stats.payload_bytes,
+                "buckets": dict(zip((*BUCKETS, float("inf")), stats.buckets)),
+            }
+            for (kind, name), stats in sorted(self._stats.items())
+        }
+
+    def dump(self) -> str:
+        """Return the summary as a plain-text table, slowest total time first."""
+
+        lines = [
+            (
+                f"{'call':<40} {'count':>7} {'errors':>6} {'mean':>10} {'p99<=':>10} "
+                f"{'convert':>10} {'bytes':>10}"
+            )
+        ]
+        rows = sorted(self.summary().items(), key=lambda item: -item[1]["total_seconds"])
+        for key, row in rows:
+            lines.append(
+                f"{key:<40} {row['count']:>7} {row['errors']:>6} "
+                f"{row['mean_seconds'] * 1e3:>8.3f}ms {row['p99_seconds'] * 1e3:>8.3f}ms "
+                f"{row['conversion_seconds'] * 1e3:>8.3f}ms {row['payload_bytes']:>10}"
+            )
+        return "\n".join(lines)
+
+
+def span_hook(tracer: Any) -> Hook:
+    """Return a hook that reports each call as a span on an OpenTelemetry-style tracer.
+
+    ``tracer`` needs ``start_span(name, start_time=..., attributes=...)``
+    returning a span with ``set_attribute``, ``record_exception`` and
+    ``end(end_time=...)``, as ``opentelemetry.trace.Tracer`` provides.
+    """
+
+    def _hook(record: CallRecord) -> None:
+        span = tracer.start_span(
+            f"python_agents.{record.kind} {record.name}",
+            start_time=record.start_ns,
+            attributes={
+                "python_agents.kind": record.kind,
+                "python_agents.method": record.name,
+                "python_agents.conversion_ms": record.conversion * 1e3,
+                "python_agents.payload_bytes": record.payload_bytes,
+            },
+        )
+        if record.error is not None:
+            span.record_exception(record.error)
+        span.end(end_time=record.start_ns + int(record.duration * 1e9))
+
+    return _hook
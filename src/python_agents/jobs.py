@@ -0,0 +1,302 @@
+"""Concurrent consumer for the agent queue (``Agent.queue`` / ``dequeue``)."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Callable
+from typing import Any
+
+from ._ffi import maybe_await, to_py
+from .agent import Agent
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[Any], Any]
+FailureHandler = Callable[[dict[str, Any], BaseException], Any]
+
+
+class _TypeStats:
+    __slots__ = ("failed", "processed", "seconds")
+
+    def __init__(self):
+        self.processed = 0
+        self.failed = 0
+        self.seconds = 0.0
+
+
+class QueueWorker:
+    """Run registered Python handlers for queued jobs with bounded concurrency.
+
+    A job's type is the ``callback`` it was queued with (``queue(callback,
+    payload)``) or, failing that, the payload's ``type_field`` (``"job"`` by
+    default). Up to ``concurrency`` handlers run at once. Jobs are pulled into
+    a buffer of ``max_buffered`` items; when handlers fall behind, the buffer
+    fills and the worker stops pulling until there is room again.
+
+    Finished jobs are acknowledged with one ``dequeue_many`` call per
+    ``ack_batch`` jobs. A failing job is retried up to ``max_attempts`` times
+    with exponential backoff starting at ``backoff`` seconds; after that (or
+    when no handler is registered for its type) it is passed to
+    ``on_failure`` and removed. Unacknowledged jobs stay in the agent's queue,
+    so delivery is at-least-once across restarts.
+    """
+
+    def __init__(
+        self,
+        agent: Agent,
+        handlers: dict[str, JobHandler] | None = None,
+        *,
+        concurrency: int = 8,
+        max_buffered: int | None = None,
+        ack_batch: int = 32,
+        max_attempts: int = 3,
+        backoff: float = 0.5,
+        max_backoff: float = 30.0,
+        poll_interval: float = 1.0,
+        type_field: str = "job",
+        on_failure: FailureHandler | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.agent = agent
+        self.concurrency = concurrency
+        self.max_buffered = max_buffered or concurrency * 2
+        self.ack_batch = ack_batch
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.poll_interval = poll_interval
+        self.type_field = type_field
+        self.on_failure = on_failure
+        self._clock = clock
+        self._handlers: dict[str, JobHandler] = dict(handlers or {})
+        self._buffer: asyncio.Queue | None = None
+        self._in_flight: set[Any] = set()
+        self._acks: list[Any] = []
+        self._acking: set[Any] = set()
+        self._attempts: dict[Any, int] = {}
+        self._retries: set[asyncio.Task] = set()
+        self._settled: asyncio.Event | None = None
+        self._stopping = False
+        self._task: asyncio.Task | None = None
+        self._started_at: float | None = None
+        self._by_type: dict[str, _TypeStats] = {}
+        self.fetched = 0
+        self.processed = 0
+        self.failed = 0
+        self.retried = 0
+        self.acked = 0
+        self.ack_calls = 0
+        self.worker_errors = 0
+        self.depth: int | None = None
+
+    def register(self, job_type: str, handler: JobHandler) -> JobHandler:
+        """Run ``handler(payload)`` for jobs of ``job_type``."""
+
+        self._handlers[job_type] = handler
+        return handler
+
+    def handler(self, job_type: str) -> Callable[[JobHandler], JobHandler]:
+        """Decorator form of :meth:`register`."""
+
+        def _decorate(func: JobHandler) -> JobHandler:
+            return self.register(job_type, func)
+
+        return _decorate
+
+    async def drain(self) -> int:
+        """Process jobs until the queue is empty; returns how many were processed."""
+
+        before = self.processed
+        await self._run(until_empty=True)
+        return self.processed - before
+
+    async def run(self) -> None:
+        """Process jobs until :meth:`stop` is called, polling while the queue is empty."""
+
+        await self._run(until_empty=False)
+
+    def start(self) -> asyncio.Task:
+        """Run :meth:`run` in a background task."""
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self.run())
+        return self._task
+
+    async def stop(self) -> None:
+        """Stop pulling jobs, finish buffered ones and flush pending acks."""
+
+        self._stopping = True
+        if self._settled is not None:
+            self._settled.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+
+    async def queue_depth(self) -> int:
+        """Count the agent's pending jobs through the bridge (``stats()["depth"]``)."""
+
+        self.depth = await self.agent.queue_depth()
+        return self.depth
+
+    def stats(self) -> dict[str, Any]:
+        """Return counters; ``depth`` is the queue depth from the last :meth:`queue_depth` or run."""
+
+        elapsed = 0.0 if self._started_at is None else self._clock() - self._started_at
+        return {
+            "fetched": self.fetched,
+            "processed": self.processed,
+            "failed": self.failed,
+            "retried": self.retried,
+            "acked": self.acked,
+            "ack_calls": self.ack_calls,
+            "worker_errors": self.worker_errors,
+            "in_flight": len(self._in_flight),
+            "buffered": 0 if self._buffer is None else self._buffer.qsize(),
+            "pending_acks": len(self._acks),
+            "depth": self.depth,
+            "throughput": self.processed / elapsed if elapsed > 0 else 0.0,
+            "by_type": {
+                job_type: {"processed": stats.processed, "failed": stats.failed, "seconds": stats.seconds}
+                for job_type, stats in self._by_type.items()
+            },
+        }
+
+    async def _run(self, until_empty: bool) -> None:
+        self._stopping = False
+        self._buffer = asyncio.Queue(self.max_buffered)
+        self._settled = asyncio.Event()
+        if self._started_at is None:
+            self._started_at = self._clock()
+        workers = [asyncio.ensure_future(self._work()) for _ in range(self.concurrency)]
+        try:
+            while not self._stopping:
+                await self._flush_acks()
+                if await self._fetch():
+                    continue
+                if self._in_flight:
+                    # Wait for a running or retrying job to settle before
+                    # looking at the queue again.
+                    self._settled.clear()
+                    await self._settled.wait()
+                elif until_empty:
+                    break
+                else:
+                    self._settled.clear()
+                    try:
+                        await asyncio.wait_for(self._settled.wait(), self.poll_interval)
+                    except TimeoutError:
+                        pass
+            await self._buffer.join()
+        finally:
+            for task in (*workers, *self._retries):
+                task.cancel()
+            await asyncio.gather(*workers, *self._retries, return_exceptions=True)
+            # Jobs whose retry was cancelled stay queued for the next run.
+            self._in_flight.clear()
+            await self._flush_acks()
+        await self.queue_depth()
+
+    async def _fetch(self) -> bool:
+        # In-flight and unacked jobs are still at the head of the queue, so
+        # ask for enough rows to see past them into the free buffer slots.
+        room = max(1, self.max_buffered - self._buffer.qsize())
+        skip = self._in_flight.union(self._acks, self._acking)
+        rows = to_py(await self.agent.get_queue(limit=len(skip) + room)) or []
+        fresh = [row for row in rows if row["id"] not in skip]
+        for row in fresh:
+            self._in_flight.add(row["id"])
+            self.fetched += 1
+            # Blocks while the buffer is full: this is the backpressure point.
+            await self._buffer.put(row)
+        return bool(fresh)
+
+    async def _work(self) -> None:
+        buffer = self._buffer
+        while True:
+            row = await buffer.get()
+            try:
+                await self._process(row)
+            except Exception:
+                # ``on_failure`` or the ack call failed. Keep the worker alive;
+                # an unacknowledged job is simply delivered again later.
+                self.worker_errors += 1
+                logger.exception("Queue worker failed to settle job %r", row.get("id"))
+            finally:
+                buffer.task_done()
+
+    def _job_type(self, row: dict[str, Any]) -> Any:
+        if row.get("callback"):
+            return row["callback"]
+        payload = row.get("payload")
+        return payload.get(self.type_field) if isinstance(payload, dict) else None
+
+    async def _process(self, row: dict[str, Any]) -> None:
+        job_type = self._job_type(row)
+        handler = self._handlers.get(job_type)
+        stats = self._by_type.get(job_type)
+        if stats is None:
+            stats = self._by_type[job_type] = _TypeStats()
+        started = self._clock()
+        try:
+            if handler is None:
+                raise LookupError(f"No queue handler for job type {job_type!r}")
+            await maybe_await(handler(row.get("payload")))
+        except Exception as error:
+            stats.seconds += self._clock() - started
+            attempts = self._attempts.get(row["id"], 0) + 1
+            logger.warning(
+                "Queue job %r (%r) failed on attempt %d", row["id"], job_type, attempts, exc_info=True
+            )
+            if handler is not None and attempts < self.max_attempts:
+                self._attempts[row["id"]] = attempts
+                self.retried += 1
+                delay = min(self.max_backoff, self.backoff * 2 ** (attempts - 1))
+                task = asyncio.ensure_future(self._retry(row, delay))
+                self._retries.add(task)
+                task.add_done_callback(self._retries.discard)
+                return
+            stats.failed += 1
+            self.failed += 1
+            try:
+                if self.on_failure is not None:
+                    await maybe_await(self.on_failure(row, error))
+            finally:
+                # A raising ``on_failure`` must not leave the job in flight.
+                await self._finish(row["id"])
+            return
+        else:
+            stats.seconds += self._clock() - started
+            stats.processed += 1
+            self.processed += 1
+        await self._finish(row["id"])
+
+    async def _retry(self, row: dict[str, Any], delay: float) -> None:
+        await asyncio.sleep(delay)
+        await self._buffer.put(row)
+
+    async def _finish(self, job_id: Any) -> None:
+        self._attempts.pop(job_id, None)
+        self._in_flight.discard(job_id)
+        self._acks.append(job_id)
+        self._settled.set()
+        if len(self._acks) >= self.ack_batch:
+            await self._flush_acks()
+
+    async def _flush_acks(self) -> None:
+        if not self._acks:
+            return
+        ids, self._acks = self._acks, []
+        self._acking.update(ids)
+        try:
+            await self.agent.dequeue_many(ids)
+        except Exception:
+            logger.warning("Failed to acknowledge %d queue jobs; they will be delivered again", len(ids))
+            raise
+        finally:
+            self._acking.difference_update(ids)
+        self.acked += len(ids)
+        self.ack_calls += 1
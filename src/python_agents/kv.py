@@ -0,0 +1,234 @@
+"""Per-key agent state stored as separate Durable Object storage entries."""
+
+from __future__ import annotations
+
+from collections.abc import AsyncIterator, Iterable, Mapping
+from typing import TYPE_CHECKING, Any
+
+from ._cache import MISSING, TTLCache
+from ._ffi import get_agents_sdk, maybe_await, to_js, to_py
+
+if TYPE_CHECKING:
+    from .agent import Agent
+
+# Cached marker for keys known not to exist.
+_ABSENT: Any = object()
+
+KV_MESSAGE_TYPE = "cf_agent_kv"
+
+
+def _shared_cache(agent: Agent, prefix: str, cache_size: int) -> TTLCache:
+    # Kept on the JS agent, so the wrappers made for one agent (one per wake
+    # or lookup) share cached values instead of each starting cold.
+    js_agent = agent._js_agent
+    caches = getattr(js_agent, "pythonKvCaches", None)
+    if caches is None:
+        caches = {}
+        try:
+            js_agent.pythonKvCaches = caches
+        except (AttributeError, TypeError):
+            return TTLCache(cache_size)
+    cache = caches.get(prefix)
+    if cache is None:
+        cache = caches[prefix] = TTLCache(cache_size)
+    return cache
+
+
+class KeyedState:
+    """Keyed values for one agent, each stored under its own storage key.
+
+    Unlike :meth:`Agent.set_state`, which rewrites (and broadcasts) the whole
+    state object, ``set`` / ``delete`` only touch the given keys, and ``get``
+    only reads them. Values live in the agent's Durable Object storage under
+    ``prefix + key``. Bulk operations are one bridge call each (see the
+    ``kv*`` bridge helpers). With ``sync=True`` every write also broadcasts
+    only the changed keys to connected clients, as
+    ``{"type": "cf_agent_kv", "set": {...}}`` or ``{"type": "cf_agent_kv",
+    "delete": [...]}``; otherwise clients do not see these values.
+
+    Recently read or written values are kept in an LRU of ``cache_size``
+    entries, shared by every wrapper of the same JS agent, so repeated reads
+    do not cross into JS. Cached values are returned by reference, like
+    :attr:`Agent.state`: treat them as read-only and write changes with
+    ``set``. Writes go straight to storage. When the agent has a codec
+    (:meth:`Agent.use_codec`), dict, list and bytes values are stored encoded.
+    """
+
+    def __init__(
+        self, agent: Agent, *, prefix: str = "kv:", cache_size: int = 1024, sync: bool = False
+    ):
+        self.agent = agent
+        self.prefix = prefix
+        self.sync = sync
+        self._cache = _shared_cache(agent, prefix, cache_size)
+        self.reads = 0
+        self.writes = 0
+
+    async def get(self, key: str, default: Any = None) -> Any:
+        value = self._cache.get(key, MISSING)
+        if value is MISSING:
+            value = (await self._load([key]))[key]
+        return default if value is _ABSENT else value
+
+    async def get_many(self, keys: Iterable[str]) -> dict[str, Any]:
+        """Return the existing values among ``keys`` with at most one bridge call."""
+
+        found: dict[str, Any] = {}
+        missing = []
+        for key in keys:
+            value = self._cache.get(key, MISSING)
+            if value is MISSING:
+                missing.append(key)
+            elif value is not _ABSENT:
+                found[key] = value
+        if missing:
+            loaded = await self._load(missing)
+            found.update((key, value) for key, value in loaded.items() if value is not _ABSENT)
+        return found
+
+    async def set(self, key: str, value: Any) -> None:
+        await self.set_many({key: value})
+
+    async def set_many(self, entries: Mapping[str, Any]) -> None:
+        """Write several keys with one bridge call."""
+
+        if not entries:
+            return
+        encoded = {self.prefix + key: self.agent._encode(value) for key, value in entries.items()}
+        sdk = get_agents_sdk()
+        await maybe_await(sdk.kvPut(self.agent._js_agent, to_js(encoded)))
+        self.writes += 1
+        for key, value in entries.items():
+            self._cache.set(key, value)
+        if self.sync:
+            await self.agent.broadcast({"type": KV_MESSAGE_TYPE, "set": dict(entries)})
+
+    async def delete(self, *keys: str) -> int:
+        """Delete keys; returns how many existed."""
+
+        if not keys:
+            return 0
+        sdk = get_agents_sdk()
+        stored = to_js([self.prefix + key for key in keys])
+        deleted = await maybe_await(sdk.kvDelete(self.agent._js_agent, stored))
+        self.writes += 1
+        for key in keys:
+            self._cache.set(key, _ABSENT)
+        if self.sync:
+            await self.agent.broadcast({"type": KV_MESSAGE_TYPE, "delete": list(keys)})
+        return deleted
+
+    async def scan(self, prefix: str = "", *, limit: int | None = None) -> dict[str, Any]:
+        """Return keys starting with ``prefix`` (in key order) and their values.
+
+        Everything matching is loaded at once; use :meth:`view` to page
+        through large collections.
+        """
+
+        items: dict[str, Any] = {}
+        async for key, value in self._pages(prefix, limit or 1000, limit):
+            items[key] = value
+        return items
+
+    def view(self, prefix: str = "", *, page_size: int = 128) -> KeyedView:
+        """Return a lazily loaded, read-only mapping view of keys under ``prefix``."""
+
+        return KeyedView(self, prefix, page_size)
+
+    def invalidate(self) -> None:
+        """Forget cached values (for every wrapper of this agent), e.g. after
+        storage was changed by JS code."""
+
+        self._cache.clear()
+
+    def stats(self) -> dict[str, Any]:
+        stats = self._cache.stats()
+        stats["reads"] = self.reads
+        stats["writes"] = self.writes
+        return stats
+
+    async def _load(self, keys: list[str]) -> dict[str, Any]:
+        sdk = get_agents_sdk()
+        stored = to_js([self.prefix + key for key in keys])
+        found = to_py(await maybe_await(sdk.kvGet(self.agent._js_agent, stored))) or {}
+        self.reads += 1
+        loaded = {}
+        for key in keys:
+            value = found.get(self.prefix + key, _ABSENT)
+            if value is not _ABSENT:
+                value = self.agent.decode(value)
+            self._cache.set(key, value)
+            loaded[key] = value
+        return loaded
+
+    async def _pages(
+        self, prefix: str, page_size: int, limit: int | None = None
+    ) -> AsyncIterator[tuple[str, Any]]:
+        async for page in self._stored_pages(prefix, page_size, limit):
+            for stored_key, value in page:
+                # Not cached: a long scan would only evict the hot keys.
+                yield stored_key[len(self.prefix) :], self.agent.decode(value)
+
+    async def _stored_pages(
+        self, prefix: str, page_size: int, limit: int | None = None
+    ) -> AsyncIterator[list[Any]]:
+        # Pages of raw ``[storage key, stored value]`` pairs.
+        sdk = get_agents_sdk()
+        full_prefix = self.prefix + prefix
+        start_after = None
+        remaining = limit
+        while remaining is None or remaining > 0:
+            size = page_size if remaining is None else min(page_size, remaining)
+            page = await maybe_await(sdk.kvList(self.agent._js_agent, full_prefix, start_after, size))
+            page = to_py(page) or []
+            self.reads += 1
+            yield page
+            if len(page) < size:
+                return
+            start_after = page[-1][0]
+            if remaining is not None:
+                remaining -= len(page)
+
+
+class KeyedView:
+    """Read-only async mapping over a :class:`KeyedState` key range.
+
+    Iteration fetches ``page_size`` entries per bridge call, so walking a
+    large collection never holds more than one page of it.
+    """
+
+    def __init__(self, state: KeyedState, prefix: str = "", page_size: int = 128):
+        self.state = state
+        self.prefix = prefix
+        self.page_size = page_size
+
+    def __aiter__(self) -> AsyncIterator[str]:
+        return self.keys()
+
+    async def keys(self) -> AsyncIterator[str]:
+        # Keys only: stored values are not decoded.
+        start = len(self.state.prefix) + len(self.prefix)
+        async for page in self.state._stored_pages(self.prefix, self.page_size):
+            for row in page:
+                yield row[0][start:]
+
+    async def values(self) -> AsyncIterator[Any]:
+        decode = self.state.agent.decode
+        async for page in self.state._stored_pages(self.prefix, self.page_size):
+            for row in page:
+                yield decode(row[1])
+
+    async def items(self) -> AsyncIterator[tuple[str, Any]]:
+        """Yield ``(key, value)`` pairs in key order; keys are relative to the view's prefix."""
+
+        start = len(self.prefix)
+        async for key, value in self.state._pages(self.prefix, self.page_size):
+            yield key[start:], value
+
+    async def get(self, key: str, default: Any = None) -> Any:
+        """Look up ``key`` (relative to the view's prefix)."""
+
+        return await self.state.get(self.prefix + key, default)
+
+    async def contains(self, key: str) -> bool:
+        return await self.state.get(self.prefix + key, _ABSENT) is not _ABSENT
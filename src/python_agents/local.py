@@ -0,0 +1,712 @@
+"""In-process stand-in for the JS Agents bridge.
+
+``install_local_sdk()`` replaces ``globalThis.__PYTHON_AGENTS_SDK`` with a
+pure-Python emulation so agent logic can be exercised, load-tested and
+benchmarked under plain CPython without deploying::
+
+    from python_agents import Agent
+    from python_agents.local import install_local_sdk
+
+    sdk = install_local_sdk()          # or install_local_sdk("sqlite")
+    agent = Agent.create(state={"count": 0})
+
+The emulation covers state (``setState``), schedules, the queue, broadcast,
+``ctx.storage`` key-value access, ``routeAgentRequest`` / ``getAgentByName``
+and the bridge helpers the Python wrapper uses. It follows the wrapper's model
+of the SDK (``setState`` patches are shallow-merged) and is not a byte-for-byte
+copy of the JS runtime.
+"""
+
+from __future__ import annotations
+
+import copy
+import itertools
+import json
+import re
+import sqlite3
+import time
+from collections.abc import Callable, Iterable
+from datetime import datetime
+from typing import Any
+from urllib.parse import urlsplit
+
+from . import _jsonpatch
+from ._ffi import set_agents_sdk
+
+# State versions kept as diff bases, as in the bridge's ``STATE_SNAPSHOTS``.
+STATE_SNAPSHOTS = 16
+
+
+class MemoryStorage:
+    """Dict-backed storage; each agent gets its own state, schedules and queue."""
+
+    def __init__(self):
+        self._state: dict[str, dict[str, Any]] = {}
+        self._tables: dict[tuple[str, str], dict[str, dict[str, Any]]] = {}
+
+    def get_state(self, agent_key: str) -> dict[str, Any] | None:
+        return self._state.get(agent_key)
+
+    def put_state(self, agent_key: str, state: dict[str, Any]) -> None:
+        self._state[agent_key] = state
+
+    def insert(self, table: str, agent_key: str, row: dict[str, Any]) -> None:
+        self._tables.setdefault((table, agent_key), {})[row["id"]] = row
+
+    def get(self, table: str, agent_key: str, row_id: str) -> dict[str, Any] | None:
+        return self._tables.get((table, agent_key), {}).get(row_id)
+
+    def rows(self, table: str, agent_key: str) -> list[dict[str, Any]]:
+        return list(self._tables.get((table, agent_key), {}).values())
+
+    def delete(self, table: str, agent_key: str, row_id: str) -> dict[str, Any] | None:
+        return self._tables.get((table, agent_key), {}).pop(row_id, None)
+
+    def clear(self, table: str, agent_key: str) -> int:
+        return len(self._tables.pop((table, agent_key), {}))
+
+
+class SqliteStorage:
+    """SQLite-backed storage (``":memory:"`` by default); values are stored as JSON."""
+
+    def __init__(self, path: str = ":memory:"):
+        self._db = sqlite3.connect(path)
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS agent_state (agent TEXT PRIMARY KEY, state TEXT NOT NULL);
+            CREATE TABLE IF NOT EXISTS agent_rows (
+                tbl TEXT NOT NULL,
+                agent TEXT NOT NULL,
+                id TEXT NOT NULL,
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                row TEXT NOT NULL,
+                UNIQUE (tbl, agent, id)
+            );
+            """
+        )
+
+    def get_state(self, agent_key: str) -> dict[str, Any] | None:
+        found = self._db.execute(
+            "SELECT state FROM agent_state WHERE agent = ?", (agent_key,)
+        ).fetchone()
+        return None if found is None else json.loads(found[0])
+
+    def put_state(self, agent_key: str, state: dict[str, Any]) -> None:
+        with self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO agent_state (agent, state) VALUES (?, ?)",
+                (agent_key, json.dumps(state)),
+            )
+
+    def insert(self, table: str, agent_key: str, row: dict[str, Any]) -> None:
+        with self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO agent_rows (tbl, agent, id, row) VALUES (?, ?, ?, ?)",
+                (table, agent_key, row["id"], json.dumps(row)),
+            )
+
+    def get(self, table: str, agent_key: str, row_id: str) -> dict[str, Any] | None:
+        found = self._db.execute(
+            "SELECT row FROM agent_rows WHERE tbl = ? AND agent = ? AND id = ?",
+            (table, agent_key, row_id),
+        ).fetchone()
+        return None if found is None else json.loads(found[0])
+
+    def rows(self, table: str, agent_key: str) -> list[dict[str, Any]]:
+        cursor = self._db.execute(
+            "SELECT row FROM agent_rows WHERE tbl = ? AND agent = ? ORDER BY seq",
+            (table, agent_key),
+        )
+        return [json.loads(row) for (row,) in cursor]
+
+    def delete(self, table: str, agent_key: str, row_id: str) -> dict[str, Any] | None:
+        found = self.get(table, agent_key, row_id)
+        if found is None:
+            return None
+        with self._db:
+            self._db.execute(
+                "DELETE FROM agent_rows WHERE tbl = ? AND agent = ? AND id = ?",
+                (table, agent_key, row_id),
+            )
+        return found
+
+    def clear(self, table: str, agent_key: str) -> int:
+        with self._db:
+            cursor = self._db.execute(
+                "DELETE FROM agent_rows WHERE tbl = ? AND agent = ?", (table, agent_key)
+            )
+        return cursor.rowcount
+
+
+_INTERVAL_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*(ms|s|sec|second|m|min|minute|h|hour|d|day)s?\s*$")
+_UNIT_SECONDS = {
+    "ms": 0.001,
+    "s": 1,
+    "sec": 1,
+    "second": 1,
+    "m": 60,
+    "min": 60,
+    "minute": 60,
+    "h": 3600,
+    "hour": 3600,
+    "d": 86400,
+    "day": 86400,
+}
+
+
+def _interval_seconds(interval: Any) -> float:
+    if isinstance(interval, int | float):
+        return float(interval)
+    match = _INTERVAL_RE.match(str(interval))
+    if match is None:
+        raise ValueError(f"Unsupported interval: {interval!r}")
+    return float(match.group(1)) * _UNIT_SECONDS[match.group(2)]
+
+
+def _due_time(when: Any, now: float) -> float:
+    if isinstance(when, int | float):
+        return now + when
+    if isinstance(when, datetime):
+        return when.timestamp()
+    return datetime.fromisoformat(str(when)).timestamp()
+
+
+class LocalConnection:
+    """A fake websocket client; received frames collect in ``messages``.
+
+    Like the frontend helper in ``examples/agents-frontend`` it unpacks
+    ``cf_agent_batch`` frames, applies ``cf_agent_state_patch`` diffs to
+    ``state`` and acknowledges versioned states.
+    """
+
+    def __init__(self, agent: LocalAgent):
+        self.agent = agent
+        self.messages: list[Any] = []
+        self.state: Any = None
+        self._versions: dict[int, Any] = {}
+
+    def send(self, message: Any) -> None:
+        self.messages.append(message)
+        self._receive(message)
+
+    def _receive(self, message: Any) -> None:
+        kind = message.get("type") if isinstance(message, dict) else None
+        if kind == "cf_agent_batch":
+            for inner in message["messages"]:
+                self._receive(inner)
+        elif kind in ("cf_agent_state", "cf_agent_state_snapshot"):
+            self._accept(message["state"], message.get("version"))
+        elif kind == "cf_agent_state_patch":
+            base = self._versions.get(message["base"])
+            if base is None:
+                self.agent.onMessage(self, {"type": "cf_agent_state_resync"})
+            else:
+                self._accept(_jsonpatch.apply(base, message["patch"]), message["version"])
+
+    def _accept(self, state: Any, version: int | None) -> None:
+        self.state = state
+        if version is None:
+            return
+        self._versions[version] = state
+        if len(self._versions) > STATE_SNAPSHOTS:
+            del self._versions[min(self._versions)]
+        self.agent.onMessage(self, {"type": "cf_agent_state_ack", "version": version})
+
+    def close(self) -> None:
+        self.agent.connections.remove(self)
+        self.agent._acked.pop(self, None)
+
+
+class LocalDurableStorage:
+    """Emulated Durable Object ``ctx.storage`` key-value API for one agent."""
+
+    def __init__(self, agent: LocalAgent):
+        self.agent = agent
+
+    @property
+    def _backend(self) -> Any:
+        return self.agent.sdk.storage
+
+    def get(self, key: str | Iterable[str]) -> Any:
+        if isinstance(key, str):
+            row = self._backend.get("kv", self.agent.key, key)
+            return None if row is None else row["value"]
+        return {name: value for name in key if (value := self.get(name)) is not None}
+
+    def put(self, key: str | dict[str, Any], value: Any = None) -> None:
+        entries = key if isinstance(key, dict) else {key: value}
+        for name, item in entries.items():
+            self._backend.insert("kv", self.agent.key, {"id": name, "value": item})
+
+    def delete(self, key: str | Iterable[str]) -> bool | int:
+        if isinstance(key, str):
+            return self._backend.delete("kv", self.agent.key, key) is not None
+        return sum(self._backend.delete("kv", self.agent.key, name) is not None for name in key)
+
+    def list(self, options: dict[str, Any] | None = None) -> dict[str, Any]:
+        options = options or {}
+        prefix = options.get("prefix", "")
+        start_after = options.get("startAfter")
+        limit = options.get("limit")
+        matches = sorted(
+            (row["id"], row["value"])
+            for row in self._backend.rows("kv", self.agent.key)
+            if row["id"].startswith(prefix) and (start_after is None or row["id"] > start_after)
+        )
+        return dict(matches[:limit] if limit is not None else matches)
+
+
+class LocalContext:
+    """Emulated Durable Object state (``ctx``) exposing ``storage``."""
+
+    def __init__(self, agent: LocalAgent):
+        self.storage = LocalDurableStorage(agent)
+
+
+class LocalAgent:
+    """Emulated JS ``Agent`` exposing the camelCase surface the wrapper calls."""
+
+    def __init__(self, sdk: LocalAgentsSDK, key: str, init: dict[str, Any] | None = None):
+        init = init or {}
+        self.sdk = sdk
+        self.key = key
+        self.env = init.get("env")
+        self.ctx = init.get("ctx") or LocalContext(self)
+        self.pythonStateVersion = 0
+        # Python-side KeyedState caches, shared by every wrapper of this agent.
+        self.pythonKvCaches: dict[str, Any] | None = None
+        self.connections: list[LocalConnection] = []
+        self.broadcasts: list[Any] = []
+        self.workflows: list[Any] = []
+        self.approvals: list[Any] = []
+        self.emails: list[Any] = []
+        self.inbox: list[Any] = []
+        self.mcp_servers: dict[str, Any] = {}
+        self.received: list[tuple[LocalConnection, Any]] = []
+        self.pythonStateSync = "full"
+        self._sync_version = 0
+        self._snapshots: dict[int, Any] = {}
+        self._acked: dict[LocalConnection, int] = {}
+        self._ids = itertools.count(1)
+        if sdk.storage.get_state(key) is None:
+            sdk.storage.put_state(key, dict(init.get("state") or {}))
+
+    def _next_id(self, prefix: str) -> str:
+        return f"{prefix}-{next(self._ids)}"
+
+    # -- state -------------------------------------------------------------
+
+    @property
+    def state(self) -> dict[str, Any]:
+        return self.sdk.storage.get_state(self.key) or {}
+
+    def setState(self, patch: dict[str, Any]) -> dict[str, Any]:
+        state = {**self.state, **patch}
+        self.sdk.storage.put_state(self.key, state)
+        self.onStateUpdate(state, "server")
+        self.broadcast({"type": "cf_agent_state", "state": state})
+        return state
+
+    def onStateUpdate(self, state: Any, source: Any) -> None:
+        self.pythonStateVersion += 1
+
+    def receive_client_state(self, state: dict[str, Any]) -> None:
+        """Emulate a connected client calling ``setState``."""
+
+        self.sdk.storage.put_state(self.key, dict(state))
+        self.onStateUpdate(state, "client")
+
+    # -- schedules ---------------------------------------------------------
+
+    def _add_schedule(self, row: dict[str, Any]) -> dict[str, Any]:
+        row["id"] = self._next_id("schedule")
+        self.sdk.storage.insert("schedules", self.key, row)
+        return row
+
+    def schedule(self, payload: Any, when: Any) -> dict[str, Any]:
+        due = _due_time(when, self.sdk.clock())
+        return self._add_schedule({"type": "scheduled", "payload": payload, "time": due})
+
+    def scheduleEvery(self, payload: Any, interval: Any) -> dict[str, Any]:
+        seconds = _interval_seconds(interval)
+        return self._add_schedule(
+            {
+                "type": "interval",
+                "payload": payload,
+                "interval": seconds,
+                "time": self.sdk.clock() + seconds,
+            }
+        )
+
+    def getSchedules(self) -> list[dict[str, Any]]:
+        return self.sdk.storage.rows("schedules", self.key)
+
+    def getSchedule(self, schedule_id: str) -> dict[str, Any] | None:
+        return self.sdk.storage.get("schedules", self.key, schedule_id)
+
+    def cancelSchedule(self, schedule_id: str) -> bool:
+        return self.sdk.storage.delete("schedules", self.key, schedule_id) is not None
+
+    def run_due_schedules(self, now: float | None = None) -> list[dict[str, Any]]:
+        """Return schedules due at ``now``; one-shots are removed, intervals re-armed."""
+
+        now = self.sdk.clock() if now is None else now
+        fired = []
+        for row in self.getSchedules():
+            if row["time"] > now:
+                continue
+            fired.append(row)
+            if row["type"] == "interval":
+                self.sdk.storage.insert("schedules", self.key, {**row, "time": now + row["interval"]})
+            else:
+                self.cancelSchedule(row["id"])
+        return fired
+
+    # -- queue -------------------------------------------------------------
+
+    def queue(self, callback_or_payload: Any, *payload: Any) -> str:
+        callback, body = (callback_or_payload, payload[0]) if payload else (None, callback_or_payload)
+        row = {"id": self._next_id("queue"), "callback": callback, "payload": body}
+        self.sdk.storage.insert("queue", self.key, row)
+        return row["id"]
+
+    def dequeue(self, queue_id: str | None = None) -> dict[str, Any] | None:
+        if queue_id is None:
+            rows = self.getQueue()
+            if not rows:
+                return None
+            queue_id = rows[0]["id"]
+        return self.sdk.storage.delete("queue", self.key, queue_id)
+
+    def dequeueAll(self) -> int:
+        return self.sdk.storage.clear("queue", self.key)
+
+    def getQueue(self, queue_id: str | None = None) -> Any:
+        rows = self.sdk.storage.rows("queue", self.key)
+        if queue_id is None:
+            return rows
+        return next((row for row in rows if row["id"] == queue_id), None)
+
+    # -- clients and side effects ------------------------------------------
+
+    def connect(self) -> LocalConnection:
+        connection = LocalConnection(self)
+        self.connections.append(connection)
+        connection.send({"type": "cf_agent_state", "state": self.state})
+        return connection
+
+    def broadcast(self, message: Any, exclude: Iterable[LocalConnection] = ()) -> None:
+        self.broadcasts.append(message)
+        skipped = list(exclude or ())
+        if (
+            self.pythonStateSync == "diff"
+            and isinstance(message, dict)
+            and message.get("type") == "cf_agent_state"
+        ):
+            self._broadcast_state(message["state"], skipped)
+            return
+        for connection in self.connections:
+            if connection not in skipped:
+                connection.send(message)
+
+    def _broadcast_state(self, state: Any, skipped: list[LocalConnection]) -> None:
+        self._sync_version += 1
+        version = self._sync_version
+        self._snapshots[version] = copy.deepcopy(state)
+        if len(self._snapshots) > STATE_SNAPSHOTS:
+            del self._snapshots[min(self._snapshots)]
+        for connection in self.connections:
+            if connection in skipped:
+                continue
+            base = self._acked.get(connection)
+            if base in self._snapshots:
+                patch = _jsonpatch.diff(self._snapshots[base], state)
+                connection.send(
+                    {"type": "cf_agent_state_patch", "base": base, "version": version, "patch": patch}
+                )
+            else:
+                connection.send(
+                    {"type": "cf_agent_state_snapshot", "state": state, "version": version}
+                )
+
+    def onMessage(self, connection: LocalConnection, message: Any) -> None:
+        kind = message.get("type") if isinstance(message, dict) else None
+        if kind == "cf_agent_state_ack":
+            self._acked[connection] = message["version"]
+        elif kind == "cf_agent_state_resync":
+            self._acked.pop(connection, None)
+            connection.send(
+                {"type": "cf_agent_state_snapshot", "state": self.state, "version": self._sync_version}
+            )
+        else:
+            self.received.append((connection, message))
+
+    def runWorkflow(self, spec: Any) -> dict[str, Any]:
+        run = {"id": self._next_id("workflow"), "spec": spec, "status": "queued"}
+        self.workflows.append(run)
+        return run
+
+    def waitForApproval(self, request: Any) -> dict[str, Any]:
+        self.approvals.append(request)
+        return {"approved": True, "request": request}
+
+    def addMcpServer(self, spec: Any, url: Any = None) -> dict[str, Any]:
+        name = spec if url is not None else spec.get("name")
+        server = {"id": name, "name": name, "url": url if url is not None else spec.get("url")}
+        self.mcp_servers[name] = server
+        return server
+
+    def removeMcpServer(self, server_id: str) -> None:
+        self.mcp_servers.pop(server_id, None)
+
+    def getMcpServers(self) -> dict[str, Any]:
+        return {"servers": dict(self.mcp_servers), "tools": [], "prompts": [], "resources": []}
+
+    def replyToEmail(self, message: Any) -> None:
+        self.emails.append(message)
+
+
+class LocalWorkflow:
+    """Emulated ``AgentWorkflow``: records each ``run`` call."""
+
+    def __init__(self, init: Any = None):
+        self.init = init
+        self.instanceId = (init or {}).get("id") if isinstance(init, dict) else None
+        self.runs: list[Any] = []
+
+    def run(self, *args: Any) -> Any:
+        self.runs.append(args)
+        return {"ran": args[0] if len(args) == 1 else list(args)}
+
+
+class LocalResponse:
+    """Emulated ``Response`` from the bridge's ``jsonResponse`` / ``eventStream``."""
+
+    def __init__(self, body: Any, status: int = 200, headers: dict[str, str] | None = None):
+        self.body = body
+        self.status = status
+        self.headers = headers or {}
+
+    async def chunks(self) -> Any:
+        if not callable(self.body):
+            if self.body:
+                yield self.body
+            return
+        while (chunk := await self.body()) is not None:
+            yield chunk
+
+    async def text(self) -> str:
+        return "".join([chunk async for chunk in self.chunks()])
+
+
+class LocalAgentsSDK:
+    """Pure-Python replacement for ``globalThis.__PYTHON_AGENTS_SDK``."""
+
+    def __init__(self, storage: Any = None, *, clock: Callable[[], float] = time.time):
+        self.storage = storage if storage is not None else MemoryStorage()
+        self.clock = clock
+        self.agents: dict[tuple[Any, str], LocalAgent] = {}
+        self.request_handlers: dict[str, Callable[..., Any]] = {}
+        self.mcp_servers: dict[str, Any] = {}
+        self.mcp_sessions: dict[str, str] = {}
+        self.mcp_pending: dict[str, list[Any]] = {}
+        self._anonymous = itertools.count(1)
+        self._mcp_session_ids = itertools.count(1)
+
+    # -- construction and lookup -------------------------------------------
+
+    def createAgent(self, init: dict[str, Any] | None = None) -> LocalAgent:
+        return LocalAgent(self, f"anonymous-{next(self._anonymous)}", init)
+
+    createMcpAgent = createAgent
+
+    def createAgentWorkflow(self, init: Any = None) -> LocalWorkflow:
+        return LocalWorkflow(init)
+
+    def getAgentByName(self, namespace: Any, name: str, options: Any = None) -> LocalAgent:
+        key = (namespace, str(name))
+        agent = self.agents.get(key)
+        if agent is None:
+            agent = LocalAgent(self, f"{namespace}/{name}")
+            self.agents[key] = agent
+        return agent
+
+    getAgent = getAgentByName
+
+    # -- routing -----------------------------------------------------------
+
+    def on_request(self, agent_class: str, handler: Callable[[LocalAgent, Any], Any]) -> None:
+        """Handle routed requests for ``agent_class`` with ``handler(agent, request)``."""
+
+        self.request_handlers[agent_class] = handler
+
+    def routeAgentRequest(self, request: Any, env: Any = None, options: Any = None) -> Any:
+        url = request if isinstance(request, str) else getattr(request, "url", "")
+        prefix = ((options or {}).get("prefix") or "agents").strip("/")
+        parts = [part for part in urlsplit(url).path.split("/") if part]
+        if len(parts) < 3 or parts[0] != prefix:
+            return None
+        return self.routeAgentTo(request, env, parts[1], parts[2], options)
+
+    def routeAgentTo(
+        self, request: Any, env: Any, agent_class: str, name: str, options: Any = None
+    ) -> Any:
+        agent = self.getAgentByName(agent_class, name)
+        handler = self.request_handlers.get(agent_class)
+        if handler is None:
+            return {"status": 200, "agent": agent_class, "name": name}
+        return handler(agent, request)
+
+    # -- external MCP servers ----------------------------------------------
+
+    def on_mcp(self, url: str, handler: Any) -> None:
+        """Serve MCP requests to ``url`` with ``handler.handle(message)`` (e.g. ``McpRequestHandler``)."""
+
+        self.mcp_servers[url] = handler
+
+    def notify_mcp(self, url: str, method: str, params: Any = None) -> None:
+        """Deliver a server notification with the next response from ``url``."""
+
+        message = {"jsonrpc": "2.0", "method": method}
+        if params is not None:
+            message["params"] = params
+        self.mcp_pending.setdefault(url, []).append(message)
+
+    def expire_mcp_sessions(self, url: str | None = None) -> None:
+        """Forget sessions, so requests carrying them get HTTP 404."""
+
+        for session_id, session_url in list(self.mcp_sessions.items()):
+            if url is None or session_url == url:
+                del self.mcp_sessions[session_id]
+
+    # -- bridge helpers ----------------------------------------------------
+
+    def queueMany(self, agent: LocalAgent, payloads: Iterable[Any], callback: Any = None) -> list[str]:
+        if callback is None:
+            return [agent.queue(payload) for payload in payloads]
+        return [agent.queue(callback, payload) for payload in payloads]
+
+    def dequeueMany(self, agent: LocalAgent, ids: Iterable[str]) -> list[Any]:
+        return [agent.dequeue(queue_id) for queue_id in ids]
+
+    def queueDepth(self, agent: LocalAgent) -> int:
+        return len(agent.getQueue())
+
+    def filterQueue(self, agent: LocalAgent, where: dict[str, Any], limit: int | None = None) -> list[Any]:
+        matches = []
+        for row in agent.getQueue():
+            payload = row["payload"] if isinstance(row["payload"], dict) else {}
+            if all(payload.get(key) == value for key, value in where.items()):
+                matches.append(row)
+                if limit is not None and len(matches) >= limit:
+                    break
+        return matches
+
+    def scheduleMany(self, agent: LocalAgent, specs: Iterable[dict[str, Any]]) -> list[dict[str, Any]]:
+        return [
+            agent.scheduleEvery(spec["payload"], spec["every"])
+            if spec.get("every") is not None
+            else agent.schedule(spec["payload"], spec["when"])
+            for spec in specs
+        ]
+
+    def cancelSchedules(self, agent: LocalAgent, ids: Iterable[str]) -> list[bool]:
+        return [agent.cancelSchedule(schedule_id) for schedule_id in ids]
+
+    def setStateSync(self, agent: LocalAgent, mode: str) -> None:
+        agent.pythonStateSync = mode
+        if mode != "diff":
+            agent._acked.clear()
+
+    def kvGet(self, agent: LocalAgent, keys: Iterable[str]) -> dict[str, Any]:
+        return agent.ctx.storage.get(list(keys))
+
+    def kvPut(self, agent: LocalAgent, entries: dict[str, Any]) -> None:
+        agent.ctx.storage.put(copy.deepcopy(entries))
+
+    def kvDelete(self, agent: LocalAgent, keys: Iterable[str]) -> int:
+        return agent.ctx.storage.delete(list(keys))
+
+    def kvList(
+        self, agent: LocalAgent, prefix: str, start_after: str | None = None, limit: int | None = None
+    ) -> list[list[Any]]:
+        listed = agent.ctx.storage.list({"prefix": prefix, "startAfter": start_after, "limit": limit})
+        return [[key, value] for key, value in listed.items()]
+
+    async def mcpRequest(
+        self, url: str, message: str, session_id: str | None = None, headers: Any = None
+    ) -> dict[str, Any]:
+        handler = self.mcp_servers.get(url)
+        if handler is None:
+            return {"status": 404, "sessionId": None, "messages": []}
+        message = json.loads(message)
+        if session_id is None:
+            if message.get("method") != "initialize":
+                return {"status": 400, "sessionId": None, "messages": []}
+            session_id = f"session-{next(self._mcp_session_ids)}"
+            self.mcp_sessions[session_id] = url
+        elif self.mcp_sessions.get(session_id) != url:
+            return {"status": 404, "sessionId": None, "messages": []}
+        reply = await handler.handle(message)
+        messages = self.mcp_pending.pop(url, [])
+        if reply is not None:
+            messages.extend(reply if isinstance(reply, list) else [reply])
+        status = 200 if "id" in message else 202
+        return {"status": status, "sessionId": session_id, "messages": messages}
+
+    def mcpClose(self, url: str, session_id: str, headers: Any = None) -> None:
+        self.mcp_sessions.pop(session_id, None)
+
+    def jsonResponse(self, body: str, status: int = 200, headers: Any = None) -> LocalResponse:
+        return LocalResponse(body, status, {"content-type": "application/json", **(headers or {})})
+
+    def eventStream(self, next_chunk: Callable[[], Any], headers: Any = None) -> LocalResponse:
+        return LocalResponse(next_chunk, 200, {"content-type": "text/event-stream", **(headers or {})})
+
+    def adoptBuffer(self, buffer: Any) -> Any:
+        return buffer
+
+    # -- MCP and email -----------------------------------------------------
+
+    def createMcpHandler(self, *args: Any) -> dict[str, Any]:
+        return {"handler": args[0] if len(args) == 1 else list(args)}
+
+    def createAddressBasedEmailResolver(self, mapping: dict[str, Any]) -> Callable[..., Any]:
+        def _resolve(email: Any, env: Any = None) -> Any:
+            address = email if isinstance(email, str) else getattr(email, "to", None) or email.get("to")
+            return mapping.get(address)
+
+        return _resolve
+
+    def routeAgentEmail(self, message: Any, env: Any = None, options: Any = None) -> Any:
+        resolver = (options or {}).get("resolver") if isinstance(options, dict) else options
+        target = resolver(message, env) if resolver is not None else None
+        return {"message": message, "target": target}
+
+    def routeResolvedEmail(self, message: Any, env: Any, agent_name: str, agent_id: str) -> Any:
+        self.getAgentByName(agent_name, agent_id).inbox.append(message)
+        return {"message": message, "target": {"agentName": agent_name, "agentId": agent_id}}
+
+
+def install_local_sdk(storage: Any = "memory", **options: Any) -> LocalAgentsSDK:
+    """Install a :class:`LocalAgentsSDK` as the bridge and return it.
+
+    ``storage`` is ``"memory"``, ``"sqlite"`` (in-memory database), a SQLite
+    file path, or a storage object with the :class:`MemoryStorage` interface.
+    """
+
+    if storage == "memory":
+        storage = MemoryStorage()
+    elif storage == "sqlite":
+        storage = SqliteStorage()
+    elif isinstance(storage, str):
+        storage = SqliteStorage(storage)
+    sdk = LocalAgentsSDK(storage, **options)
+    set_agents_sdk(sdk)
+    return sdk
+
+
+def uninstall_local_sdk() -> None:
+    """Restore lookup of the real ``globalThis.__PYTHON_AGENTS_SDK``."""
+
+    set_agents_sdk(None)
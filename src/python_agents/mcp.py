@@ -0,0 +1,256 @@
+"""Python-native MCP (JSON-RPC 2.0) request handler for ``@tool`` objects."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from collections.abc import AsyncIterator, Callable
+from typing import Any
+
+from . import instrumentation
+from ._ffi import get_agents_sdk, persistent_proxy, to_py
+from .tools import ToolInputError, get_tool_methods, json_input_schema, run_tool
+
+logger = logging.getLogger(__name__)
+
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+
+_DONE: Any = object()
+
+
+class McpError(Exception):
+    """A JSON-RPC error to return for one request."""
+
+    def __init__(self, code: int, message: str):
+        self.code = code
+        self.message = message
+        super().__init__(message)
+
+
+def _error(request_id: Any, code: int, message: str) -> dict[str, Any]:
+    return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+
+def _tool_result(result: Any) -> dict[str, Any]:
+    if isinstance(result, dict) and "content" in result:
+        return result
+    if isinstance(result, str):
+        return {"content": [{"type": "text", "text": result}]}
+    return {"content": [{"type": "text", "text": json.dumps(result)}]}
+
+
+class McpRequestHandler:
+    """Serve MCP JSON-RPC for an object's ``@tool`` methods without the JS SDK.
+
+    Supports ``initialize``, ``ping``, ``tools/list`` (built once) and
+    ``tools/call``. Entries of a JSON-RPC batch run concurrently, at most
+    ``concurrency`` tool calls at a time across the handler. Streaming tools
+    emit ``notifications/progress`` for each chunk when the request carries a
+    ``_meta.progressToken``; their result still carries the full content, so
+    it is held in memory until the tool finishes.
+
+    Use :meth:`handle` with parsed messages, :meth:`stream` to receive each
+    response as soon as it is ready, or :meth:`fetch` as a Worker ``fetch``
+    handler (Streamable HTTP: JSON, or SSE when the client accepts
+    ``text/event-stream``).
+    """
+
+    def __init__(
+        self,
+        obj: Any,
+        *,
+        name: str = "python-agents",
+        version: str = "1.0.0",
+        instructions: str | None = None,
+        protocol_version: str = "2025-03-26",
+        concurrency: int = 8,
+    ):
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.obj = obj
+        self.server_info = {"name": name, "version": version}
+        self.instructions = instructions
+        self.protocol_version = protocol_version
+        self.concurrency = concurrency
+        self._tools = get_tool_methods(obj)
+        self._listing = {
+            "tools": [
+                {
+                    "name": tool_name,
+                    "description": getattr(method, "__python_agents_tool_description__", None)
+                    or (method.__doc__ or "").strip(),
+                    "inputSchema": json_input_schema(
+                        getattr(method, "__python_agents_tool_input_schema__", None)
+                    ),
+                }
+                for tool_name, method in self._tools.items()
+            ]
+        }
+        self._slots = asyncio.Semaphore(concurrency)
+        self.requests = 0
+        self.batches = 0
+        self.tool_calls = 0
+        self.errors = 0
+
+    async def handle(self, message: Any) -> Any:
+        """Return the response, the list of batch responses, or ``None`` for notifications."""
+
+        responses = [item async for item in self.stream(message) if "id" in item]
+        if isinstance(message, list) and message:
+            return responses or None
+        return responses[0] if responses else None
+
+    async def stream(self, message: Any) -> AsyncIterator[dict[str, Any]]:
+        """Yield responses (and progress notifications) as they complete."""
+
+        entries = message if isinstance(message, list) else [message]
+        if not entries:
+            self.errors += 1
+            yield _error(None, INVALID_REQUEST, "Empty batch")
+            return
+        if isinstance(message, list):
+            self.batches += 1
+        out: asyncio.Queue = asyncio.Queue()
+        tasks = [asyncio.ensure_future(self._entry(entry, out.put_nowait)) for entry in entries]
+        pending = len(tasks)
+        try:
+            while pending:
+                item = await out.get()
+                if item is _DONE:
+                    pending -= 1
+                else:
+                    yield item
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _entry(self, entry: Any, emit: Callable[[Any], None]) -> None:
+        try:
+            valid = isinstance(entry, dict) and entry.get("jsonrpc") == "2.0" and "method" in entry
+            if not valid:
+                self.errors += 1
+                request_id = entry.get("id") if isinstance(entry, dict) else None
+                emit(_error(request_id, INVALID_REQUEST, "Invalid request"))
+                return
+            self.requests += 1
+            request_id = entry.get("id")
+            try:
+                result = await self._dispatch(entry["method"], entry.get("params") or {}, emit)
+            except McpError as error:
+                self.errors += 1
+                response = _error(request_id, error.code, error.message)
+            except Exception as error:
+                self.errors += 1
+                logger.exception("MCP request %r failed", entry.get("method"))
+                response = _error(request_id, INTERNAL_ERROR, str(error))
+            else:
+                response = {"jsonrpc": "2.0", "id": request_id, "result": result}
+            if "id" in entry:
+                emit(response)
+        finally:
+            emit(_DONE)
+
+    async def _dispatch(
+        self, method: str, params: dict[str, Any], emit: Callable[[Any], None]
+    ) -> Any:
+        if method == "tools/call":
+            return await self._call_tool(params, emit)
+        if method == "tools/list":
+            return self._listing
+        if method == "ping":
+            return {}
+        if method == "initialize":
+            result = {
+                "protocolVersion": self.protocol_version,
+                "capabilities": {"tools": {"listChanged": False}},
+                "serverInfo": self.server_info,
+            }
+            if self.instructions:
+                result["instructions"] = self.instructions
+            return result
+        if method.startswith("notifications/"):
+            return None
+        raise McpError(METHOD_NOT_FOUND, f"Method not found: {method}")
+
+    async def _call_tool(self, params: dict[str, Any], emit: Callable[[Any], None]) -> Any:
+        tool_name = params.get("name")
+        method = self._tools.get(tool_name)
+        if method is None:
+            raise McpError(INVALID_PARAMS, f"Unknown tool: {tool_name}")
+        arguments = params.get("arguments") or {}
+        token = (params.get("_meta") or {}).get("progressToken")
+        self.tool_calls += 1
+        async with self._slots:
+            try:
+                if instrumentation.hooks:
+                    return await instrumentation.observe(
+                        "mcp_tool",
+                        tool_name,
+                        arguments,
+                        lambda: self._run_tool(method, arguments, token, emit),
+                    )
+                return await self._run_tool(method, arguments, token, emit)
+            except ToolInputError as error:
+                raise McpError(INVALID_PARAMS, str(error)) from error
+            except McpError:
+                raise
+            except Exception as error:
+                # Tool failures are results, so the model can see them.
+                logger.debug("MCP tool %r failed", tool_name, exc_info=True)
+                return {"content": [{"type": "text", "text": str(error)}], "isError": True}
+
+    async def _run_tool(
+        self, method: Any, arguments: dict[str, Any], token: Any, emit: Callable[[Any], None]
+    ) -> Any:
+        def _progress(progress: int, text: str) -> None:
+            emit(
+                {
+                    "jsonrpc": "2.0",
+                    "method": "notifications/progress",
+                    "params": {"progressToken": token, "progress": progress, "message": text},
+                }
+            )
+
+        result = await run_tool(method, arguments, None if token is None else _progress)
+        return _tool_result(result)
+
+    async def fetch(self, request: Any, env: Any = None, ctx: Any = None) -> Any:
+        """Worker ``fetch`` handler for MCP Streamable HTTP ``POST`` requests."""
+
+        sdk = get_agents_sdk()
+        if request.method != "POST":
+            return sdk.jsonResponse("", 405, {"allow": "POST"})
+        try:
+            message = json.loads(await request.text())
+        except ValueError:
+            return sdk.jsonResponse(json.dumps(_error(None, PARSE_ERROR, "Parse error")), 400)
+        entries = message if isinstance(message, list) else [message]
+        if entries and all(isinstance(entry, dict) and "id" not in entry for entry in entries):
+            await self.handle(message)
+            return sdk.jsonResponse("", 202)
+        accept = to_py(request.headers.get("accept")) or ""
+        if "text/event-stream" not in accept:
+            return sdk.jsonResponse(json.dumps(await self.handle(message)), 200)
+
+        items = self.stream(message)
+
+        async def _next() -> str | None:
+            item = await anext(items, None)
+            if item is None:
+                return None
+            return f"event: message\ndata: {json.dumps(item)}\n\n"
+
+        return sdk.eventStream(persistent_proxy(_next))
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "tool_calls": self.tool_calls,
+            "errors": self.errors,
+        }
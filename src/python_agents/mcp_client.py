@@ -0,0 +1,350 @@
+"""Pooled MCP client connections with cached tool, resource and prompt catalogs."""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+import logging
+import time
+from collections.abc import Callable, Mapping
+from typing import Any
+
+from ._cache import MISSING, SingleFlight, TTLCache
+from ._ffi import get_agents_sdk, maybe_await, to_js, to_py
+from .mcp import INTERNAL_ERROR, McpError
+
+logger = logging.getLogger(__name__)
+
+# Catalog kind -> (list method, result field).
+_CATALOGS = {
+    "tools": ("tools/list", "tools"),
+    "resources": ("resources/list", "resources"),
+    "prompts": ("prompts/list", "prompts"),
+}
+_LIST_CHANGED = {f"notifications/{kind}/list_changed": kind for kind in _CATALOGS}
+
+
+class _SessionExpired(Exception):
+    pass
+
+
+class McpClientSession:
+    """One initialized Streamable HTTP session with an MCP server."""
+
+    def __init__(self, name: str, url: str, headers: Mapping[str, str], pool: McpClientPool):
+        self.name = name
+        self.url = url
+        self.headers = dict(headers)
+        self.pool = pool
+        self.session_id: str | None = None
+        self.protocol_version: str | None = None
+        self.server_info: dict[str, Any] = {}
+        self.capabilities: dict[str, Any] = {}
+        self.instructions: str | None = None
+        self._ids = itertools.count(1)
+
+    async def initialize(self) -> None:
+        result = await self.request(
+            "initialize",
+            {
+                "protocolVersion": self.pool.protocol_version,
+                "capabilities": {},
+                "clientInfo": self.pool.client_info,
+            },
+        )
+        self.protocol_version = result.get("protocolVersion")
+        self.server_info = result.get("serverInfo") or {}
+        self.capabilities = result.get("capabilities") or {}
+        self.instructions = result.get("instructions")
+        await self.notify("notifications/initialized")
+
+    async def request(self, method: str, params: dict[str, Any] | None = None) -> Any:
+        request_id = next(self._ids)
+        message = {"jsonrpc": "2.0", "id": request_id, "method": method}
+        if params is not None:
+            message["params"] = params
+        for reply in await self._post(message):
+            if reply.get("id") != request_id or "method" in reply:
+                continue
+            error = reply.get("error")
+            if error is not None:
+                raise McpError(error.get("code", INTERNAL_ERROR), error.get("message", ""))
+            return reply.get("result")
+        raise McpError(INTERNAL_ERROR, f"No response to {method} from MCP server {self.name!r}")
+
+    async def notify(self, method: str, params: dict[str, Any] | None = None) -> None:
+        message: dict[str, Any] = {"jsonrpc": "2.0", "method": method}
+        if params is not None:
+            message["params"] = params
+        await self._post(message)
+
+    async def close(self) -> None:
+        if self.session_id is not None:
+            sdk = get_agents_sdk()
+            await maybe_await(sdk.mcpClose(self.url, self.session_id, to_js(self.headers)))
+            self.session_id = None
+
+    async def _post(self, message: dict[str, Any]) -> list[dict[str, Any]]:
+        sdk = get_agents_sdk()
+        self.pool.requests += 1
+        reply = to_py(
+            await maybe_await(
+                sdk.mcpRequest(self.url, json.dumps(message), self.session_id, to_js(self.headers))
+            )
+        )
+        status = reply["status"]
+        if status == 404 and self.session_id is not None:
+            raise _SessionExpired()
+        if status >= 400:
+            raise McpError(INTERNAL_ERROR, f"MCP server {self.name!r} returned HTTP {status}")
+        if reply.get("sessionId"):
+            self.session_id = reply["sessionId"]
+        messages = reply.get("messages") or []
+        for item in messages:
+            if "id" not in item and "method" in item:
+                self.pool._notification(self.name, item)
+        return messages
+
+
+class McpClientPool:
+    """Shared MCP client connections to external servers, with cached catalogs.
+
+    Register servers with :meth:`add`. The first request to a server opens
+    and initializes a session, which is then reused for every later call in
+    the isolate; concurrent callers share one connection attempt. A session
+    the server has expired (HTTP 404) is reopened once transparently.
+
+    ``list_tools`` / ``list_resources`` / ``list_prompts`` results are cached
+    for ``ttl`` seconds (``None`` keeps them until invalidated) and dropped as
+    soon as the server sends the matching ``notifications/*/list_changed``.
+    Catalogs the server did not declare in its capabilities are empty without
+    a request.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl: float | None = 300.0,
+        client_name: str = "python-agents",
+        client_version: str = "1.0.0",
+        protocol_version: str = "2025-03-26",
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl = ttl
+        self.client_info = {"name": client_name, "version": client_version}
+        self.protocol_version = protocol_version
+        self._servers: dict[str, tuple[str, dict[str, str]]] = {}
+        self._sessions: dict[str, McpClientSession] = {}
+        self._catalogs = TTLCache(1024, ttl, clock=clock)
+        self._flights = SingleFlight()
+        # Bumped by every invalidate(), so a fetch that overlaps one is not cached.
+        self._generations: dict[tuple[str, str], int] = {}
+        self.connects = 0
+        self.reconnects = 0
+        self.connect_seconds = 0.0
+        self.requests = 0
+        self.notifications = 0
+        self.invalidations = 0
+        self.catalog_errors = 0
+        self.close_errors = 0
+        self._closing: set[asyncio.Task] = set()
+
+    def add(self, name: str, url: str, *, headers: Mapping[str, str] | None = None) -> None:
+        """Register (or re-point) the server ``name``; connecting is deferred.
+
+        Re-pointing ends the previous session in the background. Called
+        outside a running event loop, the old session is only dropped and
+        left to expire on the server.
+        """
+
+        config = (url, dict(headers or {}))
+        if self._servers.get(name) != config:
+            self._servers[name] = config
+            session = self._sessions.pop(name, None)
+            if session is not None:
+                self._close_later(session)
+            self.invalidate(name)
+
+    def _close_later(self, session: McpClientSession) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = loop.create_task(self._close_session(session))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    async def _close_session(self, session: McpClientSession) -> None:
+        try:
+            await session.close()
+        except Exception:
+            # Nobody awaits this close; the server expires the session anyway.
+            self.close_errors += 1
+            logger.debug("Closing MCP session %r failed", session.name, exc_info=True)
+
+    def servers(self) -> list[str]:
+        return list(self._servers)
+
+    async def connect(self, name: str) -> McpClientSession:
+        """Return the open session for ``name``, opening it if needed."""
+
+        session = self._sessions.get(name)
+        if session is not None:
+            return session
+        return await self._flights.run(("connect", name), lambda: self._open(name))
+
+    async def _open(self, name: str) -> McpClientSession:
+        try:
+            url, headers = self._servers[name]
+        except KeyError:
+            raise KeyError(f"Unknown MCP server {name!r}; register it with add()") from None
+        session = McpClientSession(name, url, headers, self)
+        start = time.perf_counter()
+        await session.initialize()
+        self.connect_seconds += time.perf_counter() - start
+        self.connects += 1
+        self._sessions[name] = session
+        return session
+
+    async def request(self, name: str, method: str, params: dict[str, Any] | None = None) -> Any:
+        """Send one JSON-RPC request to ``name`` and return its result."""
+
+        session = await self.connect(name)
+        try:
+            return await session.request(method, params)
+        except _SessionExpired:
+            if self._sessions.get(name) is session:
+                del self._sessions[name]
+                self.reconnects += 1
+            self.invalidate(name)
+            session = await self.connect(name)
+            return await session.request(method, params)
+
+    async def call_tool(
+        self, name: str, tool: str, arguments: dict[str, Any] | None = None
+    ) -> dict[str, Any]:
+        return await self.request(name, "tools/call", {"name": tool, "arguments": arguments or {}})
+
+    async def read_resource(self, name: str, uri: str) -> dict[str, Any]:
+        return await self.request(name, "resources/read", {"uri": uri})
+
+    async def get_prompt(
+        self, name: str, prompt: str, arguments: dict[str, str] | None = None
+    ) -> dict[str, Any]:
+        return await self.request(name, "prompts/get", {"name": prompt, "arguments": arguments or {}})
+
+    async def list_tools(self, name: str) -> list[dict[str, Any]]:
+        return await self._catalog(name, "tools")
+
+    async def list_resources(self, name: str) -> list[dict[str, Any]]:
+        return await self._catalog(name, "resources")
+
+    async def list_prompts(self, name: str) -> list[dict[str, Any]]:
+        return await self._catalog(name, "prompts")
+
+    async def catalog(self, kind: str = "tools") -> dict[str, list[dict[str, Any]]]:
+        """Return ``kind`` catalogs of every registered server, fetched concurrently.
+
+        Servers that fail are left out (and counted as ``catalog_errors``), so
+        one unreachable server does not hide the others.
+        """
+
+        if kind not in _CATALOGS:
+            raise ValueError(f"Unknown catalog {kind!r}; expected one of {sorted(_CATALOGS)}")
+        names = list(self._servers)
+        results = await asyncio.gather(
+            *(self._catalog(name, kind) for name in names), return_exceptions=True
+        )
+        catalogs = {}
+        for name, result in zip(names, results):
+            if isinstance(result, Exception):
+                self.catalog_errors += 1
+            elif isinstance(result, BaseException):
+                raise result
+            else:
+                catalogs[name] = result
+        return catalogs
+
+    async def _catalog(self, name: str, kind: str) -> list[dict[str, Any]]:
+        if kind not in _CATALOGS:
+            raise ValueError(f"Unknown catalog {kind!r}; expected one of {sorted(_CATALOGS)}")
+        items = self._catalogs.get((name, kind), MISSING)
+        if items is MISSING:
+            items = await self._flights.run((kind, name), lambda: self._fetch_catalog(name, kind))
+        return items
+
+    async def _fetch_catalog(self, name: str, kind: str) -> list[dict[str, Any]]:
+        session = await self.connect(name)
+        generation = self._generations.get((name, kind), 0)
+        items: list[dict[str, Any]] = []
+        if kind in session.capabilities:
+            method, field = _CATALOGS[kind]
+            cursor = None
+            while True:
+                result = await self.request(name, method, {"cursor": cursor} if cursor else None)
+                items.extend(result.get(field) or [])
+                cursor = result.get("nextCursor")
+                if not cursor:
+                    break
+        if self._generations.get((name, kind), 0) == generation:
+            # Otherwise the catalog was invalidated mid-fetch and may be stale.
+            self._catalogs.set((name, kind), items)
+        return items
+
+    def invalidate(self, name: str | None = None, kind: str | None = None) -> None:
+        """Drop cached catalogs, optionally only for one server and/or kind."""
+
+        names = [name] if name is not None else list(self._servers)
+        for server in names:
+            for catalog in [kind] if kind is not None else _CATALOGS:
+                key = (server, catalog)
+                self._generations[key] = self._generations.get(key, 0) + 1
+                if self._catalogs.pop(key, MISSING) is not MISSING:
+                    self.invalidations += 1
+
+    async def close(self, name: str | None = None) -> None:
+        """End the session with ``name`` (or all sessions) and drop their catalogs."""
+
+        names = [name] if name is not None else list(self._sessions)
+        for server in names:
+            session = self._sessions.pop(server, None)
+            if session is not None:
+                await session.close()
+            self.invalidate(server)
+
+    def _notification(self, name: str, message: dict[str, Any]) -> None:
+        self.notifications += 1
+        kind = _LIST_CHANGED.get(message.get("method"))
+        if kind is not None:
+            self.invalidate(name, kind)
+
+    def stats(self) -> dict[str, Any]:
+        catalogs = self._catalogs.stats()
+        return {
+            "servers": len(self._servers),
+            "connections": len(self._sessions),
+            "connects": self.connects,
+            "reconnects": self.reconnects,
+            "connect_seconds": self.connect_seconds,
+            "requests": self.requests,
+            "catalog_hits": catalogs["hits"],
+            "catalog_misses": catalogs["misses"],
+            "invalidations": self.invalidations,
+            "notifications": self.notifications,
+            "catalog_errors": self.catalog_errors,
+            "close_errors": self.close_errors,
+            "coalesced": self._flights.coalesced,
+        }
+
+
+_pool: McpClientPool | None = None
+
+
+def get_mcp_client_pool() -> McpClientPool:
+    """Return the isolate-wide pool shared by every agent (see ``Agent.mcp_clients``)."""
+
+    global _pool
+    if _pool is None:
+        _pool = McpClientPool()
+    return _pool
@@ -1,16 +1,25 @@
 from __future__ import annotations
 
-from typing import Any
+import asyncio
+from collections.abc import AsyncIterator, Callable, Hashable, Iterable
+from typing import TYPE_CHECKING, Any, NamedTuple
 
-from ._ffi import get_agents_sdk, maybe_await, snake_to_camel
+from . import instrumentation
+from ._cache import MISSING, SingleFlight, TTLCache
+from ._ffi import convert_args, get_agents_sdk, js_method_name, maybe_await, to_js
 from .agent import Agent
 
+if TYPE_CHECKING:
+    import re
+
 
 async def _call_sdk(method: str, *args: Any) -> Any:
     sdk = get_agents_sdk()
-    js_method_name = snake_to_camel(method) if "_" in method else method
-    target = getattr(sdk, js_method_name)
-    result = target(*args)
+    target = getattr(sdk, js_method_name(method))
+    if instrumentation.hooks:
+        return await instrumentation.observe_js_call("sdk", method, target, args, to_js)
+    js_args = convert_args(args, to_js)
+    result = target(*js_args)
     return await maybe_await(result)
 
 
@@ -26,15 +35,339 @@ async def route_agent_requests(*args: Any) -> Any:
     return await route_agent_request(*args)
 
 
-async def get_agent_by_name(*args: Any) -> Agent:
-    """Look up an Agent by name and return it wrapped as :class:`python_agents.Agent`."""
+RouteHandler = Callable[[Any, Any], Any]
+
+
+class AgentRoute(NamedTuple):
+    """An agent URL matched by :class:`RequestRouter`."""
+
+    prefix: str
+    agent_class: str
+    name: str
+
+
+def _request_path(request: Any) -> str:
+    url = request if isinstance(request, str) else request.url
+    if not url.startswith("/"):
+        host = url.find("//")
+        start = url.find("/", host + 2 if host >= 0 else 0)
+        url = "/" if start < 0 else url[start:]
+    end = len(url)
+    for mark in "?#":
+        index = url.find(mark)
+        if 0 <= index < end:
+            end = index
+    return url[:end]
+
+
+class RequestRouter:
+    """Match agent URLs and other routes in Python before touching JS.
+
+    Agent routes are ``/<prefix>/<class>/<name>[/...]`` for each prefix (by
+    default just ``agents``), compiled into one regular expression. A match
+    goes to the SDK's ``routeAgentRequest``, so it is routed exactly as the
+    SDK would, with ``options`` such as ``cors``. With ``direct=True`` the
+    agent is addressed with its class and name already parsed (bridge helper
+    ``routeAgentTo``) instead, skipping the SDK's own URL matching.
+
+    Other paths are looked up in a dispatch table filled by :meth:`add` or the
+    :meth:`route` decorator: exact paths first, then the longest registered
+    ``prefix=True`` path. Anything else returns ``fallback(request, env)`` or
+    ``None`` without a bridge crossing.
+    """
+
+    def __init__(
+        self,
+        prefixes: Iterable[str] = ("agents",),
+        *,
+        options: Any = None,
+        direct: bool = False,
+        fallback: RouteHandler | None = None,
+    ):
+        self.options = options
+        self.direct = direct
+        self.fallback = fallback
+        self._prefixes: list[str] = []
+        self._pattern: re.Pattern[str] | None = None
+        self._exact: dict[str, dict[str | None, RouteHandler]] = {}
+        self._prefix_routes: dict[str, dict[str | None, RouteHandler]] = {}
+        self._prefix_order: list[str] = []
+        self.agent_requests = 0
+        self.dispatched = 0
+        self.unmatched = 0
+        for prefix in prefixes:
+            self.add_prefix(prefix)
+
+    def add_prefix(self, prefix: str) -> None:
+        """Also treat ``/<prefix>/<class>/<name>`` as an agent route."""
+
+        import re
+
+        prefix = prefix.strip("/")
+        if prefix not in self._prefixes:
+            self._prefixes.append(prefix)
+            # Longest first so "api/agents" wins over "api".
+            alternatives = "|".join(
+                re.escape(item) for item in sorted(self._prefixes, key=len, reverse=True)
+            )
+            self._pattern = re.compile(rf"/({alternatives})/([^/]+)/([^/]+)(?:/|$)")
+
+    def add(
+        self,
+        path: str,
+        handler: RouteHandler,
+        *,
+        methods: Iterable[str] | None = None,
+        prefix: bool = False,
+    ) -> RouteHandler:
+        """Serve ``path`` (or everything below it, with ``prefix=True``) with
+        ``handler(request, env)``; ``methods`` limits the HTTP methods."""
+
+        table = self._prefix_routes if prefix else self._exact
+        if prefix:
+            path = path.rstrip("/") + "/"
+            if path not in table:
+                self._prefix_order.append(path)
+                self._prefix_order.sort(key=len, reverse=True)
+        handlers = table.setdefault(path, {})
+        for method in methods or (None,):
+            handlers[method if method is None else method.upper()] = handler
+        return handler
+
+    def route(
+        self, path: str, *, methods: Iterable[str] | None = None, prefix: bool = False
+    ) -> Callable[[RouteHandler], RouteHandler]:
+        """Decorator form of :meth:`add`."""
+
+        def _decorate(handler: RouteHandler) -> RouteHandler:
+            return self.add(path, handler, methods=methods, prefix=prefix)
+
+        return _decorate
+
+    def match(self, request: Any) -> AgentRoute | None:
+        """Return the parsed agent route for ``request`` (a URL or request)."""
+
+        if self._pattern is None:
+            return None
+        found = self._pattern.match(_request_path(request))
+        return None if found is None else AgentRoute(*found.groups())
+
+    def _handler(self, path: str, method: str) -> RouteHandler | None:
+        handlers = self._exact.get(path)
+        if handlers is None:
+            for prefix in self._prefix_order:
+                if path.startswith(prefix) or path == prefix[:-1]:
+                    handlers = self._prefix_routes[prefix]
+                    break
+            else:
+                return None
+        return handlers.get(method) or handlers.get(None)
+
+    async def handle(self, request: Any, env: Any = None) -> Any:
+        """Serve ``request``; returns ``None`` when nothing matches."""
+
+        path = _request_path(request)
+        handler = self._handler(path, getattr(request, "method", "GET"))
+        if handler is not None:
+            self.dispatched += 1
+            return await maybe_await(handler(request, env))
+        found = None if self._pattern is None else self._pattern.match(path)
+        if found is not None:
+            self.agent_requests += 1
+            if not self.direct:
+                return await _call_sdk("route_agent_request", request, env, self.options)
+            _, agent_class, name = found.groups()
+            return await _call_sdk("route_agent_to", request, env, agent_class, name, self.options)
+        self.unmatched += 1
+        if self.fallback is not None:
+            return await maybe_await(self.fallback(request, env))
+        return None
+
+    def stats(self) -> dict[str, int]:
+        """Return how many requests went to agents, to routes, or matched nothing."""
+
+        return {
+            "agent_requests": self.agent_requests,
+            "dispatched": self.dispatched,
+            "unmatched": self.unmatched,
+        }
+
+
+class AgentStubCache:
+    """Isolate-local LRU/TTL cache of agent stubs.
+
+    Keys are ``(lookup kind, namespace, name or id, *options)``. Concurrent
+    lookups for the same key share one in-flight SDK call. Only the JS stub is
+    cached: every lookup gets its own :class:`Agent` wrapper, because wrappers
+    hold per-use state (``batch_state`` patches, coalesced broadcasts, the
+    state mirror) that concurrent requests must not share. Create one at
+    module scope and pass it as ``cache=`` to :func:`get_agent_by_name` /
+    :func:`get_agent_by_id`.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float | None = 300.0):
+        self._entries = TTLCache(maxsize, ttl)
+        self._flights = SingleFlight()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get_or_load(self, key: Hashable, method: str, *args: Any) -> Agent:
+        stub = self._entries.get(key, MISSING)
+        if stub is MISSING:
+
+            async def _load() -> Any:
+                loaded = await _call_sdk(method, *args)
+                self._entries.set(key, loaded)
+                return loaded
+
+            stub = await self._flights.run(key, _load)
+        return Agent(stub)
+
+    def invalidate(self, namespace: Any = None, name: Any = None) -> int:
+        """Drop cached stubs; returns how many entries were removed.
+
+        With no arguments everything is dropped; with ``namespace`` only that
+        namespace; with both, only that agent (looked up by name or id).
+        """
+
+        if namespace is None:
+            removed = len(self._entries)
+            self._entries.clear()
+            return removed
+
+        namespace_key = _namespace_key(namespace)
+        removed = 0
+        for key in self._entries:
+            if key[1] == namespace_key and (name is None or key[2] == name):
+                self._entries.pop(key)
+                removed += 1
+        return removed
+
+    def stats(self) -> dict[str, int]:
+        """Return hit/miss/eviction counters plus shared in-flight lookups."""
+
+        stats = self._entries.stats()
+        stats["coalesced"] = self._flights.coalesced
+        return stats
+
+
+def _namespace_key(namespace: Any) -> Hashable:
+    try:
+        hash(namespace)
+    except TypeError:
+        return id(namespace)
+    return namespace
+
+
+def _freeze(value: Any) -> Hashable:
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, list | tuple):
+        return tuple(_freeze(item) for item in value)
+    return _namespace_key(value)
+
+
+async def _lookup(method: str, args: tuple[Any, ...], cache: AgentStubCache | None) -> Agent:
+    if cache is None or not args:
+        return Agent(await _call_sdk(method, *args))
+    namespace, *rest = args
+    key = (method, _namespace_key(namespace), *(_freeze(arg) for arg in rest))
+    return await cache.get_or_load(key, method, *args)
+
+
+async def get_agent_by_name(*args: Any, cache: AgentStubCache | None = None) -> Agent:
+    """Look up an Agent by name and return it wrapped as :class:`python_agents.Agent`.
+
+    Pass an :class:`AgentStubCache` as ``cache`` to reuse stubs within the isolate.
+    """
+
+    return await _lookup("get_agent_by_name", args, cache)
+
+
+async def get_agent_by_id(*args: Any, cache: AgentStubCache | None = None) -> Agent:
+    """Look up an Agent by id and return it wrapped as :class:`python_agents.Agent`.
+
+    Pass an :class:`AgentStubCache` as ``cache`` to reuse stubs within the isolate.
+    """
+
+    return await _lookup("get_agent", args, cache)
+
+
+class FanOutResult(NamedTuple):
+    """Outcome of one agent call made by :func:`fan_out`."""
+
+    name: Any
+    value: Any = None
+    error: BaseException | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+async def fan_out(
+    namespace: Any,
+    names: Iterable[Any],
+    method: str,
+    *args: Any,
+    concurrency: int = 16,
+    timeout: float | None = None,
+    deadline: float | None = None,
+    cache: AgentStubCache | None = None,
+) -> AsyncIterator[FanOutResult]:
+    """Call ``method(*args)`` on many agents, yielding results as they finish.
+
+    At most ``concurrency`` calls run at once, and ``names`` is consumed lazily:
+    a call starts for the next name only as an earlier one finishes.
+    ``timeout`` bounds each call and ``deadline`` (seconds from now) bounds the
+    whole fan-out; calls still pending at the deadline are cancelled and
+    reported with ``TimeoutError``, as are names not started by then. A failing
+    agent is reported in its :class:`FanOutResult` and never cancels
+    the others. Leaving the ``async for`` early cancels outstanding calls.
+    """
 
-    js_agent = await _call_sdk("get_agent_by_name", *args)
-    return Agent(js_agent)
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    loop = asyncio.get_running_loop()
+    expires_at = None if deadline is None else loop.time() + deadline
+    queued = iter(names)
+    pending: dict[asyncio.Future, Any] = {}
 
+    async def _call(name: Any) -> Any:
+        agent = await get_agent_by_name(namespace, name, cache=cache)
+        return await agent.call(method, *args)
 
-async def get_agent_by_id(*args: Any) -> Agent:
-    """Look up an Agent by id and return it wrapped as :class:`python_agents.Agent`."""
+    def _top_up() -> None:
+        while len(pending) < concurrency:
+            name = next(queued, MISSING)
+            if name is MISSING:
+                return
+            pending[asyncio.ensure_future(asyncio.wait_for(_call(name), timeout))] = name
 
-    js_agent = await _call_sdk("get_agent", *args)
-    return Agent(js_agent)
+    try:
+        _top_up()
+        while pending:
+            remaining = None if expires_at is None else max(expires_at - loop.time(), 0)
+            done, _ = await asyncio.wait(
+                pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+            )
+            if not done:
+                for task, name in list(pending.items()):
+                    task.cancel()
+                    del pending[task]
+                    yield FanOutResult(name, error=TimeoutError("fan_out deadline exceeded"))
+                for name in queued:
+                    yield FanOutResult(name, error=TimeoutError("fan_out deadline exceeded"))
+                return
+            for task in done:
+                name = pending.pop(task)
+                error = task.exception()
+                if error is None:
+                    yield FanOutResult(name, task.result())
+                else:
+                    yield FanOutResult(name, error=error)
+            _top_up()
+    finally:
+        for task in pending:
+            task.cancel()
@@ -1,14 +1,37 @@
 from __future__ import annotations
 
-from collections.abc import Callable
-import builtins
+from collections.abc import AsyncGenerator, AsyncIterator, Callable
 from functools import wraps
 from typing import Any
 
-from ._ffi import maybe_await, to_js
+from . import instrumentation
+from ._cache import ResultCache, dispatcher, flight_group, result_cache
+from ._ffi import convert_arg, maybe_await, to_js, to_py
+from ._registry import bind_methods, method_registry
 
 
 McpToolHandler = Callable[..., Any]
+ArgumentValidator = Callable[[dict[str, Any]], dict[str, Any]]
+
+_UNSET: Any = object()
+
+# ``inspect.CO_ASYNC_GENERATOR``; checked directly to keep ``inspect`` (and the
+# modules it pulls in) out of import time.
+_CO_ASYNC_GENERATOR = 0x200
+
+
+def _is_async_generator_function(func: Any) -> bool:
+    code = getattr(func, "__code__", None)
+    return bool(code is not None and code.co_flags & _CO_ASYNC_GENERATOR)
+
+
+class ToolInputError(ValueError):
+    """Raised when tool arguments do not match the tool's ``input_schema``."""
+
+    def __init__(self, tool_name: str, problems: list[str]):
+        self.tool_name = tool_name
+        self.problems = problems
+        super().__init__(f"Invalid arguments for tool '{tool_name}': " + "; ".join(problems))
 
 
 def tool(
@@ -17,24 +40,47 @@ def tool(
     name: str | None = None,
     description: str | None = None,
     input_schema: Any = None,
+    cache: ResultCache | bool | None = None,
+    single_flight: bool = False,
 ) -> McpToolHandler:
     """Mark an instance method as an MCP tool definition.
 
     The resulting metadata can be registered with ``register_mcp_tools(...)``
     against a JS ``McpServer`` instance (``server.tool(...)``).
+
+    Async-generator methods are streaming tools: each yielded chunk (a string,
+    an MCP content item, or a ``{"content": [...]}`` dict) is forwarded as it is
+    produced. See :func:`stream_tool` and :func:`register_mcp_tools`.
+
+    ``cache=True`` (or a :class:`ResultCache`) memoizes results per instance,
+    keyed on the validated arguments; use it only for pure tools. With
+    ``single_flight=True`` concurrent calls on one instance with equal
+    arguments share a single execution and its result or exception.
     """
 
+    results = result_cache(cache)
+    flights = flight_group(single_flight)
+
     def _decorate(inner: McpToolHandler) -> McpToolHandler:
         exposed_name = name or inner.__name__
+        streaming = _is_async_generator_function(inner)
+        if streaming and (results is not None or flights is not None):
+            raise ValueError(f"Streaming tool '{exposed_name}' cannot use cache= or single_flight=")
 
         @wraps(inner)
         def _wrapped(*args: Any, **kwargs: Any):
             return inner(*args, **kwargs)
 
-        setattr(_wrapped, "__python_agents_tool__", True)
-        setattr(_wrapped, "__python_agents_tool_name__", exposed_name)
-        setattr(_wrapped, "__python_agents_tool_description__", description)
-        setattr(_wrapped, "__python_agents_tool_input_schema__", input_schema)
+        _wrapped.__python_agents_tool__ = True
+        _wrapped.__python_agents_tool_name__ = exposed_name
+        _wrapped.__python_agents_tool_description__ = description
+        _wrapped.__python_agents_tool_input_schema__ = input_schema
+        _wrapped.__python_agents_tool_streaming__ = streaming
+        if results is not None:
+            _wrapped.__python_agents_cache__ = results
+            _wrapped.__python_agents_cache_name__ = exposed_name
+        if flights is not None:
+            _wrapped.__python_agents_single_flight__ = flights
         return _wrapped
 
     if func is None:
@@ -42,45 +88,343 @@ def tool(
     return _decorate(func)
 
 
+_TRUE_STRINGS = {"true", "1", "yes", "on"}
+_FALSE_STRINGS = {"false", "0", "no", "off"}
+_BOOL_STRINGS = _TRUE_STRINGS | _FALSE_STRINGS
+
+
+def _coerce_string(value: Any) -> Any:
+    if isinstance(value, str):
+        return value
+    if isinstance(value, int | float) and not isinstance(value, bool):
+        return str(value)
+    raise TypeError
+
+
+def _coerce_integer(value: Any) -> Any:
+    if isinstance(value, bool):
+        raise TypeError
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str):
+        return int(value.strip())
+    raise TypeError
+
+
+def _coerce_number(value: Any) -> Any:
+    if isinstance(value, bool):
+        raise TypeError
+    if isinstance(value, int | float):
+        return value
+    if isinstance(value, str):
+        text = value.strip()
+        try:
+            return int(text)
+        except ValueError:
+            return float(text)
+    raise TypeError
+
+
+def _coerce_boolean(value: Any) -> Any:
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.strip().lower() in _BOOL_STRINGS:
+        return value.strip().lower() in _TRUE_STRINGS
+    if isinstance(value, int) and value in (0, 1):
+        return bool(value)
+    raise TypeError
+
+
+def _expect(kind: type | tuple[type, ...]) -> Callable[[Any], Any]:
+    def _check(value: Any) -> Any:
+        if not isinstance(value, kind):
+            raise TypeError
+        return value
+
+    return _check
+
+
+_COERCERS: dict[str, Callable[[Any], Any]] = {
+    "string": _coerce_string,
+    "integer": _coerce_integer,
+    "number": _coerce_number,
+    "boolean": _coerce_boolean,
+    "object": _expect(dict),
+    "array": _expect(list | tuple),
+    "null": _expect(type(None)),
+    "any": lambda value: value,
+}
+
+
+def _field_checker(spec: Any) -> tuple[Callable[[Any], Any], str, Any] | None:
+    """Return ``(coerce, type label, default)`` for one property spec."""
+
+    if isinstance(spec, str):
+        type_name, default = spec, _UNSET
+        choices = None
+    elif isinstance(spec, dict):
+        type_name = spec.get("type", "any")
+        default = spec.get("default", _UNSET)
+        choices = spec.get("enum")
+    else:
+        return None
+
+    type_names = type_name if isinstance(type_name, list) else [type_name]
+    coercers = [_COERCERS[name] for name in type_names if name in _COERCERS]
+    if not coercers:
+        return None
+    label = " | ".join(type_names)
+
+    def _coerce(value: Any) -> Any:
+        for coerce in coercers:
+            try:
+                value = coerce(value)
+                break
+            except (TypeError, ValueError):
+                continue
+        else:
+            raise TypeError(f"expected {label}, got {type(value).__name__}")
+        if choices is not None and value not in choices:
+            raise TypeError(f"expected one of {choices!r}, got {value!r}")
+        return value
+
+    return _coerce, label, default
+
+
+def compile_input_schema(tool_name: str, schema: Any) -> ArgumentValidator | None:
+    """Compile a tool ``input_schema`` into an argument validator.
+
+    Accepts the shorthand ``{"field": "string"}`` form (every field required)
+    and JSON Schema objects with ``properties`` / ``required`` /
+    ``additionalProperties``. Other schema values (for example JS-side Zod
+    shapes) are not validated in Python and yield ``None``.
+    """
+
+    if not isinstance(schema, dict):
+        return None
+    if schema.get("type") == "object" or "properties" in schema:
+        properties = schema.get("properties") or {}
+        required = set(schema.get("required") or ())
+        allow_extra = schema.get("additionalProperties", True) is not False
+    else:
+        properties = schema
+        required = set(schema)
+        allow_extra = True
+
+    fields = []
+    for field_name, spec in properties.items():
+        checker = _field_checker(spec)
+        if checker is not None:
+            fields.append((field_name, *checker))
+    known = set(properties)
+
+    def _validate(arguments: dict[str, Any]) -> dict[str, Any]:
+        validated = dict(arguments)
+        problems = []
+        for field_name, coerce, _label, default in fields:
+            if field_name not in validated:
+                if default is not _UNSET:
+                    validated[field_name] = default
+                elif field_name in required:
+                    problems.append(f"{field_name}: required")
+                continue
+            try:
+                validated[field_name] = coerce(validated[field_name])
+            except TypeError as error:
+                problems.append(f"{field_name}: {error}")
+        missing = required - known - set(validated)
+        problems.extend(f"{field_name}: required" for field_name in sorted(missing))
+        if not allow_extra:
+            problems.extend(
+                f"{field_name}: unexpected argument" for field_name in validated if field_name not in known
+            )
+        if problems:
+            raise ToolInputError(tool_name, problems)
+        return validated
+
+    return _validate
+
+
+def json_input_schema(schema: Any) -> dict[str, Any]:
+    """Return a tool ``input_schema`` as the JSON Schema object MCP ``tools/list`` expects."""
+
+    if not isinstance(schema, dict):
+        return {"type": "object"}
+    if schema.get("type") == "object" or "properties" in schema:
+        return schema
+    properties = {
+        field_name: ({} if spec == "any" else {"type": spec}) if isinstance(spec, str) else spec
+        for field_name, spec in schema.items()
+    }
+    return {"type": "object", "properties": properties, "required": list(schema)}
+
+
+def _tool_validator(method: Any) -> ArgumentValidator | None:
+    # Compiled once per decorated function and cached on it, so every class
+    # and instance sharing the method reuses the same validator.
+    validator = getattr(method, "__python_agents_tool_validator__", _UNSET)
+    if validator is _UNSET:
+        validator = compile_input_schema(
+            getattr(method, "__python_agents_tool_name__", ""),
+            getattr(method, "__python_agents_tool_input_schema__", None),
+        )
+        getattr(method, "__func__", method).__python_agents_tool_validator__ = validator
+    return validator
+
+
+def _tool_js_schema(method: Any) -> Any:
+    js_schema = getattr(method, "__python_agents_tool_js_schema__", _UNSET)
+    if js_schema is _UNSET:
+        schema = getattr(method, "__python_agents_tool_input_schema__", None)
+        js_schema = convert_arg(schema, to_js)
+        getattr(method, "__func__", method).__python_agents_tool_js_schema__ = js_schema
+    return js_schema
+
+
+def _invoke(method: Any, arguments: dict[str, Any] | None) -> Any:
+    validator = _tool_validator(method)
+    arguments = arguments or {}
+    if validator is not None:
+        arguments = validator(arguments)
+    if hasattr(method, "__self__"):
+        method = dispatcher(method.__self__, method.__python_agents_tool_name__, method)
+    return method(**arguments)
+
+
+def _tool_registry(obj: Any) -> dict[str, str]:
+    return method_registry(type(obj), "__python_agents_tool__", "__python_agents_tool_name__")
+
+
 def get_tool_methods(obj: Any) -> dict[str, McpToolHandler]:
     """Return MCP-tool name -> bound method for an object instance."""
 
-    methods: dict[str, McpToolHandler] = {}
-    for attr_name in dir(obj):
-        candidate = getattr(obj, attr_name, None)
-        if builtins.callable(candidate) and getattr(candidate, "__python_agents_tool__", False):
-            exposed_name = getattr(candidate, "__python_agents_tool_name__", attr_name)
-            methods[exposed_name] = candidate
-    return methods
+    return bind_methods(obj, _tool_registry(obj))
 
 
 async def call_tool(obj: Any, name: str, arguments: dict[str, Any] | None = None) -> Any:
-    """Invoke a ``@tool`` method by exposed name using MCP-style arguments."""
+    """Invoke a ``@tool`` method by exposed name using MCP-style arguments.
+
+    Streaming tools return their async iterator of chunks without consuming it.
+    """
 
-    methods = get_tool_methods(obj)
-    if name not in methods:
+    attr_name = _tool_registry(obj).get(name)
+    if attr_name is None:
         raise KeyError(f"No MCP tool named '{name}'")
-    result = methods[name](**(arguments or {}))
+    method = getattr(obj, attr_name)
+    if instrumentation.hooks:
+        return await instrumentation.observe("tool", name, arguments, lambda: _invoke(method, arguments))
+    result = _invoke(method, arguments)
     return await maybe_await(result)
 
 
+async def stream_tool(
+    obj: Any, name: str, arguments: dict[str, Any] | None = None
+) -> AsyncIterator[Any]:
+    """Iterate a tool's output: every chunk of a streaming tool, else one result."""
+
+    result = await call_tool(obj, name, arguments)
+    if isinstance(result, AsyncGenerator):
+        async for chunk in result:
+            yield chunk
+    else:
+        yield result
+
+
+def _content_items(chunk: Any) -> list[Any]:
+    if isinstance(chunk, str):
+        return [{"type": "text", "text": chunk}]
+    if isinstance(chunk, dict) and "content" in chunk:
+        return list(chunk["content"])
+    return [chunk]
+
+
+async def run_tool(
+    method: Any,
+    arguments: dict[str, Any] | None,
+    on_progress: Callable[[int, str], Any] | None = None,
+) -> Any:
+    """Invoke a bound ``@tool`` method with MCP-style arguments for an MCP server.
+
+    A streaming tool is consumed into one ``{"content": [...]}`` result, and
+    ``on_progress(progress, text)`` (awaited if it returns an awaitable) is
+    called for each chunk as it arrives. Other results are returned as-is.
+    """
+
+    result = await maybe_await(_invoke(method, arguments))
+    if isinstance(result, AsyncGenerator):
+        result = await _stream_result(result, on_progress)
+    return result
+
+
+async def _stream_result(
+    chunks: AsyncIterator[Any], on_progress: Callable[[int, str], Any] | None
+) -> dict[str, Any]:
+    # The MCP result must still carry the full content, because clients (and
+    # the model) read the tool result, not progress messages. So this delivers
+    # chunks early as ``notifications/progress`` when the client sent a
+    # progressToken, but holds all of the content until the end: memory is
+    # O(total output), not O(chunk).
+    content: list[Any] = []
+    progress = 0
+    async for chunk in chunks:
+        items = _content_items(chunk)
+        progress += 1
+        content.extend(items)
+        if on_progress is not None:
+            text = "".join(item.get("text", "") for item in items if isinstance(item, dict))
+            await maybe_await(on_progress(progress, text))
+    return {"content": content}
+
+
+async def _run_mcp_tool(method: Any, arguments: dict[str, Any] | None, extra: Any) -> Any:
+    token = getattr(getattr(extra, "_meta", None), "progressToken", None)
+
+    def _progress(progress: int, text: str) -> Any:
+        notification = {
+            "method": "notifications/progress",
+            "params": {"progressToken": token, "progress": progress, "message": text},
+        }
+        return extra.sendNotification(to_js(notification))
+
+    result = await run_tool(method, arguments, None if token is None else _progress)
+    return convert_arg(result, to_js)
+
+
 def register_mcp_tools(server: Any, obj: Any) -> None:
     """Register all ``@tool`` methods from ``obj`` on a JS MCP server.
 
     Mirrors the JavaScript shape:
-    ``server.tool(name, inputSchema, async (args) => result)``.
+    ``server.tool(name, inputSchema, async (args, extra) => result)``.
+    Streaming tools send each chunk as a progress notification when the client
+    asked for progress, and return the combined content as the result, so
+    the full output is held in memory until the tool finishes.
     """
 
     for exposed_name, method in get_tool_methods(obj).items():
         schema = getattr(method, "__python_agents_tool_input_schema__", None)
 
-        async def _handler(arguments: dict[str, Any], _method: McpToolHandler = method):
-            result = _method(**(arguments or {}))
-            return await maybe_await(result)
+        # The JS SDK calls ``cb(args, extra)`` when a schema is given and
+        # ``cb(extra)`` when it is not.
+        async def _handler(
+            *params: Any, _method: McpToolHandler = method, _takes_args: bool = schema is not None
+        ):
+            if not _takes_args:
+                params = ({}, *params)
+            arguments, extra = (*params, None, None)[:2]
+            arguments = to_py(arguments)
+            if instrumentation.hooks:
+                return await instrumentation.observe(
+                    "mcp_tool",
+                    _method.__python_agents_tool_name__,
+                    arguments,
+                    lambda: _run_mcp_tool(_method, arguments, extra),
+                )
+            return await _run_mcp_tool(_method, arguments, extra)
 
         if schema is None:
             server.tool(exposed_name, _handler)
             continue
 
-        js_schema = to_js(schema) if isinstance(schema, dict | list | tuple) else schema
-        server.tool(exposed_name, js_schema, _handler)
+        server.tool(exposed_name, _tool_js_schema(method), _handler)
@@ -9,10 +9,153 @@ import {
   McpAgent,
   createAddressBasedEmailResolver,
   createMcpHandler,
+  getAgentByName,
   routeAgentEmail,
   routeAgentRequest,
 } from "agents";
 
+const escapePointer = (key) => key.replaceAll("~", "~0").replaceAll("/", "~1");
+const isObject = (value) => value !== null && typeof value === "object" && !Array.isArray(value);
+
+function deepEqual(left, right) {
+  if (left === right) return true;
+  if (Array.isArray(left) && Array.isArray(right)) {
+    return (
+      left.length === right.length && left.every((item, index) => deepEqual(item, right[index]))
+    );
+  }
+  if (!isObject(left) || !isObject(right)) return false;
+  const keys = Object.keys(left);
+  return (
+    keys.length === Object.keys(right).length &&
+    keys.every((key) => Object.hasOwn(right, key) && deepEqual(left[key], right[key]))
+  );
+}
+
+/**
+ * JSON-Patch operations turning ``before`` into ``after``. Objects are diffed
+ * key by key; any other change (including arrays) replaces the value. Keep in
+ * sync with ``python_agents/_jsonpatch.py`` and the frontend helper.
+ */
+function diffState(before, after, path = "") {
+  if (deepEqual(before, after)) return [];
+  if (!isObject(before) || !isObject(after)) return [{ op: "replace", path, value: after }];
+  const ops = [];
+  for (const key of Object.keys(before)) {
+    if (!Object.hasOwn(after, key)) {
+      ops.push({ op: "remove", path: `${path}/${escapePointer(key)}` });
+    }
+  }
+  for (const [key, value] of Object.entries(after)) {
+    const child = `${path}/${escapePointer(key)}`;
+    if (!Object.hasOwn(before, key)) ops.push({ op: "add", path: child, value });
+    else ops.push(...diffState(before[key], value, child));
+  }
+  return ops;
+}
+
+// How many state versions are kept as diff bases for lagging clients.
+const STATE_SNAPSHOTS = 16;
+
+function parseControl(message, type) {
+  if (typeof message !== "string" || !message.includes(`"${type}"`)) return null;
+  try {
+    const parsed = JSON.parse(message);
+    return parsed?.type === type ? parsed : null;
+  } catch {
+    return null;
+  }
+}
+
+/**
+ * Agent subclass used by the Python wrapper. It counts state updates so the
+ * Python-side state mirror knows when to re-convert ``agent.state``, and in
+ * ``"diff"`` state-sync mode sends clients JSON-Patches against the last state
+ * version each of them acknowledged. Versioned full states use their own
+ * ``cf_agent_state_snapshot`` type so ``useAgent`` forwards them to
+ * ``onMessage`` instead of consuming them.
+ */
+class PythonAgent extends Agent {
+  pythonStateVersion = 0;
+  // Python-side KeyedState caches, shared by every wrapper of this agent.
+  pythonKvCaches = null;
+  pythonStateSync = "full";
+  pythonSyncVersion = 0;
+  pythonSnapshots = new Map();
+  pythonAcked = new Map();
+
+  onStateUpdate(state, source) {
+    this.pythonStateVersion += 1;
+    return super.onStateUpdate?.(state, source);
+  }
+
+  broadcast(message, without) {
+    const update = this.pythonStateSync === "diff" && parseControl(message, "cf_agent_state");
+    if (!update) return super.broadcast(message, without);
+
+    const version = ++this.pythonSyncVersion;
+    this.pythonSnapshots.set(version, update.state);
+    if (this.pythonSnapshots.size > STATE_SNAPSHOTS) {
+      this.pythonSnapshots.delete(this.pythonSnapshots.keys().next().value);
+    }
+    for (const connection of this.getConnections()) {
+      if (without?.includes(connection.id)) continue;
+      const base = this.pythonAcked.get(connection.id);
+      const snapshot = this.pythonSnapshots.get(base);
+      const frame =
+        snapshot === undefined
+          ? { type: "cf_agent_state_snapshot", state: update.state, version }
+          : {
+              type: "cf_agent_state_patch",
+              base,
+              version,
+              patch: diffState(snapshot, update.state),
+            };
+      connection.send(JSON.stringify(frame));
+    }
+  }
+
+  onMessage(connection, message) {
+    const ack = parseControl(message, "cf_agent_state_ack");
+    if (ack) {
+      this.pythonAcked.set(connection.id, ack.version);
+      return;
+    }
+    if (parseControl(message, "cf_agent_state_resync")) {
+      this.pythonAcked.delete(connection.id);
+      const version = this.pythonSyncVersion;
+      const frame = { type: "cf_agent_state_snapshot", state: this.state, version };
+      connection.send(JSON.stringify(frame));
+      return;
+    }
+    return super.onMessage?.(connection, message);
+  }
+
+  onClose(connection, ...rest) {
+    this.pythonAcked.delete(connection.id);
+    return super.onClose?.(connection, ...rest);
+  }
+}
+
+// URL class segments are kebab-cased binding names, as in routeAgentRequest.
+const kebabCase = (name) =>
+  name === name.toUpperCase()
+    ? name.toLowerCase().replaceAll("_", "-")
+    : name.replace(/[A-Z]/g, (char, index) => (index ? "-" : "") + char.toLowerCase());
+const agentBindings = new WeakMap();
+
+function agentBinding(env, agentClass) {
+  let bindings = agentBindings.get(env);
+  if (bindings === undefined) {
+    bindings = new Map(Object.keys(env).map((key) => [kebabCase(key), key]));
+    agentBindings.set(env, bindings);
+  }
+  return bindings.get(agentClass);
+}
+
+// Releases PyBuffers handed out as zero-copy views once the view is collected.
+const pythonBuffers = new FinalizationRegistry((buffer) => buffer.release());
+
 globalThis.__PYTHON_AGENTS_SDK = {
   Agent,
   AgentWorkflow,
@@ -22,7 +165,7 @@ globalThis.__PYTHON_AGENTS_SDK = {
   routeAgentEmail,
   routeAgentRequest,
   createAgent(init = {}) {
-    return new Agent(init);
+    return new PythonAgent(init);
   },
   createMcpAgent(init = {}) {
     return new McpAgent(init);
@@ -30,4 +173,156 @@ globalThis.__PYTHON_AGENTS_SDK = {
   createAgentWorkflow(init = {}) {
     return new AgentWorkflow(init);
   },
+  setStateSync(agent, mode) {
+    agent.pythonStateSync = mode;
+    if (mode !== "diff") agent.pythonAcked.clear();
+  },
+  adoptBuffer(buffer) {
+    const view = buffer.data;
+    pythonBuffers.register(view, buffer);
+    return view;
+  },
+  queueMany(agent, payloads, callback) {
+    // Every queue() call is issued in the same turn, so the Durable Object's
+    // implicit write coalescing commits them as one storage transaction.
+    return Promise.all(
+      Array.from(payloads, (payload) =>
+        callback == null ? agent.queue(payload) : agent.queue(callback, payload),
+      ),
+    );
+  },
+  dequeueMany(agent, ids) {
+    return Promise.all(Array.from(ids, (id) => agent.dequeue(id)));
+  },
+  scheduleMany(agent, specs) {
+    return Promise.all(
+      Array.from(specs, (spec) =>
+        spec.every != null
+          ? agent.scheduleEvery(spec.payload, spec.every)
+          : agent.schedule(spec.payload, spec.when),
+      ),
+    );
+  },
+  cancelSchedules(agent, ids) {
+    return Promise.all(Array.from(ids, (id) => agent.cancelSchedule(id)));
+  },
+  async routeAgentTo(request, env, agentClass, name, options = {}) {
+    // The URL was already matched in Python; skip the SDK's pattern matching.
+    const binding = agentBinding(env, agentClass);
+    if (binding === undefined) return routeAgentRequest(request, env, options ?? {});
+    const stub = await getAgentByName(env[binding], name, options ?? {});
+    const headers = new Headers(request.headers);
+    headers.set("x-partykit-room", name);
+    headers.set("x-partykit-namespace", agentClass);
+    return stub.fetch(new Request(request, { headers }));
+  },
+  // Durable Object storage reads, writes and deletes take at most 128 keys.
+  async kvGet(agent, keys) {
+    const found = {};
+    for (let start = 0; start < keys.length; start += 128) {
+      const values = await agent.ctx.storage.get(keys.slice(start, start + 128));
+      for (const [key, value] of values) found[key] = value;
+    }
+    return found;
+  },
+  async kvPut(agent, entries) {
+    const pairs = Object.entries(entries);
+    for (let start = 0; start < pairs.length; start += 128) {
+      await agent.ctx.storage.put(Object.fromEntries(pairs.slice(start, start + 128)));
+    }
+  },
+  async kvDelete(agent, keys) {
+    let deleted = 0;
+    for (let start = 0; start < keys.length; start += 128) {
+      deleted += await agent.ctx.storage.delete(keys.slice(start, start + 128));
+    }
+    return deleted;
+  },
+  async kvList(agent, prefix, startAfter, limit) {
+    const options = { prefix };
+    if (startAfter != null) options.startAfter = startAfter;
+    if (limit != null) options.limit = limit;
+    // [key, value] pairs keep key order (object keys that look like integers would not).
+    return Array.from(await agent.ctx.storage.list(options));
+  },
+  // MCP Streamable HTTP client transport for python_agents.mcp_client. The
+  // message arrives as JSON text; JSON and SSE replies come back as a list.
+  async mcpRequest(url, message, sessionId = null, headers = {}) {
+    const response = await fetch(url, {
+      method: "POST",
+      headers: {
+        "content-type": "application/json",
+        accept: "application/json, text/event-stream",
+        ...(sessionId ? { "mcp-session-id": sessionId } : {}),
+        ...headers,
+      },
+      body: message,
+    });
+    const text = await response.text();
+    const messages = [];
+    if ((response.headers.get("content-type") ?? "").includes("text/event-stream")) {
+      for (const event of text.split(/\r?\n\r?\n/)) {
+        const data = event
+          .split(/\r?\n/)
+          .filter((line) => line.startsWith("data:"))
+          .map((line) => line.slice(5).trimStart())
+          .join("\n");
+        if (data) messages.push(JSON.parse(data));
+      }
+    } else if (text) {
+      messages.push(...[JSON.parse(text)].flat());
+    }
+    return { status: response.status, sessionId: response.headers.get("mcp-session-id"), messages };
+  },
+  async mcpClose(url, sessionId, headers = {}) {
+    await fetch(url, { method: "DELETE", headers: { "mcp-session-id": sessionId, ...headers } });
+  },
+  jsonResponse(body, status = 200, headers = {}) {
+    return new Response(body || null, {
+      status,
+      headers: { "content-type": "application/json", ...headers },
+    });
+  },
+  eventStream(next, headers = {}) {
+    // `next` is a persistent Python proxy returning the next SSE chunk, or
+    // null when the stream is finished.
+    const encoder = new TextEncoder();
+    const body = new ReadableStream({
+      async pull(controller) {
+        const chunk = await next();
+        if (chunk == null) {
+          next.destroy?.();
+          controller.close();
+        } else {
+          controller.enqueue(encoder.encode(chunk));
+        }
+      },
+      cancel() {
+        next.destroy?.();
+      },
+    });
+    return new Response(body, {
+      headers: { "content-type": "text/event-stream", "cache-control": "no-cache", ...headers },
+    });
+  },
+  routeResolvedEmail(email, env, agentName, agentId) {
+    // The address was already resolved in Python; only the target crosses.
+    return routeAgentEmail(email, env, { resolver: async () => ({ agentName, agentId }) });
+  },
+  async queueDepth(agent) {
+    // Counted on the JS side so no queue rows cross into Python.
+    return ((await agent.getQueue()) ?? []).length;
+  },
+  async filterQueue(agent, where = {}, limit = null) {
+    const conditions = Object.entries(where);
+    const matches = [];
+    for (const item of (await agent.getQueue()) ?? []) {
+      const payload = item?.payload ?? item;
+      if (conditions.every(([key, value]) => payload?.[key] === value)) {
+        matches.push(item);
+        if (limit != null && matches.length >= limit) break;
+      }
+    }
+    return matches;
+  },
 };
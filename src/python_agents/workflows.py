@@ -0,0 +1,162 @@
+"""Checkpointed, optionally parallel steps for Python workflows."""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+from collections.abc import Awaitable, Callable, Iterable
+from typing import Any
+
+from ._cache import SingleFlight, TTLCache, argument_key, delete_prefix, key_digest
+from ._ffi import maybe_await, to_js, to_py
+
+# Set while a step body runs, so steps started from inside a step do not wait
+# for a concurrency slot their parent is holding.
+_in_step: contextvars.ContextVar[bool] = contextvars.ContextVar("python_agents_in_step", default=False)
+
+
+class MemoryCheckpoints:
+    """Isolate-local stand-in for Durable Object storage (``get``/``put``/``delete``/``list``)."""
+
+    def __init__(self):
+        self._data: dict[str, Any] = {}
+
+    def get(self, key: str) -> Any:
+        return self._data.get(key)
+
+    def put(self, key: str, value: Any) -> None:
+        self._data[key] = value
+
+    def delete(self, keys: str | Iterable[str]) -> int:
+        keys = [keys] if isinstance(keys, str) else list(keys)
+        return sum(self._data.pop(key, None) is not None for key in keys)
+
+    def list(self, options: dict[str, Any] | None = None) -> dict[str, Any]:
+        prefix = (options or {}).get("prefix", "")
+        return {key: value for key, value in sorted(self._data.items()) if key.startswith(prefix)}
+
+
+# Checkpoints of runs without durable storage, per workflow instance id, so a
+# retry in the same isolate replays finished steps.
+_isolate_checkpoints = TTLCache(256)
+
+
+def isolate_checkpoints(instance_id: str) -> MemoryCheckpoints:
+    """Return the isolate-wide :class:`MemoryCheckpoints` for one workflow instance."""
+
+    checkpoints = _isolate_checkpoints.get(instance_id, count=False)
+    if checkpoints is None:
+        checkpoints = MemoryCheckpoints()
+        _isolate_checkpoints.set(instance_id, checkpoints)
+    return checkpoints
+
+
+class WorkflowSteps:
+    """Run named workflow steps once per input, optionally side by side.
+
+    Each finished step's result is stored under ``<prefix><name>:<input
+    hash>`` in ``storage`` (Durable Object ``ctx.storage`` or anything with the
+    same ``get``/``put``/``delete``/``list`` methods). Running the same step
+    with the same arguments again, for example when a workflow is retried
+    after a later step failed, returns the checkpoint instead of calling the
+    step. Without ``storage`` a new :class:`MemoryCheckpoints` is used, which
+    only replays within this object; use :func:`isolate_checkpoints` (or
+    :meth:`AgentWorkflow.steps <python_agents.AgentWorkflow.steps>`) to
+    replay across runs in one isolate.
+
+    Steps awaited together (``asyncio.gather`` or :meth:`parallel`) run
+    concurrently, at most ``concurrency`` at a time. Concurrent calls for the
+    same step and input share one run. Results must be JSON-serializable.
+    """
+
+    def __init__(
+        self,
+        storage: Any = None,
+        *,
+        concurrency: int = 4,
+        prefix: str = "python_agents:step:",
+    ):
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.storage = storage if storage is not None else MemoryCheckpoints()
+        self.concurrency = concurrency
+        self.prefix = prefix
+        self._slots = asyncio.Semaphore(concurrency)
+        self._flights = SingleFlight()
+        self.executed = 0
+        self.replayed = 0
+        self.failed = 0
+
+    def checkpoint_key(self, name: str, args: tuple[Any, ...] = (), kwargs: dict[str, Any] | None = None) -> str:
+        """Storage key for ``name`` called with ``args`` / ``kwargs``."""
+
+        return f"{self.prefix}{name}:{key_digest(argument_key(args, kwargs or {}))}"
+
+    async def do(self, name: str, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Return ``func(*args, **kwargs)``, from its checkpoint when there is one."""
+
+        key = self.checkpoint_key(name, args, kwargs)
+
+        async def _run() -> Any:
+            stored = to_py(await maybe_await(self.storage.get(key)))
+            if stored is not None:
+                self.replayed += 1
+                return stored["value"]
+            try:
+                if _in_step.get():
+                    value = await maybe_await(func(*args, **kwargs))
+                else:
+                    async with self._slots:
+                        _in_step.set(True)
+                        value = await maybe_await(func(*args, **kwargs))
+            except Exception:
+                self.failed += 1
+                raise
+            await maybe_await(self.storage.put(key, to_js({"value": value})))
+            self.executed += 1
+            return value
+
+        return await self._flights.run(key, _run)
+
+    async def parallel(self, steps: Iterable[tuple[Any, ...]]) -> list[Any]:
+        """Run ``(name, func, *args)`` steps concurrently; results keep their order.
+
+        Every step is allowed to finish (and checkpoint) before the first
+        failure, if any, is raised, so a retry only reruns the failed steps.
+        """
+
+        results = await asyncio.gather(
+            *(self.do(name, func, *args) for name, func, *args in steps), return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        return results
+
+    def step(self, name: str | None = None) -> Callable[[Callable[..., Any]], Callable[..., Awaitable[Any]]]:
+        """Decorator: calling the function runs it as the checkpointed step ``name``."""
+
+        def _decorate(func: Callable[..., Any]) -> Callable[..., Awaitable[Any]]:
+            step_name = name or func.__name__
+
+            @functools.wraps(func)
+            async def _step(*args: Any, **kwargs: Any) -> Any:
+                return await self.do(step_name, func, *args, **kwargs)
+
+            return _step
+
+        return _decorate
+
+    async def reset(self, name: str | None = None) -> int:
+        """Delete checkpoints for one step name or all of them; returns how many."""
+
+        return await delete_prefix(self.storage, self.prefix if name is None else f"{self.prefix}{name}:")
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "executed": self.executed,
+            "replayed": self.replayed,
+            "failed": self.failed,
+            "coalesced": self._flights.coalesced,
+        }
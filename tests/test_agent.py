@@ -1,13 +1,17 @@
 from __future__ import annotations
 
 import asyncio
+import pathlib
+import subprocess
+import sys
 
 import pytest
 
 from python_agents import agent as agent_module
 from python_agents import apis as apis_module
+from python_agents import instrumentation
 from python_agents import tools as tools_module
-from python_agents._ffi import snake_to_camel
+from python_agents._ffi import JsonPayload, snake_to_camel, to_js
 from python_agents.agent import Agent, call_callable, callable, get_callable_methods
 from python_agents.apis import (
     AgentWorkflow,
@@ -16,8 +20,17 @@ from python_agents.apis import (
     create_mcp_handler,
     route_agent_email,
 )
-from python_agents.tools import call_tool, get_tool_methods, register_mcp_tools, tool
+from python_agents.tools import (
+    ToolInputError,
+    call_tool,
+    get_tool_methods,
+    register_mcp_tools,
+    stream_tool,
+    tool,
+)
 from python_agents.routing import (
+    AgentStubCache,
+    fan_out,
     get_agent_by_name,
     route_agent_request,
     route_agent_requests,
@@ -49,6 +62,19 @@ class FakeJSAgent:
     def getSchedules(self):
         return ["one", "two"]
 
+    def queue(self, payload):
+        self.queued = getattr(self, "queued", {})
+        queue_id = f"q{len(self.queued)}"
+        self.queued[queue_id] = {"id": queue_id, "payload": payload}
+        return FakePromise(queue_id)
+
+    def dequeue(self, queue_id):
+        self.queued.pop(queue_id, None)
+        return FakePromise(None)
+
+    def getQueue(self):
+        return list(getattr(self, "queued", {}).values())
+
 
 class FakeJSMcpAgent:
     def __init__(self, init):
@@ -70,6 +96,26 @@ class FakeJSWorkflow:
 
 
 class FakeSDK:
+    def __init__(self):
+        self.bridge_calls: list[str] = []
+
+    def queueMany(self, agent, payloads, callback=None):
+        self.bridge_calls.append("queueMany")
+        return FakePromise([agent.queue(payload).value for payload in payloads])
+
+    def dequeueMany(self, agent, ids):
+        self.bridge_calls.append("dequeueMany")
+        return FakePromise([agent.dequeue(queue_id).value for queue_id in ids])
+
+    def filterQueue(self, agent, where, limit=None):
+        self.bridge_calls.append("filterQueue")
+        matches = [
+            item
+            for item in agent.getQueue()
+            if all(item["payload"].get(key) == value for key, value in where.items())
+        ]
+        return FakePromise(matches[:limit] if limit is not None else matches)
+
     def createAgent(self, init):
         return FakeJSAgent(init)
 
@@ -108,15 +154,32 @@ class FakeMcpServer:
 
 @pytest.fixture(autouse=True)
 def patch_sdk(monkeypatch):
-    monkeypatch.setattr(agent_module, "get_agents_sdk", lambda: FakeSDK())
+    sdk = FakeSDK()
+    monkeypatch.setattr(agent_module, "get_agents_sdk", lambda: sdk)
     monkeypatch.setattr(agent_module, "to_js", lambda value: value)
-    monkeypatch.setattr(apis_module, "get_agents_sdk", lambda: FakeSDK())
+    monkeypatch.setattr(apis_module, "get_agents_sdk", lambda: sdk)
     monkeypatch.setattr(apis_module, "to_js", lambda value: value)
     monkeypatch.setattr(tools_module, "to_js", lambda value: value)
 
     import python_agents.routing as routing_module
 
-    monkeypatch.setattr(routing_module, "get_agents_sdk", lambda: FakeSDK())
+    monkeypatch.setattr(routing_module, "get_agents_sdk", lambda: sdk)
+    monkeypatch.setattr(routing_module, "to_js", lambda value: value)
+
+
+def test_package_imports_submodules_lazily():
+    code = (
+        "import sys, python_agents\n"
+        "loaded = sorted(m for m in sys.modules if m.startswith('python_agents.'))\n"
+        "assert loaded == [], loaded\n"
+        "python_agents.route_agent_request\n"
+        "assert 'python_agents.tools' not in sys.modules\n"
+        "assert 'python_agents.apis' not in sys.modules\n"
+        "assert set(python_agents.__all__) <= set(dir(python_agents))\n"
+        "assert all(getattr(python_agents, name) for name in python_agents.__all__)\n"
+    )
+    src = str(pathlib.Path(agent_module.__file__).resolve().parents[1])
+    subprocess.run([sys.executable, "-c", code], check=True, env={"PYTHONPATH": src})
 
 
 def test_snake_to_camel():
@@ -142,6 +205,179 @@ def test_call_non_awaitable_method():
     asyncio.run(_run())
 
 
+def test_known_methods_are_generated_and_js_lookups_cached():
+    async def _run():
+        assert "set_state" in Agent.__dict__
+        agent = Agent.create(state={"count": 0})
+        lookups = []
+        js_agent = agent._js_agent
+        original = type(js_agent).__getattribute__
+
+        class CountingJSAgent(type(js_agent)):
+            def __getattribute__(self, name):
+                lookups.append(name)
+                return original(self, name)
+
+        js_agent.__class__ = CountingJSAgent
+        for count in range(3):
+            await agent.set_state({"count": count})
+        assert lookups.count("setState") == 1
+
+    asyncio.run(_run())
+
+
+def test_subclass_known_methods_get_generated_stubs():
+    class ChatAgent(Agent):
+        __slots__ = ()
+        _KNOWN_METHODS = Agent._KNOWN_METHODS | {"save_messages"}
+
+    async def _run():
+        assert "save_messages" in ChatAgent.__dict__ and "set_state" not in ChatAgent.__dict__
+        assert not hasattr(Agent, "save_messages")
+        agent = ChatAgent(Agent.create(state={})._js_agent)
+        agent._js_agent.saveMessages = lambda messages: len(messages)
+        assert await agent.save_messages(["hi", "there"]) == 2
+
+    asyncio.run(_run())
+
+
+def test_batch_state_coalesces_writes_into_one_set_state():
+    async def _run():
+        agent = Agent.create(state={"count": 0, "step": "start"})
+        writes = []
+        set_state = agent._js_agent.setState
+        agent._js_agent.setState = lambda patch: writes.append(dict(patch)) or set_state(patch)
+
+        async with agent.batch_state():
+            for count in range(1, 6):
+                assert await agent.set_state({"count": count}) is None
+                assert agent.state["count"] == count
+            await agent.set_state({"step": "done"})
+            assert agent.state == {"count": 5, "step": "done"}
+            assert writes == []
+
+        assert writes == [{"count": 5, "step": "done"}]
+        assert agent.state == {"count": 5, "step": "done"}
+
+    asyncio.run(_run())
+
+
+def test_batch_state_explicit_flush_and_flush_on_error():
+    async def _run():
+        agent = Agent.create(state={})
+        writes = []
+        set_state = agent._js_agent.setState
+        agent._js_agent.setState = lambda patch: writes.append(dict(patch)) or set_state(patch)
+
+        with pytest.raises(ValueError):
+            async with agent.batch_state():
+                await agent.set_state({"a": 1})
+                await agent.flush_state()
+                await agent.set_state({"b": 2})
+                async with agent.batch_state():
+                    await agent.set_state({"c": 3})
+                assert len(writes) == 1
+                raise ValueError("boom")
+
+        assert writes == [{"a": 1}, {"b": 2, "c": 3}]
+        assert await agent.set_state({"d": 4}) == {"a": 1, "b": 2, "c": 3, "d": 4}
+
+    asyncio.run(_run())
+
+
+def test_state_mirror_is_cached_and_invalidated_by_js_updates():
+    async def _run():
+        agent = Agent.create(state={"count": 0})
+        js_agent = agent._js_agent
+        js_agent.pythonStateVersion = 0
+
+        assert agent.state == {"count": 0}
+        assert agent.state["count"] == 0
+        assert agent.state_cache_stats() == {"conversions": 1, "conversions_avoided": 1}
+
+        js_agent.pythonStateVersion += 1
+        original = js_agent.setState
+
+        def _set_state(patch):
+            js_agent.pythonStateVersion += 1
+            return original(patch)
+
+        js_agent.setState = _set_state
+        await agent.set_state({"count": 1})
+        assert agent.state == {"count": 1}
+        # The unseen JS-side bump forced one re-conversion on the next read.
+        assert agent.state_cache_stats()["conversions"] == 2
+
+        await agent.set_state({"count": 2})
+        assert agent.state == {"count": 2}
+        assert agent.state_cache_stats()["conversions"] == 2
+
+        # A client-side update bumps the version and is picked up on read.
+        js_agent.state["count"] = 10
+        js_agent.pythonStateVersion += 1
+        assert agent.state["count"] == 10
+
+        agent.on_state_update({"count": 11}, "client")
+        assert agent.state == {"count": 11}
+
+        agent.invalidate_state()
+        assert agent.state == {"count": 10}
+        assert agent.state_cache_stats()["conversions"] == 5
+
+        # Without a bridge version the mirror stays live.
+        unversioned = FakeJSAgent({"state": {"a": 1}})
+        wrapped = Agent(unversioned)
+        assert wrapped.state == {"a": 1}
+        unversioned.setState({"a": 2})
+        assert wrapped.state == {"a": 2}
+        await wrapped.set_state({"a": 3})
+        unversioned.state["a"] = 4
+        assert wrapped.state == {"a": 4}
+
+    asyncio.run(_run())
+
+
+def test_bulk_queue_apis_use_one_bridge_call_each():
+    async def _run():
+        agent = Agent.create(state={})
+        jobs = [{"job": "index", "doc_id": index % 3} for index in range(10)]
+        ids = await agent.queue_many(jobs)
+        assert len(ids) == 10
+
+        matches = await agent.get_queue(where={"doc_id": 1})
+        assert [item["payload"]["doc_id"] for item in matches] == [1, 1, 1]
+        assert len(await agent.get_queue(where={"job": "index"}, limit=2)) == 2
+
+        await agent.dequeue_many(ids[:8])
+        assert [item["id"] for item in await agent.get_queue()] == ids[8:]
+        calls = agent_module.get_agents_sdk().bridge_calls
+        assert calls == ["queueMany", "filterQueue", "filterQueue", "dequeueMany"]
+
+    asyncio.run(_run())
+
+
+def test_call_converts_only_js_convertible_args(monkeypatch):
+    converted = []
+    monkeypatch.setattr(agent_module, "to_js", lambda value: converted.append(value) or value)
+
+    async def _run():
+        agent = Agent.create(state={})
+        payload = JsonPayload({"nested": [{"a": 1}]})
+        agent._js_agent.echo = lambda *args: args
+        marker = object()
+        assert await agent.call("echo", {"a": 1}, payload, b"raw", "text", marker) == (
+            {"a": 1}, payload, b"raw", "text", marker
+        )
+        assert converted[-3:] == [{"a": 1}, payload, b"raw"]
+
+    asyncio.run(_run())
+
+
+def test_to_js_passes_primitives_through_without_a_js_runtime():
+    for value in ("text", 1, 2.5, True, None):
+        assert to_js(value) is value
+
+
 def test_unknown_method_raises_attribute_error():
     agent = Agent.create(state={})
     with pytest.raises(AttributeError):
@@ -189,6 +425,143 @@ def test_route_helpers_and_get_agent_by_name():
     asyncio.run(_run())
 
 
+def test_agent_stub_cache_hits_invalidates_and_dedupes(monkeypatch):
+    lookups = []
+
+    async def _get_agent_by_name(self, namespace, name):
+        lookups.append(name)
+        await asyncio.sleep(0)
+        return FakeJSAgent({"state": {"name": name}})
+
+    monkeypatch.setattr(FakeSDK, "getAgentByName", _get_agent_by_name)
+
+    async def _run():
+        cache = AgentStubCache(maxsize=2)
+        first, second = await asyncio.gather(
+            get_agent_by_name("chat", "a", cache=cache),
+            get_agent_by_name("chat", "a", cache=cache),
+        )
+        # One cached stub, but a fresh wrapper per lookup.
+        assert first is not second and first._js_agent is second._js_agent
+        assert lookups == ["a"]
+        assert (await get_agent_by_name("chat", "a", cache=cache))._js_agent is first._js_agent
+
+        await get_agent_by_name("chat", "b", cache=cache)
+        await get_agent_by_name("chat", "c", cache=cache)
+        assert len(cache) == 2
+        assert cache.invalidate("chat", "c") == 1
+        assert cache.invalidate("other") == 0
+
+        uncached = await get_agent_by_name("chat", "a")
+        assert uncached._js_agent is not first._js_agent
+        assert lookups == ["a", "b", "c", "a"]
+        assert cache.stats() == {
+            "hits": 1,
+            "misses": 4,
+            "evictions": 1,
+            "expirations": 0,
+            "size": 1,
+            "coalesced": 1,
+        }
+
+        expiring = AgentStubCache(ttl=0)
+        await get_agent_by_name("chat", "a", cache=expiring)
+        await get_agent_by_name("chat", "a", cache=expiring)
+        assert expiring.stats()["expirations"] == 1
+
+    asyncio.run(_run())
+
+
+def test_agent_stub_cache_wrappers_do_not_share_batches(monkeypatch):
+    writes = []
+
+    def _set_state(self, patch):
+        writes.append(dict(patch))
+        self.state.update(patch)
+        return FakePromise(self.state)
+
+    monkeypatch.setattr(FakeJSAgent, "setState", _set_state)
+
+    async def _get_agent_by_name(self, namespace, name):
+        return FakeJSAgent({"state": {}})
+
+    monkeypatch.setattr(FakeSDK, "getAgentByName", _get_agent_by_name)
+    cache = AgentStubCache()
+
+    async def _request(n):
+        agent = await get_agent_by_name("chat", "shared", cache=cache)
+        async with agent.batch_state():
+            await agent.set_state({f"step_{n}": 1})
+            await asyncio.sleep(0.001 * n)
+            await agent.set_state({f"done_{n}": True})
+
+    async def _run():
+        await asyncio.gather(*(_request(n) for n in range(3)))
+
+    asyncio.run(_run())
+    # Each request flushes its own batch, not a neighbour's.
+    assert sorted(writes, key=sorted) == [
+        {"step_0": 1, "done_0": True},
+        {"step_1": 1, "done_1": True},
+        {"step_2": 1, "done_2": True},
+    ]
+
+
+def test_fan_out_bounds_concurrency_and_collects_errors(monkeypatch):
+    active = []
+    peak = []
+
+    async def _refresh(self, delay):
+        active.append(self)
+        peak.append(len(active))
+        await asyncio.sleep(delay)
+        active.remove(self)
+        if self.state["name"] == "broken":
+            raise RuntimeError("boom")
+        return self.state["name"]
+
+    monkeypatch.setattr(FakeJSAgent, "refresh", _refresh, raising=False)
+
+    async def _run():
+        names = ["a", "b", "broken", "c", "d"]
+        results = [
+            result
+            async for result in fan_out("chat", names, "refresh", 0.01, concurrency=2)
+        ]
+        assert max(peak) == 2
+        assert sorted(r.name for r in results) == sorted(names)
+        assert {r.name: r.value for r in results if r.ok} == {n: n for n in names if n != "broken"}
+        (failed,) = [r for r in results if not r.ok]
+        assert failed.name == "broken" and isinstance(failed.error, RuntimeError)
+
+        timed_out = [r async for r in fan_out("chat", ["a", "b"], "refresh", 1, timeout=0.01)]
+        assert all(isinstance(r.error, asyncio.TimeoutError) for r in timed_out)
+
+        late = [r async for r in fan_out("chat", ["a", "b", "c"], "refresh", 1, deadline=0.02)]
+        assert [type(r.error) for r in late] == [TimeoutError] * 3
+
+        pulled = []
+
+        def _names():
+            for n in range(1_000):
+                pulled.append(n)
+                yield f"agent-{n}"
+
+        stream = fan_out("chat", _names(), "refresh", 0, concurrency=3)
+        await anext(stream)
+        # Only the first `concurrency` names (plus one top-up) have been read.
+        assert len(pulled) <= 4 and len(asyncio.all_tasks()) <= 4
+        await stream.aclose()
+
+        active.clear()
+        peak.clear()
+        stream = fan_out("chat", "abcd", "refresh", 1, concurrency=2, deadline=0.02)
+        unstarted = [r async for r in stream]
+        assert sorted(r.name for r in unstarted) == list("abcd") and max(peak) == 2
+
+    asyncio.run(_run())
+
+
 def test_mcp_agent_wrapper():
     async def _run():
         mcp_agent = McpAgent.create(
@@ -264,3 +637,311 @@ def test_call_tool_missing_name_raises_key_error():
             await call_tool(ExampleMcpTools(), "does_not_exist")
 
     asyncio.run(_run())
+
+
+class ChildCallableAgent(ExampleCallableAgent):
+    @callable(name="greet")
+    async def greet_loudly(self, name: str) -> str:
+        return f"HELLO {name}"
+
+    def add(self, left: int, right: int) -> int:
+        return left - right
+
+
+def test_callable_registry_handles_inheritance_and_overrides():
+    async def _run():
+        child = ChildCallableAgent()
+        assert sorted(get_callable_methods(child)) == ["greet"]
+        assert await call_callable(child, "greet", "py") == "HELLO py"
+        with pytest.raises(KeyError):
+            await call_callable(child, "sum", 1, 2)
+
+        # The base class keeps its own registry.
+        assert await call_callable(ExampleCallableAgent(), "sum", 1, 2) == 3
+
+    asyncio.run(_run())
+
+
+class StreamingTools:
+    @tool(input_schema={"query": "string"})
+    async def search_logs(self, query: str):
+        for index in range(3):
+            await asyncio.sleep(0)
+            yield f"{query}-{index};"
+
+    @tool
+    async def summary(self):
+        yield {"content": [{"type": "text", "text": "a"}, {"type": "text", "text": "b"}]}
+
+
+class FakeExtra:
+    def __init__(self, token):
+        self._meta = type("Meta", (), {"progressToken": token})()
+        self.notifications = []
+
+    def sendNotification(self, notification):
+        self.notifications.append(notification)
+        return FakePromise(None)
+
+
+def test_streaming_tools_yield_chunks_locally_and_over_mcp():
+    async def _run():
+        tools = StreamingTools()
+        chunks = [chunk async for chunk in stream_tool(tools, "search_logs", {"query": "err"})]
+        assert chunks == ["err-0;", "err-1;", "err-2;"]
+
+        iterator = await call_tool(tools, "search_logs", {"query": "x"})
+        assert await iterator.__anext__() == "x-0;"
+
+        single = [chunk async for chunk in stream_tool(ExampleMcpTools(), "refund_policy")]
+        assert single == [{"content": [{"type": "text", "text": "30 days"}]}]
+
+        server = FakeMcpServer()
+        register_mcp_tools(server, tools)
+        extra = FakeExtra("tok-1")
+        result = await server.tools["search_logs"]["handler"]({"query": "q"}, extra)
+        assert [item["text"] for item in result["content"]] == ["q-0;", "q-1;", "q-2;"]
+        assert [n["params"]["progress"] for n in extra.notifications] == [1, 2, 3]
+        assert extra.notifications[0]["params"] == {
+            "progressToken": "tok-1",
+            "progress": 1,
+            "message": "q-0;",
+        }
+
+        no_token = FakeExtra(None)
+        result = await server.tools["summary"]["handler"](no_token)
+        assert [item["text"] for item in result["content"]] == ["a", "b"]
+        assert no_token.notifications == []
+
+    asyncio.run(_run())
+
+
+class ValidatedTools:
+    calls = 0
+
+    @tool(
+        input_schema={
+            "type": "object",
+            "properties": {
+                "query": {"type": "string"},
+                "limit": {"type": "integer", "default": 10},
+                "exact": {"type": "boolean"},
+                "sort": {"type": "string", "enum": ["asc", "desc"]},
+            },
+            "required": ["query"],
+            "additionalProperties": False,
+        }
+    )
+    def search(self, query, limit, exact=False, sort="asc"):
+        ValidatedTools.calls += 1
+        return {"query": query, "limit": limit, "exact": exact, "sort": sort}
+
+
+def test_tool_arguments_are_validated_and_coerced_before_the_call():
+    async def _run():
+        tools = ValidatedTools()
+        assert await call_tool(tools, "search", {"query": "x", "limit": "5", "exact": "true"}) == {
+            "query": "x",
+            "limit": 5,
+            "exact": True,
+            "sort": "asc",
+        }
+        assert await call_tool(tools, "search", {"query": 42}) == {
+            "query": "42",
+            "limit": 10,
+            "exact": False,
+            "sort": "asc",
+        }
+
+        with pytest.raises(ToolInputError) as excinfo:
+            await call_tool(tools, "search", {"limit": "many", "sort": "up", "extra": 1})
+        assert excinfo.value.problems == [
+            "query: required",
+            "limit: expected integer, got str",
+            "sort: expected one of ['asc', 'desc'], got 'up'",
+            "extra: unexpected argument",
+        ]
+        assert ValidatedTools.calls == 2
+
+        with pytest.raises(ToolInputError, match="order_id: required"):
+            await call_tool(ExampleMcpTools(), "lookup_order", {})
+
+    asyncio.run(_run())
+
+
+def test_tool_js_schema_is_converted_once(monkeypatch):
+    conversions = []
+    monkeypatch.setattr(tools_module, "to_js", lambda value: conversions.append(value) or value)
+
+    class Tools:
+        @tool(input_schema={"order_id": "string"})
+        def lookup(self, order_id):
+            return order_id
+
+    for _ in range(3):
+        register_mcp_tools(FakeMcpServer(), Tools())
+    assert conversions == [{"order_id": "string"}]
+
+
+class FakeSpan:
+    def __init__(self, name, start_time, attributes):
+        self.name = name
+        self.start_time = start_time
+        self.attributes = attributes
+        self.exceptions = []
+        self.end_time = None
+
+    def record_exception(self, error):
+        self.exceptions.append(error)
+
+    def end(self, end_time=None):
+        self.end_time = end_time
+
+
+class FakeTracer:
+    def __init__(self):
+        self.spans = []
+
+    def start_span(self, name, start_time=None, attributes=None):
+        span = FakeSpan(name, start_time, attributes)
+        self.spans.append(span)
+        return span
+
+
+def test_instrumentation_hooks_record_bridge_crossings_and_dispatch():
+    async def _run():
+        agent = Agent.create(state={"count": 0})
+        await agent.set_state({"count": 1})
+        assert instrumentation.hooks == ()
+
+        stats = instrumentation.add_hook(instrumentation.InMemoryAggregator())
+        tracer = FakeTracer()
+        instrumentation.add_hook(instrumentation.span_hook(tracer))
+        instrumentation.add_hook(lambda record: 1 / 0)
+        try:
+            await agent.set_state({"count": 2})
+            await get_agent_by_name("examples", "demo")
+            await call_callable(ExampleCallableAgent(), "sum", 2, 3)
+            with pytest.raises(ToolInputError):
+                await call_tool(ValidatedTools(), "search", {"limit": "many"})
+            server = FakeMcpServer()
+            register_mcp_tools(server, ExampleMcpTools())
+            await server.tools["lookup_order"]["handler"]({"order_id": "1"})
+        finally:
+            instrumentation.clear_hooks()
+
+        summary = stats.summary()
+        assert set(summary) == {
+            "agent:set_state",
+            "sdk:get_agent_by_name",
+            "callable:sum",
+            "tool:search",
+            "mcp_tool:lookup_order",
+        }
+        assert summary["agent:set_state"]["count"] == 1
+        assert summary["agent:set_state"]["payload_bytes"] > 0
+        assert summary["tool:search"]["errors"] == 1
+        assert sum(summary["callable:sum"]["buckets"].values()) == 1
+        assert "agent:set_state" in stats.dump()
+
+        assert [span.name for span in tracer.spans][0] == "python_agents.agent set_state"
+        assert tracer.spans[3].exceptions and isinstance(tracer.spans[3].exceptions[0], ToolInputError)
+        assert all(span.end_time >= span.start_time for span in tracer.spans)
+
+    asyncio.run(_run())
+
+
+class BurstyAgent:
+    def __init__(self):
+        self.runs = []
+        self.release = None
+
+    @callable(single_flight=True)
+    async def summarize(self, doc, fail=False):
+        self.runs.append(doc)
+        await self.release.wait()
+        if fail:
+            raise RuntimeError("upstream failed")
+        return f"summary:{doc}"
+
+    @tool(input_schema={"query": "string"}, single_flight=True)
+    async def search(self, query):
+        self.runs.append(query)
+        await self.release.wait()
+        return {"content": [{"type": "text", "text": query}]}
+
+
+def test_single_flight_coalesces_identical_concurrent_calls():
+    async def _run():
+        agent = BurstyAgent()
+        agent.release = asyncio.Event()
+        calls = [asyncio.ensure_future(call_callable(agent, "summarize", "a")) for _ in range(4)]
+        other = asyncio.ensure_future(call_callable(agent, "summarize", "b"))
+        await asyncio.sleep(0)
+        calls[0].cancel()
+        await asyncio.sleep(0)
+        agent.release.set()
+        results = await asyncio.gather(*calls[1:], other)
+        assert results == ["summary:a"] * 3 + ["summary:b"]
+        assert calls[0].cancelled()
+        assert agent.runs == ["a", "b"]
+
+        agent.runs.clear()
+        agent.release = asyncio.Event()
+        failing = [
+            asyncio.ensure_future(call_callable(agent, "summarize", "c", fail=True)) for _ in range(3)
+        ]
+        await asyncio.sleep(0)
+        agent.release.set()
+        errors = await asyncio.gather(*failing, return_exceptions=True)
+        assert all(isinstance(error, RuntimeError) for error in errors)
+        assert agent.runs == ["c"]
+
+        server = FakeMcpServer()
+        register_mcp_tools(server, agent)
+        agent.runs.clear()
+        agent.release = asyncio.Event()
+        handler = server.tools["search"]["handler"]
+        searches = [asyncio.ensure_future(handler({"query": "q"}, None)) for _ in range(3)]
+        await asyncio.sleep(0)
+        agent.release.set()
+        assert len(await asyncio.gather(*searches)) == 3
+        assert agent.runs == ["q"]
+        stats = BurstyAgent.search.__python_agents_single_flight__.stats()
+        assert stats == {"started": 1, "coalesced": 2, "in_flight": 0}
+
+        # Arguments that differ only in key or container type are not merged.
+        agent.runs.clear()
+        agent.release = asyncio.Event()
+        variants = [{1: "x"}, {"1": "x"}, (1,), [1], {1: "x", "b": 2}, object()]
+        pending = [asyncio.ensure_future(call_callable(agent, "summarize", v)) for v in variants]
+        await asyncio.sleep(0)
+        agent.release.set()
+        await asyncio.gather(*pending)
+        assert len(agent.runs) == len(variants)
+
+    asyncio.run(_run())
+
+
+def test_json_patch_diff_round_trips():
+    from python_agents import _jsonpatch
+
+    before = {"a/b": 1, "gone": True, "nested": {"x~": [1, 2], "keep": "same"}, "list": [1]}
+    after = {"a/b": 2, "nested": {"x~": [1, 2, 3], "keep": "same", "new": None}, "list": [1]}
+    ops = _jsonpatch.diff(before, after)
+    assert {"op": "replace", "path": "/a~1b", "value": 2} in ops
+    assert {"op": "remove", "path": "/gone"} in ops
+    assert {"op": "replace", "path": "/nested/x~0", "value": [1, 2, 3]} in ops
+    assert _jsonpatch.apply(before, ops) == after
+    assert before["gone"] is True
+    assert _jsonpatch.diff(before, before) == []
+
+
+def test_example_bridge_imports_package_bridge():
+    root = pathlib.Path(__file__).resolve().parents[1]
+    example = root / "examples" / "agents-frontend" / "workers" / "agents_bridge.mjs"
+    target = (example.parent / "../../../src/python_agents/worker/agents_bridge.mjs").resolve()
+    assert target == root / "src" / "python_agents" / "worker" / "agents_bridge.mjs"
+    # A re-export, not a hand-maintained copy that can drift.
+    assert 'import "../../../src/python_agents/worker/agents_bridge.mjs";' in example.read_text()
+    assert "__PYTHON_AGENTS_SDK =" not in example.read_text()
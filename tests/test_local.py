@@ -0,0 +1,792 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import weakref
+
+import pytest
+
+from python_agents import (
+    Agent,
+    EmailRouter,
+    EmailTarget,
+    KeyedState,
+    AgentWorkflow,
+    McpClientPool,
+    McpRequestHandler,
+    QueueWorker,
+    RequestRouter,
+    ResultCache,
+    call_callable,
+    call_tool,
+    callable,
+    clear_result_cache,
+    get_agent_by_name,
+    get_mcp_client_pool,
+    route_agent_request,
+    tool,
+)
+from python_agents.codec import CompressedCodec, MsgpackCodec, packb, unpackb
+from python_agents.local import install_local_sdk, uninstall_local_sdk
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def sdk(request):
+    installed = install_local_sdk(request.param, clock=lambda: 1_000.0)
+    yield installed
+    uninstall_local_sdk()
+
+
+def test_state_round_trip_and_client_updates(sdk):
+    async def _run():
+        agent = Agent.create(state={"count": 0})
+        client = agent._js_agent.connect()
+        await agent.set_state({"count": 1})
+        await agent.set_state({"step": "done"})
+        assert agent.state == {"count": 1, "step": "done"}
+        assert client.messages[-1] == {"type": "cf_agent_state", "state": {"count": 1, "step": "done"}}
+
+        agent._js_agent.receive_client_state({"count": 5})
+        assert agent.state == {"count": 5}
+        assert agent.state_cache_stats()["conversions"] == 2
+
+    asyncio.run(_run())
+
+
+def test_schedules_and_queue(sdk):
+    async def _run():
+        agent = Agent.create()
+        await agent.schedule({"type": "digest"}, 30)
+        interval = await agent.schedule_every({"type": "refresh"}, "5 minutes")
+        assert [s["payload"]["type"] for s in await agent.get_schedules()] == ["digest", "refresh"]
+
+        fired = agent._js_agent.run_due_schedules(now=1_000.0 + 300)
+        assert [s["payload"]["type"] for s in fired] == ["digest", "refresh"]
+        assert [s["id"] for s in await agent.get_schedules()] == [interval["id"]]
+        assert await agent.cancel_schedule(interval["id"]) is True
+
+        ids = await agent.queue_many([{"job": "index", "doc": n} for n in range(4)])
+        email_id = await agent.queue("on_job", {"job": "email"})
+        assert [row["payload"]["doc"] for row in await agent.get_queue(where={"job": "index"}, limit=2)] == [0, 1]
+        assert (await agent.dequeue())["id"] == ids[0]
+        await agent.dequeue_many(ids[1:3])
+        assert [row["id"] for row in await agent.get_queue()] == [ids[3], email_id]
+        assert await agent.dequeue_all() == 2
+
+    asyncio.run(_run())
+
+
+def test_keyed_schedules_are_deduplicated_and_indexed(sdk):
+    async def _run():
+        agent = Agent.create()
+        first = await agent.schedule_every({"type": "refresh-cache"}, "5 minutes", dedupe=True)
+        again = await agent.schedule_every({"type": "refresh-cache"}, "5 minutes", dedupe=True)
+        assert again["id"] == first["id"]
+
+        created = await agent.schedule_many(
+            [
+                {"payload": {"type": "digest", "user": 1}, "when": 60, "key": "digest:1"},
+                {"payload": {"type": "digest", "user": 2}, "when": 60, "key": "digest:2"},
+                {"payload": {"type": "digest", "user": 1}, "when": 90, "key": "digest:1"},
+                {"payload": {"type": "refresh-cache"}, "every": "5 minutes", "dedupe": True},
+            ]
+        )
+        assert created[2] == created[0] and created[3]["id"] == first["id"]
+        assert len(agent._js_agent.getSchedules()) == 3
+
+        # A fresh wrapper (a new wake) rebuilds the index from one listing.
+        woken = Agent(agent._js_agent)
+        assert await woken.schedule({"type": "digest", "user": 2}, 60, key="digest:2") == created[1]
+        assert [row["payload"]["user"] for row in await woken.find_schedules(type="digest")] == [1, 2]
+
+        agent._js_agent.run_due_schedules(now=1_000.0 + 60)
+        replacement = await woken.schedule({"type": "digest", "user": 1}, 60, key="digest:1")
+        assert replacement["id"] != created[0]["id"]
+
+        assert await woken.cancel_schedules(type="digest") == [replacement["id"]]
+        assert [row["id"] for row in agent._js_agent.getSchedules()] == [first["id"]]
+        with pytest.raises(TypeError):
+            await woken.schedule("not-a-dict", 60, dedupe=True)
+
+        # Concurrent keyed calls that all miss the index create one schedule.
+        racing = Agent.create()
+        listing = racing._js_agent.getSchedules
+
+        async def slow_listing(*args):
+            rows = listing(*args)
+            await asyncio.sleep(0)
+            return rows
+
+        racing._js_agent.getSchedules = slow_listing
+        rows = await asyncio.gather(
+            *(racing.schedule_every({"type": "report"}, "1 hour", key="r") for _ in range(3))
+        )
+        assert len({row["id"] for row in rows}) == 1 and len(listing()) == 1
+
+    asyncio.run(_run())
+
+
+class _Request:
+    def __init__(self, url, method="GET"):
+        self.url = url
+        self.method = method
+
+
+def test_request_router_matches_in_python(sdk, monkeypatch):
+    crossings = []
+    for method in ("routeAgentRequest", "routeAgentTo"):
+        original = getattr(sdk, method)
+        monkeypatch.setattr(sdk, method, lambda *args, _o=original, _m=method: crossings.append(_m) or _o(*args))
+
+    router = RequestRouter(
+        ["agents", "/api/v2/agents/"], direct=True, fallback=lambda request, env: "fallback"
+    )
+    router.add("/health", lambda request, env: "ok")
+    router.add("/items", lambda request, env: "created", methods=["post"])
+
+    @router.route("/static", prefix=True)
+    def _static(request, env):
+        return f"asset:{request.url}"
+
+    assert router.match("https://x.dev/api/v2/agents/chat-agent/alice/ws?x=1") == (
+        "api/v2/agents",
+        "chat-agent",
+        "alice",
+    )
+    assert router.match("https://x.dev/agents/chat-agent") is None
+
+    async def _run():
+        sdk.on_request("counter", lambda agent, request: {"routed": agent.key})
+        assert await router.handle(_Request("https://x.dev/health?probe=1")) == "ok"
+        assert await router.handle(_Request("/static/app.js")) == "asset:/static/app.js"
+        assert await router.handle(_Request("https://x.dev/items", "POST")) == "created"
+        assert await router.handle(_Request("https://x.dev/items")) == "fallback"
+        assert await router.handle(_Request("https://x.dev/agents/counter/bob#x")) == {"routed": "counter/bob"}
+        assert crossings == ["routeAgentTo"]
+
+        indirect = RequestRouter()
+        assert await indirect.handle("https://x.dev/agents/counter/bob") == {"routed": "counter/bob"}
+        assert await indirect.handle("https://x.dev/") is None
+        assert crossings[:2] == ["routeAgentTo", "routeAgentRequest"]
+        assert router.stats() == {"agent_requests": 1, "dispatched": 3, "unmatched": 1}
+
+    asyncio.run(_run())
+
+
+class Counter:
+    @callable
+    def bump(self, agent, by):
+        return agent.set_state({"count": agent.state.get("count", 0) + by})
+
+
+def test_routing_and_named_agents(sdk):
+    async def _run():
+        sdk.on_request("counter", lambda agent, request: {"routed": agent.key})
+        assert await route_agent_request("https://x.dev/agents/counter/alice", None) == {
+            "routed": "counter/alice"
+        }
+        assert await route_agent_request("https://x.dev/health", None) is None
+
+        alice = await get_agent_by_name("counter", "alice")
+        await call_callable(Counter(), "bump", alice, 2)
+        again = await get_agent_by_name("counter", "alice")
+        assert again.state == {"count": 2}
+
+    asyncio.run(_run())
+
+
+def test_agent_wrappers_are_weak_referenceable(sdk):
+    class Subclassed(Agent):
+        __slots__ = ()
+
+    for agent in (Agent.create(), Subclassed(Agent.create()._js_agent)):
+        assert weakref.ref(agent)() is agent
+
+
+def test_queue_worker_runs_jobs_concurrently_with_batched_acks(sdk):
+    async def _run():
+        agent = Agent.create()
+        await agent.queue_many([{"job": "index", "doc": n} for n in range(20)])
+        await agent.queue("send_email", {"to": "a@example.com"})
+        await agent.queue({"job": "unknown"})
+        assert await agent.queue_depth() == 22
+
+        failures = []
+        worker = QueueWorker(
+            agent, concurrency=4, ack_batch=8, backoff=0, on_failure=lambda row, error: failures.append(row)
+        )
+        running = peak = 0
+        indexed = []
+        attempts = {}
+
+        @worker.handler("index")
+        async def index(payload):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0)
+            running -= 1
+            indexed.append(payload["doc"])
+
+        @worker.handler("send_email")
+        def send_email(payload):
+            attempts[payload["to"]] = attempts.get(payload["to"], 0) + 1
+            if attempts[payload["to"]] < 2:
+                raise RuntimeError("smtp down")
+
+        assert await worker.drain() == 21
+        assert sorted(indexed) == list(range(20))
+        assert peak == 4
+        assert attempts == {"a@example.com": 2}
+        assert [row["payload"] for row in failures] == [{"job": "unknown"}]
+        assert await agent.get_queue() == []
+
+        stats = worker.stats()
+        assert stats["retried"] == 1 and stats["failed"] == 1 and stats["acked"] == 22
+        assert stats["ack_calls"] < 22 and stats["depth"] == 0
+        assert stats["by_type"]["index"]["processed"] == 20
+
+    asyncio.run(_run())
+
+
+def test_result_cache_memoizes_per_instance_and_survives_hibernation(sdk):
+    class Lookups:
+        calls = 0
+
+        def __init__(self, agent):
+            self.agent = agent
+
+        @callable(cache=ResultCache(maxsize=2))
+        def square(self, value):
+            Lookups.calls += 1
+            return value * value
+
+        @tool(input_schema={"word": "string"}, cache=ResultCache(ttl=60, storage="durable"))
+        async def define(self, word):
+            Lookups.calls += 1
+            return {"content": [{"type": "text", "text": f"{word}: a word"}]}
+
+    async def _run():
+        agent = Agent.create()
+        lookups = Lookups(agent)
+        assert [await call_callable(lookups, "square", n) for n in (3, 3, 4, 3)] == [9, 9, 16, 9]
+        assert Lookups.calls == 2
+        assert await call_callable(Lookups(agent), "square", 3) == 9
+        assert Lookups.calls == 3
+
+        await call_tool(lookups, "define", {"word": "cache"})
+        # A new instance (e.g. after hibernation) finds the durable entry.
+        woken = Lookups(agent)
+        assert (await call_tool(woken, "define", {"word": "cache"}))["content"][0]["text"] == "cache: a word"
+        assert Lookups.calls == 4
+        assert Lookups.define.__python_agents_cache__.stats()["durable_hits"] == 1
+
+        await clear_result_cache(woken)
+        await call_tool(woken, "define", {"word": "cache"})
+        assert Lookups.calls == 5
+        assert Lookups.square.__python_agents_cache__.stats()["hits"] == 2
+
+        class Echo:
+            @callable(cache=True)
+            def echo(self, value):
+                return repr(value)
+
+        echo = Echo()
+        variants = [{1: "x"}, {"1": "x"}, (1,), [1], {1: "x", "b": 2}, 1, True, 1.0]
+        assert [await call_callable(echo, "echo", v) for v in variants] == list(map(repr, variants))
+        assert await call_callable(echo, "echo", {"b": 2, 1: "x"}) == repr({1: "x", "b": 2})
+        marker = object()
+        assert await call_callable(echo, "echo", marker) == repr(marker)
+        stats = Echo.echo.__python_agents_cache__.stats()
+        assert stats["misses"] == len(variants) and stats["hits"] == 1 and stats["bypassed"] == 1
+
+    asyncio.run(_run())
+
+    async def _stream(self):
+        yield "chunk"
+
+    with pytest.raises(ValueError):
+        tool(_stream, cache=True)
+
+    class Slotted:
+        __slots__ = ()
+
+        @callable(cache=True)
+        def answer(self):
+            return 42
+
+    with pytest.raises(TypeError, match="__weakref__"):
+        asyncio.run(call_callable(Slotted(), "answer"))
+
+
+def test_queue_worker_drains_when_on_failure_raises(sdk):
+    async def _run():
+        agent = Agent.create()
+        await agent.queue_many([{"job": "missing", "n": n} for n in range(3)])
+
+        def on_failure(row, error):
+            raise RuntimeError("alerting is down")
+
+        worker = QueueWorker(agent, max_attempts=1, on_failure=on_failure)
+        await asyncio.wait_for(worker.drain(), 1)
+        assert worker.stats()["failed"] == 3 and worker.worker_errors == 3
+        assert await agent.get_queue() == []
+
+    asyncio.run(_run())
+
+
+def test_coalesced_broadcasts_and_state_diff_sync(sdk):
+    async def _run():
+        agent = Agent.create(state={"doc": {"title": "draft", "body": "x" * 1_000}, "cursor": 0})
+        client = agent._js_agent.connect()
+        other = agent._js_agent.connect()
+
+        for n in range(3):
+            await agent.broadcast({"type": "progress", "n": n}, coalesce=True)
+        await agent.broadcast({"type": "done"}, [other], coalesce=True)
+        assert len(client.messages) == 1
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        assert client.messages[1:] == [
+            {"type": "cf_agent_batch", "messages": [{"type": "progress", "n": n} for n in range(3)]},
+            {"type": "done"},
+        ]
+        assert other.messages[-1]["type"] == "cf_agent_batch"
+
+        await agent.broadcast({"type": "tick"}, coalesce=60)
+        await agent.flush_broadcasts()
+        assert client.messages[-1] == {"type": "tick"}
+
+        await agent.set_state_sync("diff")
+        await agent.set_state({"cursor": 1})
+        assert client.messages[-1]["type"] == "cf_agent_state_snapshot"
+        await agent.set_state({"cursor": 2})
+        await agent.set_state({"doc": {"title": "final", "body": "x" * 1_000}})
+        assert client.messages[-2]["patch"] == [{"op": "replace", "path": "/cursor", "value": 2}]
+        assert client.messages[-1]["patch"] == [{"op": "replace", "path": "/doc/title", "value": "final"}]
+        assert client.state == agent.state == other.state
+
+    asyncio.run(_run())
+
+
+def test_email_router_resolves_in_python_and_routes_target(sdk):
+    router = EmailRouter(
+        {
+            "support@example.com": "SupportAgent",
+            "tickets+*@example.com": "TicketAgent",
+            "billing@example.com": ("BillingAgent", "main"),
+            "*@example.com": {"agent": "CatchAllAgent", "id": "inbox"},
+            "*@*.corp.example": "TenantAgent",
+        },
+        default=("BounceAgent", "bounces"),
+    )
+    assert len(router) == 5
+    assert router.resolve("Support@Example.com") == EmailTarget("SupportAgent", "support")
+    assert router.resolve("Jane <tickets+4711@example.com>") == EmailTarget("TicketAgent", "4711")
+    assert router.resolve("billing+urgent@example.com") == EmailTarget("BillingAgent", "main")
+    assert router.resolve("anyone@example.com") == EmailTarget("CatchAllAgent", "inbox")
+    assert router.resolve("ops@eu.acme.corp.example") == EmailTarget("TenantAgent", "ops")
+    assert router.resolve("ops@corp.example") == EmailTarget("BounceAgent", "bounces")
+    with pytest.raises(ValueError):
+        router.add("not-an-address", "Agent")
+
+    derived = EmailRouter(
+        {
+            "*@agents.example.com": {"agent_from": "local"},
+            "*@users.example.com": {"agent_from": "sub", "agents": {"Chat": "ChatAgent"}},
+        },
+        default={"agent_from": "local", "agents": {"help": "HelpAgent"}},
+    )
+    assert derived.resolve("Chat+Room7@agents.example.com") == EmailTarget("chat", "room7")
+    assert derived.resolve("chat@agents.example.com") == EmailTarget("chat", "chat")
+    assert derived.resolve("alice+chat@users.example.com") == EmailTarget("ChatAgent", "alice")
+    assert derived.resolve("help+1@users.example.com") == EmailTarget("HelpAgent", "1")
+    assert derived.resolve("alice@users.example.com") is None
+    assert derived.resolve("nobody@elsewhere.example") is None
+    with pytest.raises(ValueError):
+        derived.add("*@example.com", {"agent_from": "domain"})
+
+    async def _run():
+        routed = await router.route({"to": "tickets+42@example.com", "subject": "help"})
+        assert routed["target"] == {"agentName": "TicketAgent", "agentId": "42"}
+        assert sdk.getAgentByName("TicketAgent", "42").inbox == [{"to": "tickets+42@example.com", "subject": "help"}]
+        assert await EmailRouter({"a@example.com": "A"}).route({"to": "b@example.com"}) is None
+
+    asyncio.run(_run())
+
+
+def test_workflow_steps_run_in_parallel_and_replay_checkpoints(sdk):
+    async def _run():
+        agent = Agent.create()
+        calls = []
+        running = 0
+        peak = 0
+        flaky = {"fail": True}
+
+        async def fetch(source):
+            nonlocal running, peak
+            calls.append(source)
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0)
+            running -= 1
+            if source == "c" and flaky["fail"]:
+                raise RuntimeError("upstream down")
+            return {"source": source}
+
+        async def pipeline(steps):
+            fetched = await steps.parallel([("fetch", fetch, source) for source in "abcd"])
+            return await steps.do("merge", lambda: [item["source"] for item in fetched])
+
+        steps = AgentWorkflow.create({"name": "etl"}).steps(agent.ctx.storage, concurrency=2)
+        with pytest.raises(RuntimeError):
+            await pipeline(steps)
+        assert sorted(calls) == ["a", "b", "c", "d"] and peak == 2
+
+        flaky["fail"] = False
+        # A retry with a fresh runner (new isolate) only reruns the failed step.
+        retry = AgentWorkflow.create({"name": "etl"}).steps(agent.ctx.storage)
+        assert await pipeline(retry) == ["a", "b", "c", "d"]
+        assert calls[4:] == ["c"]
+        assert retry.stats() == {"executed": 2, "replayed": 3, "failed": 0, "coalesced": 0}
+
+        @retry.step()
+        async def outer(n):
+            return await retry.do("inner", lambda: n * 2) + 1
+
+        assert await asyncio.gather(outer(1), outer(1)) == [3, 3]
+        assert retry.stats()["coalesced"] == 1
+        assert await retry.reset("fetch") == 4
+        assert await retry.reset() == 3
+
+        # Without storage, runs of one workflow instance share isolate checkpoints.
+        first = AgentWorkflow.create({"name": "etl", "id": "run-1"}).steps()
+        assert await first.do("once", lambda: calls.append("once") or 1) == 1
+        again = AgentWorkflow.create({"name": "etl"}).steps(instance_id="run-1")
+        assert await again.do("once", lambda: calls.append("once") or 1) == 1
+        assert calls.count("once") == 1 and again.stats()["replayed"] == 1
+        assert await again.reset() == 1
+        with pytest.raises(ValueError):
+            AgentWorkflow.create({"name": "etl"}).steps()
+
+    asyncio.run(_run())
+
+
+class _Headers(dict):
+    def get(self, key, default=None):
+        return super().get(key.lower(), default)
+
+
+class _McpHttpRequest:
+    def __init__(self, body, method="POST", accept="application/json"):
+        self.method = method
+        self.headers = _Headers(accept=accept)
+        self._body = body
+
+    async def text(self):
+        return self._body
+
+
+def test_mcp_request_handler_serves_batches_concurrently(sdk):
+    class Search:
+        running = 0
+        peak = 0
+
+        @tool(description="Look up an order", input_schema={"order_id": "string"})
+        async def lookup(self, order_id):
+            Search.running += 1
+            Search.peak = max(Search.peak, Search.running)
+            await asyncio.sleep(0.001)
+            Search.running -= 1
+            return {"content": [{"type": "text", "text": f"order:{order_id}"}]}
+
+        @tool
+        async def report(self):
+            yield "part 1"
+            yield "part 2"
+
+        @tool
+        def broken(self):
+            raise RuntimeError("upstream down")
+
+    handler = McpRequestHandler(Search(), concurrency=3)
+
+    def call(request_id, name, arguments=None, **params):
+        params.update(name=name, arguments=arguments or {})
+        return {"jsonrpc": "2.0", "id": request_id, "method": "tools/call", "params": params}
+
+    async def _run():
+        listing = await handler.handle({"jsonrpc": "2.0", "id": 1, "method": "tools/list"})
+        assert listing["result"]["tools"][0] == {
+            "name": "lookup",
+            "description": "Look up an order",
+            "inputSchema": {
+                "type": "object",
+                "properties": {"order_id": {"type": "string"}},
+                "required": ["order_id"],
+            },
+        }
+
+        batch = [call(n, "lookup", {"order_id": n}) for n in range(6)]
+        batch += [
+            call("bad", "lookup", {}),
+            call("err", "broken"),
+            call("none", "missing"),
+            {"jsonrpc": "2.0", "method": "notifications/initialized"},
+            {"jsonrpc": "2.0", "id": "x", "method": "resources/list"},
+        ]
+        responses = {response["id"]: response for response in await handler.handle(batch)}
+        assert len(responses) == 10 and Search.peak == 3
+        assert responses[5]["result"]["content"][0]["text"] == "order:5"
+        assert responses["bad"]["error"]["code"] == -32602
+        assert responses["err"]["result"]["isError"] is True
+        assert responses["none"]["error"]["code"] == -32602
+        assert responses["x"]["error"]["code"] == -32601
+
+        streamed = [item async for item in handler.stream(call(9, "report", _meta={"progressToken": "t"}))]
+        assert [item.get("method") for item in streamed] == ["notifications/progress"] * 2 + [None]
+        assert streamed[-1]["result"]["content"] == [
+            {"type": "text", "text": "part 1"},
+            {"type": "text", "text": "part 2"},
+        ]
+
+        init = '{"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": {}}'
+        response = await handler.fetch(_McpHttpRequest(init))
+        assert json.loads(await response.text())["result"]["serverInfo"]["name"] == "python-agents"
+        response = await handler.fetch(_McpHttpRequest("{nope"))
+        assert response.status == 400
+        notification = '{"jsonrpc": "2.0", "method": "notifications/initialized"}'
+        assert (await handler.fetch(_McpHttpRequest(notification))).status == 202
+        body = json.dumps([call(1, "lookup", {"order_id": 1}), call(2, "report")])
+        response = await handler.fetch(_McpHttpRequest(body, accept="application/json, text/event-stream"))
+        assert response.headers["content-type"] == "text/event-stream"
+        lines = (await response.text()).splitlines()
+        events = [json.loads(line[6:]) for line in lines if line.startswith("data: ")]
+        assert sorted(event["id"] for event in events) == [1, 2]
+        assert handler.stats()["batches"] == 2
+
+    asyncio.run(_run())
+
+
+def test_codec_encodes_state_queue_and_schedules(sdk):
+    values = [
+        *(None, True, False, 0, 127, -32, -33, 255, 65_536, 2**40, -(2**40), 1.5),
+        *("", "é" * 40, "x" * 70_000, b"\x00\xff", list(range(20))),
+        {"nested": {"k": [1, {"a": None}]}},
+        {1: "int key"},
+    ]
+    for value in values:
+        assert unpackb(packb(value)) == value
+    assert unpackb(packb((1, 2))) == [1, 2]
+
+    async def _run():
+        sections = [{"heading": f"h{n}", "body": "lorem ipsum " * 20} for n in range(20)]
+        document = {"title": "spec", "sections": sections}
+        codec = CompressedCodec(MsgpackCodec(), threshold=256)
+        agent = Agent.create(state={"doc": document, "cursor": 0}, codec=codec)
+        stored = agent._js_agent.state
+        assert stored["cursor"] == 0 and stored["doc"]["__python_agents_codec__"] == "msgpack+zlib"
+        assert len(stored["doc"]["data"]) < len(json.dumps(document)) / 4
+        assert agent.state == {"doc": document, "cursor": 0}
+
+        await agent.set_state({"tags": ["a", "b"]})
+        assert agent._js_agent.state["tags"]["__python_agents_codec__"] == "msgpack+zlib"
+        agent.invalidate_state()
+        assert agent.state["tags"] == ["a", "b"] and agent.state["doc"] == document
+
+        await agent.queue("on_job", {"job": "index", "doc": document})
+        await agent.queue_many([{"job": "ping", "n": n} for n in range(3)])
+        rows = await agent.get_queue()
+        assert [row["payload"]["job"] for row in rows] == ["index", "ping", "ping", "ping"]
+        rows = await agent.get_queue(where={"job": "ping"})
+        assert [row["payload"]["n"] for row in rows] == [0, 1, 2]
+        handled = []
+        worker = QueueWorker(agent, {"on_job": handled.append, "ping": handled.append})
+        assert await worker.drain() == 4 and handled[0]["doc"] == document
+
+        row = await agent.schedule({"type": "digest", "doc": document}, 60, key="daily")
+        assert row["payload"]["doc"] == document
+        stored_payload = agent._js_agent.getSchedules()[0]["payload"]
+        assert stored_payload["_schedule_key"] == "daily" and stored_payload["__python_agents_codec__"] == "msgpack+zlib"
+        assert agent.decode(stored_payload)["doc"] == document
+        again = Agent(agent._js_agent)
+        again.use_codec("msgpack+zlib")
+        existing = await again.schedule({"type": "digest", "doc": document}, 60, key="daily")
+        assert existing["id"] == row["id"]
+        assert (await again.find_schedules(type="digest"))[0]["payload"]["doc"] == document
+
+        # Envelopes stay readable after the codec is switched off; look-alikes are data.
+        again.use_codec(None)
+        await again.set_state({"meta": {"_codec": "msgpack+zlib", "data": "not an envelope"}})
+        assert again.state["doc"] == document and again.state["meta"]["_codec"] == "msgpack+zlib"
+        assert (await again.get_schedules())[0]["payload"]["doc"] == document
+
+        class Named(Agent):
+            __slots__ = ("label",)
+
+            def __init__(self, js_agent, label="default"):
+                super().__init__(js_agent)
+                self.label = label
+                assert self._js_agent is not None
+
+        named = Named.create(state={"items": [1, 2]}, codec="msgpack+zlib")
+        assert named.label == "default" and named.state == {"items": [1, 2]}
+        with pytest.raises(ValueError, match="msgpack\\+zlib"):
+            named.use_codec("msgpack")
+
+    asyncio.run(_run())
+
+
+def test_keyed_state_touches_only_named_keys(sdk):
+    async def _run():
+        agent = Agent.create(state={"count": 0})
+        kv = agent.kv
+        assert agent.kv is kv
+        await kv.set("profile", {"name": "Ada"})
+        await kv.set_many({f"msg:{n:03}": {"n": n} for n in range(10)})
+        assert agent._js_agent.state == {"count": 0}
+        assert kv.stats()["writes"] == 2
+
+        assert await kv.get("profile") == {"name": "Ada"}
+        assert await kv.get("missing", "fallback") == "fallback"
+        assert await kv.get("missing") is None
+        assert kv.stats()["reads"] == 1
+        found = await kv.get_many(["msg:001", "msg:002", "missing", "other"])
+        assert found == {"msg:001": {"n": 1}, "msg:002": {"n": 2}}
+        assert kv.stats()["reads"] == 2
+
+        assert await kv.delete("msg:000", "msg:001", "nope") == 2
+        assert await kv.get("msg:000") is None
+        scanned = await kv.scan("msg:", limit=3)
+        assert list(scanned) == ["msg:002", "msg:003", "msg:004"]
+        assert len(await kv.scan("msg:")) == 8
+
+        reads = kv.stats()["reads"]
+        view = kv.view("msg:", page_size=3)
+        assert [key async for key in view] == [f"{n:03}" for n in range(2, 10)]
+        assert kv.stats()["reads"] - reads == 3
+        assert await view.get("009") == {"n": 9}
+        assert await view.contains("005") and not await view.contains("000")
+
+        assert [value["n"] async for value in view.values()] == list(range(2, 10))
+
+        # Wrappers of one agent share the cache; JS-side writes need invalidate().
+        other = Agent(agent._js_agent)
+        await other.kv.set("profile", {"name": "Grace"})
+        reads = kv.stats()["reads"]
+        assert await kv.get("profile") == {"name": "Grace"} and kv.stats()["reads"] == reads
+        agent._js_agent.ctx.storage.put("kv:profile", {"name": "Edsger"})
+        assert await kv.get("profile") == {"name": "Grace"}
+        kv.invalidate()
+        assert await kv.get("profile") == {"name": "Edsger"}
+
+        client = agent._js_agent.connect()
+        synced = KeyedState(agent, sync=True)
+        await synced.set("cursor", 3)
+        await synced.delete("cursor")
+        assert client.messages[-2:] == [
+            {"type": "cf_agent_kv", "set": {"cursor": 3}},
+            {"type": "cf_agent_kv", "delete": ["cursor"]},
+        ]
+
+        encoded = Agent.create(codec="json+zlib")
+        history = [{"role": "user", "content": "hello " * 200}]
+        await encoded.kv.set("history", history)
+        raw = encoded._js_agent.ctx.storage.get("kv:history")
+        assert raw["__python_agents_codec__"] == "json+zlib"
+        encoded.kv.invalidate()
+        assert await encoded.kv.get("history") == history
+
+    asyncio.run(_run())
+
+
+def test_mcp_client_pool_shares_sessions_and_caches_catalogs(sdk):
+    class Docs:
+        @tool(input_schema={"query": "string"})
+        async def search(self, query):
+            await asyncio.sleep(0)
+            return f"results for {query}"
+
+    url = "https://docs.example/mcp"
+    sdk.on_mcp(url, McpRequestHandler(Docs(), name="docs"))
+    now = [0.0]
+    pool = McpClientPool(ttl=60, clock=lambda: now[0])
+    pool.add("docs", url, headers={"authorization": "Bearer t"})
+
+    async def _run():
+        listings = await asyncio.gather(*(pool.list_tools("docs") for _ in range(5)))
+        assert all(tools == listings[0] for tools in listings)
+        assert [tool["name"] for tool in listings[0]] == ["search"]
+        stats = pool.stats()
+        # initialize, notifications/initialized, tools/list
+        assert stats["connects"] == 1 and stats["requests"] == 3 and stats["coalesced"] == 4
+        session = await pool.connect("docs")
+        assert session.server_info["name"] == "docs" and session.session_id in sdk.mcp_sessions
+
+        assert await pool.list_tools("docs") == listings[0]
+        assert await pool.list_resources("docs") == [] and await pool.list_prompts("docs") == []
+        assert pool.stats()["requests"] == 3 and pool.stats()["catalog_hits"] == 1
+
+        result = await pool.call_tool("docs", "search", {"query": "kv"})
+        assert result["content"][0]["text"] == "results for kv"
+        sdk.notify_mcp(url, "notifications/tools/list_changed")
+        await pool.call_tool("docs", "search", {"query": "again"})
+        assert pool.stats()["notifications"] == 1
+        await pool.list_tools("docs")
+        assert pool.stats()["requests"] == 6
+
+        now[0] = 61.0
+        assert await pool.catalog() == {"docs": listings[0]}
+        assert pool.stats()["requests"] == 7
+
+        sdk.expire_mcp_sessions(url)
+        result = await pool.call_tool("docs", "search", {"query": "later"})
+        assert result["content"][0]["text"] == "results for later"
+        stats = pool.stats()
+        assert stats["connects"] == 2 and stats["reconnects"] == 1 and stats["connections"] == 1
+
+        # Re-pointing ends the old session; a down server does not fail catalog().
+        old_session = (await pool.connect("docs")).session_id
+        pool.add("docs", url, headers={"authorization": "Bearer t2"})
+        pool.add("down", "https://down.example/mcp")
+        await asyncio.sleep(0)
+        assert old_session not in sdk.mcp_sessions
+        assert await pool.catalog() == {"docs": listings[0]}
+        assert pool.stats()["catalog_errors"] == 1
+
+        await pool.close()
+        assert sdk.mcp_sessions == {} and pool.stats()["connections"] == 0
+        with pytest.raises(KeyError):
+            await pool.connect("unknown")
+        assert Agent.create().mcp_clients is get_mcp_client_pool()
+
+    asyncio.run(_run())
+
+
+def test_mcp_client_pool_skips_caching_catalog_changed_mid_fetch(sdk):
+    class Docs:
+        @tool()
+        async def search(self):
+            return "ok"
+
+    url = "https://docs.example/mcp"
+    inner = McpRequestHandler(Docs())
+
+    class ChangesDuringList:
+        async def handle(self, message):
+            if message.get("method") == "tools/list":
+                sdk.notify_mcp(url, "notifications/tools/list_changed")
+            return await inner.handle(message)
+
+    sdk.on_mcp(url, ChangesDuringList())
+    pool = McpClientPool()
+    pool.add("docs", url)
+
+    async def _run():
+        await pool.list_tools("docs")
+        requests = pool.stats()["requests"]
+        await pool.list_tools("docs")
+        assert pool.stats()["requests"] == requests + 1
+        assert pool.stats()["catalog_hits"] == 0
+
+    asyncio.run(_run())